@@ -0,0 +1,293 @@
+"""
+Benchmark harness for every path planner in the project.
+
+Generates reproducible maps (rubble fields, collapsed corridors, open plazas
+and mazes) at several sizes, plans a long trip across each with every planner,
+and records wall time, nodes expanded (where the planner counts them), peak
+traced memory and path cost. Results are written to a JSON file; pass a
+previous file with --compare to print time ratios against it.
+
+Planners: astar.astar and app.a_star_search from final_ui (the latter only if
+Flask is installed), pathfinding.dijkstra_path with both search methods, and
+RoverSLAM with each of its planners.
+
+Usage:
+    python bench_planners.py [--maps rubble corridors plaza maze] [--sizes 50 100 200 500 2000]
+                             [--planners ...] [--repeat 3] [--seed 7]
+                             [--output bench_results.json] [--compare old.json] [--no-limits]
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "final_ui"))
+
+from pathfinding import dijkstra_path, distance_field  # noqa: E402
+from slam import PLANNERS, RoverSLAM  # noqa: E402
+from hierarchical import HierarchicalPlanner  # noqa: E402
+import astar as final_astar  # noqa: E402
+
+try:
+    import app as final_app  # Needs Flask
+except ImportError:
+    final_app = None
+
+MAP_KINDS = ("rubble", "corridors", "plaza", "maze")
+
+# Largest map side each planner is run on by default; slow planners would take minutes beyond it,
+# so the dict-based Dijkstra, D* Lite and hierarchical planners sit out the 2000x2000 maps
+SIZE_LIMITS = {
+    "dijkstra_path[heap]": 1000,
+    "RoverSLAM[dijkstra]": 1000,
+    "RoverSLAM[incremental]": 500,
+    "RoverSLAM[hierarchical]": 1000,
+}
+
+def rubble_map(size, rng, density=0.25):
+    """Scattered single-cell debris."""
+    return (rng.random((size, size)) < density).astype(float)
+
+def corridors_map(size, rng, spacing=10, collapse=0.3):
+    """Rooms separated by walls with a doorway per wall segment; some doorways have collapsed."""
+    grid = np.zeros((size, size))
+    grid[::spacing, :] = 1
+    grid[:, ::spacing] = 1
+    for wall in range(0, size, spacing):
+        for segment in range(0, size, spacing):
+            if rng.random() < collapse:
+                continue  # Collapsed: no doorway through this segment
+            door = segment + int(rng.integers(1, spacing))
+            if door < size:
+                grid[wall, door] = 0
+                grid[door, wall] = 0
+    return grid
+
+def plaza_map(size, rng, blocks=None):
+    """Open ground with a few large rectangular ruins."""
+    grid = np.zeros((size, size))
+    for _ in range(blocks or max(1, size // 25)):
+        w, h = rng.integers(size // 20 + 1, size // 6 + 2, 2)
+        x, y = rng.integers(0, size, 2)
+        grid[x:x + w, y:y + h] = 1
+    return grid
+
+def maze_map(size, rng):
+    """Perfect maze carved by an iterative depth-first search over odd cells."""
+    grid = np.ones((size, size))
+    cells = (size - 1) // 2
+    if cells < 1:
+        return np.zeros((size, size))
+    visited = np.zeros((cells, cells), dtype=bool)
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    grid[1, 1] = 0
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= x + dx < cells and 0 <= y + dy < cells and not visited[x + dx, y + dy]]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = options[int(rng.integers(len(options)))]
+        visited[nx, ny] = True
+        grid[2 * nx + 1, 2 * ny + 1] = 0
+        grid[x + nx + 1, y + ny + 1] = 0  # Wall between the two cells
+        stack.append((nx, ny))
+    return grid
+
+MAP_GENERATORS = {
+    "rubble": rubble_map,
+    "corridors": corridors_map,
+    "plaza": plaza_map,
+    "maze": maze_map,
+}
+
+def make_map(kind, size, seed):
+    """
+    Generate a map and a start/goal pair for it.
+    The start is the free cell nearest one corner; the goal is the cell reachable
+    from it that lies nearest the opposite corner.
+    """
+    rng = np.random.default_rng([seed, size, MAP_KINDS.index(kind)])
+    grid = MAP_GENERATORS[kind](size, rng)
+
+    free = np.argwhere(grid == 0)
+    start = tuple(int(v) for v in free[np.argmin(free.sum(axis=1))])
+    reachable = np.argwhere(distance_field(grid, start) >= 0)
+    goal = tuple(int(v) for v in reachable[np.argmax(reachable.sum(axis=1))])
+    return grid, start, goal
+
+def map_border(shape):
+    """Cells just outside a map, so planners without explicit bounds cannot route around it."""
+    rows, cols = shape
+    border = {(-1, y) for y in range(-1, cols + 1)} | {(rows, y) for y in range(-1, cols + 1)}
+    border |= {(x, -1) for x in range(rows)} | {(x, cols) for x in range(rows)}
+    return border
+
+def path_cost(path):
+    """Length of a path, counting diagonal steps as astar.DIAGONAL_COST."""
+    if not path:
+        return None
+    return sum(1.0 if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 else final_astar.DIAGONAL_COST
+               for a, b in zip(path, path[1:]))
+
+def run_astar(grid, obstacles, start, goal):
+    result = final_astar.astar_search(start, goal, obstacles, bounds=(0, 0, grid.shape[0] - 1, grid.shape[1] - 1))
+    return result.path, result.expanded
+
+def run_app_search(grid, obstacles, start, goal):
+    final_app.known_obstacles = obstacles
+    result = final_app.a_star_search(start, goal, deadline=math.inf)
+    return (result.path, result.expanded) if result is not None else ([], None)
+
+def dijkstra_runner(method):
+    def run(grid, obstacles, start, goal):
+        path = dijkstra_path(grid, start, goal, method=method)
+        return path, None
+    return run
+
+def slam_runner(planner):
+    def run(grid, obstacles, start, goal, rover):
+        rover.position = start
+        rover.goals = [goal]
+        rover.path = []
+        rover.dijkstra_path()
+        expanded = rover.incremental_planner.expansions if rover.incremental_planner is not None else None
+        return rover.path, expanded
+    return run
+
+def make_rover(grid, planner):
+    rover = RoverSLAM(map_size=grid.shape, planner=planner)
+    rover.map[...] = grid
+    if rover.hierarchical_planner is not None:
+        # Rebuild the cluster borders for the loaded map; this preprocessing is not timed
+        rover.hierarchical_planner = HierarchicalPlanner(rover.map, rover.hierarchical_planner.cluster_size)
+    return rover
+
+def planner_table():
+    planners = {"astar.astar": run_astar}
+    if final_app is not None:
+        planners["app.a_star_search"] = run_app_search
+    planners["dijkstra_path[heap]"] = dijkstra_runner("heap")
+    planners["dijkstra_path[wavefront]"] = dijkstra_runner("wavefront")
+    for planner in PLANNERS:
+        planners[f"RoverSLAM[{planner}]"] = slam_runner(planner)
+    return planners
+
+def measure(name, run, grid, obstacles, start, goal, repeat):
+    """Best-of-`repeat` wall time, then one extra run under tracemalloc for peak memory."""
+    is_rover = name.startswith("RoverSLAM")
+
+    def call(rover=None):
+        began = time.perf_counter()
+        if is_rover:
+            path, expanded = run(grid, obstacles, start, goal, rover)
+        else:
+            path, expanded = run(grid, obstacles, start, goal)
+        return time.perf_counter() - began, path, expanded
+
+    def fresh_rover():
+        # A fresh rover per run so caches and incremental state do not carry over
+        return make_rover(grid, name[len("RoverSLAM["):-1]) if is_rover else None
+
+    times = []
+    for _ in range(repeat):
+        elapsed, path, expanded = call(fresh_rover())
+        times.append(elapsed)
+
+    rover = fresh_rover()
+    tracemalloc.start()
+    try:
+        call(rover)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "time": min(times),
+        "expanded": expanded,
+        "peak_memory": peak,
+        "path_cost": path_cost(path),
+        "found": bool(path)
+    }
+
+def compare(results, previous_file):
+    """Print the time ratio of each result against the same case in an earlier results file."""
+    with open(previous_file) as f:
+        previous = {(r["map"], r["size"], r["planner"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {previous_file} (ratio > 1 means slower now):")
+    for r in results:
+        old = previous.get((r["map"], r["size"], r["planner"]))
+        if old and old["time"] > 0:
+            flag = "  <-- cost changed" if old["path_cost"] != r["path_cost"] else ""
+            print(f"  {r['map']:>9} {r['size']:>5} {r['planner']:<26} {r['time'] / old['time']:6.2f}x{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every path planner on generated maps.")
+    parser.add_argument("--maps", nargs="+", choices=MAP_KINDS, default=list(MAP_KINDS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50, 100, 200, 500, 2000])
+    parser.add_argument("--planners", nargs="+", help="Planner names to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--no-limits", action="store_true", help="Ignore SIZE_LIMITS")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # RoverSLAM logs every plan
+    planners = planner_table()
+    if args.planners:
+        unknown = set(args.planners) - set(planners)
+        if unknown:
+            parser.error(f"Unknown planners {sorted(unknown)}; choose from {sorted(planners)}")
+        planners = {name: planners[name] for name in args.planners}
+
+    results = []
+    for kind in args.maps:
+        for size in args.sizes:
+            grid, start, goal = make_map(kind, size, args.seed)
+            obstacles = {(int(x), int(y)) for x, y in np.argwhere(grid == 1)}
+            print(f"{kind} {size}x{size}: {len(obstacles)} obstacles, {start} -> {goal}")
+            # app.a_star_search sizes its own search region, so wall the map in to keep its routes on it
+            obstacles |= map_border(grid.shape)
+            for name, run in planners.items():
+                limit = SIZE_LIMITS.get(name)
+                if limit is not None and size > limit and not args.no_limits:
+                    print(f"  {name:<26} skipped (size limit {limit})")
+                    continue
+                result = measure(name, run, grid, obstacles, start, goal, args.repeat)
+                result.update({"map": kind, "size": size, "planner": name})
+                results.append(result)
+                cost = f"{result['path_cost']:.1f}" if result["found"] else "no path"
+                print(f"  {name:<26} {result['time']:8.4f}s  expanded={result['expanded']}  "
+                      f"peak={result['peak_memory'] / 1024:.0f}KiB  cost={cost}")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import heapq
+import logging
+from tiled_map import cell_checker  # Bounds check shared by dense and tiled maps
+
+INF = float('inf')
+
+class DStarLite:
+    """
+    Incremental shortest-path planner (D* Lite) on a 4-connected occupancy grid.
+
+    The search runs backwards from the goal, so its state stays valid while the
+    rover moves. When cells change, only the vertices whose costs are affected
+    are re-expanded instead of throwing the whole search away.
+    The map (a NumPy array or a TiledMap) is read live (0 for free space,
+    1 for obstacles); call update_cells() after changing it.
+    """
+
+    def __init__(self, map, start, goal):
+        self.map = map
+        self.on_map = cell_checker(map)
+        self.start = start
+        self.goal = goal
+        self.km = 0  # Key modifier accumulated as the start moves
+        self.last_start = start
+        self.g = {}
+        self.rhs = {goal: 0}
+        self.open_heap = []
+        self.open_keys = {}  # Node -> key of its live heap entry
+        self.expansions = 0  # Total vertices expanded, for comparing replan costs
+
+        self._push(goal, self._calculate_key(goal))
+
+    @staticmethod
+    def _heuristic(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def _is_free(self, pos):
+        return self.on_map(pos) and self.map[pos] == 0
+
+    def _neighbors(self, pos):
+        x, y = pos
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # 4-directional movement
+            next_pos = (x + dx, y + dy)
+            if self.on_map(next_pos):
+                yield next_pos
+
+    def _cost(self, a, b):
+        """Cost of moving between adjacent cells; infinite if either is blocked."""
+        if self.map[a] != 0 or self.map[b] != 0:
+            return INF
+        return 1
+
+    def _calculate_key(self, pos):
+        best = min(self.g.get(pos, INF), self.rhs.get(pos, INF))
+        return (best + self._heuristic(self.start, pos) + self.km, best)
+
+    def _push(self, pos, key):
+        self.open_keys[pos] = key
+        heapq.heappush(self.open_heap, (key, pos))
+
+    def _top(self):
+        """Return the smallest live (key, node) entry, dropping stale ones."""
+        while self.open_heap:
+            key, pos = self.open_heap[0]
+            if self.open_keys.get(pos) == key:
+                return key, pos
+            heapq.heappop(self.open_heap)
+        return (INF, INF), None
+
+    def _update_vertex(self, pos):
+        if pos != self.goal:
+            self.rhs[pos] = min((self._cost(pos, n) + self.g.get(n, INF) for n in self._neighbors(pos)), default=INF)
+        self.open_keys.pop(pos, None)
+        if self.g.get(pos, INF) != self.rhs.get(pos, INF):
+            self._push(pos, self._calculate_key(pos))
+
+    def compute_shortest_path(self):
+        """Expand vertices until the start is locally consistent."""
+        while True:
+            top_key, pos = self._top()
+            start_g = self.g.get(self.start, INF)
+            start_rhs = self.rhs.get(self.start, INF)
+            if pos is None or (top_key >= self._calculate_key(self.start) and start_rhs == start_g):
+                return
+
+            heapq.heappop(self.open_heap)
+            del self.open_keys[pos]
+            self.expansions += 1
+
+            new_key = self._calculate_key(pos)
+            if top_key < new_key:
+                self._push(pos, new_key)  # Key is out of date since the start moved
+            elif self.g.get(pos, INF) > self.rhs.get(pos, INF):
+                self.g[pos] = self.rhs[pos]
+                for n in self._neighbors(pos):
+                    self._update_vertex(n)
+            else:
+                self.g[pos] = INF
+                self._update_vertex(pos)
+                for n in self._neighbors(pos):
+                    self._update_vertex(n)
+
+    def move_start(self, new_start):
+        """Record that the rover moved; keeps all search state."""
+        self.km += self._heuristic(self.last_start, new_start)
+        self.last_start = new_start
+        self.start = new_start
+
+    def update_cells(self, cells):
+        """
+        Repair the search after the given cells changed on the map.
+        Only vertices adjacent to a changed cell are re-queued.
+        """
+        affected = set()
+        for cell in cells:
+            affected.add(cell)
+            affected.update(self._neighbors(cell))
+        for pos in affected:
+            self._update_vertex(pos)
+
+    def path(self):
+        """
+        Plan (or repair) and return the path from the current start to the goal.
+        Returns an empty list if the goal is unreachable.
+        """
+        self.compute_shortest_path()
+        if self.g.get(self.start, INF) == INF or not self._is_free(self.start):
+            return []
+
+        path = [self.start]
+        visited = {self.start}
+        current = self.start
+        while current != self.goal:
+            current = min(self._neighbors(current), key=lambda n: self._cost(current, n) + self.g.get(n, INF))
+            if current in visited:
+                logging.error(f"D* Lite path reconstruction looped at {current}")
+                return []
+            path.append(current)
+            visited.add(current)
+        return path
@@ -0,0 +1,265 @@
+import heapq
+import logging
+from collections import deque
+
+# Entrances at least this wide get a transition at each end instead of one in the middle
+WIDE_ENTRANCE = 6
+
+class HierarchicalPlanner:
+    """
+    HPA*-style hierarchical path planner for large occupancy grids.
+
+    The map (0 for free space, 1 for obstacles) is split into square clusters.
+    Free cells facing each other across a cluster border form entrances, and a
+    few cells of each entrance become transition nodes of an abstract graph.
+    Transition nodes of the same cluster are linked by their shortest
+    in-cluster distance, computed the first time a cluster is needed and kept
+    until an obstacle inside that cluster changes.
+
+    Long routes are searched on the abstract graph and then refined into
+    cell-by-cell paths one cluster at a time.
+    """
+
+    def __init__(self, map, cluster_size=16):
+        if cluster_size < 2:
+            raise ValueError("Cluster size must be at least 2.")
+
+        self.map = map
+        self.cluster_size = cluster_size
+        self.rows, self.cols = map.shape
+        self.cluster_rows = -(-self.rows // cluster_size)
+        self.cluster_cols = -(-self.cols // cluster_size)
+
+        self.borders = {}  # (cluster, cluster) -> list of (cell, cell) transition pairs
+        self.intra_edges = {}  # cluster -> {node: {node: cost}}, filled on demand
+
+        for cx in range(self.cluster_rows):
+            for cy in range(self.cluster_cols):
+                if cx + 1 < self.cluster_rows:
+                    self._build_border((cx, cy), (cx + 1, cy))
+                if cy + 1 < self.cluster_cols:
+                    self._build_border((cx, cy), (cx, cy + 1))
+
+        logging.info(f"Hierarchical planner built {self.cluster_rows}x{self.cluster_cols} clusters "
+                     f"of size {cluster_size} with {sum(len(p) for p in self.borders.values())} transitions")
+
+    def cluster_of(self, pos):
+        return (pos[0] // self.cluster_size, pos[1] // self.cluster_size)
+
+    def _cluster_bounds(self, cluster):
+        x0 = cluster[0] * self.cluster_size
+        y0 = cluster[1] * self.cluster_size
+        return x0, min(x0 + self.cluster_size, self.rows), y0, min(y0 + self.cluster_size, self.cols)
+
+    def _build_border(self, first, second):
+        """Find the entrances between two adjacent clusters and pick their transition pairs."""
+        if second[0] != first[0]:
+            # Clusters stacked along x: the border runs along y
+            x = second[0] * self.cluster_size
+            _, _, y0, y1 = self._cluster_bounds(first)
+            pairs = [((x - 1, y), (x, y)) for y in range(y0, y1)]
+        else:
+            y = second[1] * self.cluster_size
+            x0, x1, _, _ = self._cluster_bounds(first)
+            pairs = [((x, y - 1), (x, y)) for x in range(x0, x1)]
+
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and self.map[a] == 0 and self.map[b] == 0:
+                run.append((a, b))
+                continue
+            if len(run) >= WIDE_ENTRANCE:
+                transitions.extend((run[0], run[-1]))
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+
+        self.borders[(first, second)] = transitions
+
+    def _neighbor_clusters(self, cluster):
+        cx, cy = cluster
+        for other in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+            if 0 <= other[0] < self.cluster_rows and 0 <= other[1] < self.cluster_cols:
+                yield other
+
+    def _border_key(self, first, second):
+        return (first, second) if first <= second else (second, first)
+
+    def _transition_nodes(self, cluster):
+        """Transition cells lying inside `cluster`, mapped to their partners across the border."""
+        nodes = {}
+        for other in self._neighbor_clusters(cluster):
+            for a, b in self.borders.get(self._border_key(cluster, other), []):
+                inside, outside = (a, b) if self.cluster_of(a) == cluster else (b, a)
+                nodes.setdefault(inside, []).append(outside)
+        return nodes
+
+    def _local_search(self, source, cluster, targets=None):
+        """
+        Breadth-first search from `source` restricted to one cluster.
+        Stops early once every cell in `targets` is found. Returns (distances, parents).
+        """
+        x0, x1, y0, y1 = self._cluster_bounds(cluster)
+        # Plain nested lists are much faster to index cell by cell than the NumPy map
+        free = (self.map[x0:x1, y0:y1] == 0).tolist()
+        width, height = x1 - x0, y1 - y0
+
+        distances = {source: 0}
+        parents = {source: None}
+        remaining = set(targets) - {source} if targets is not None else None
+        queue = deque([source])
+
+        while queue:
+            current = queue.popleft()
+            x, y = current
+            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # 4-directional movement
+                next_pos = (x + dx, y + dy)
+                lx, ly = next_pos[0] - x0, next_pos[1] - y0
+                if not (0 <= lx < width and 0 <= ly < height) or not free[lx][ly] or next_pos in distances:
+                    continue
+                distances[next_pos] = distances[current] + 1
+                parents[next_pos] = current
+                queue.append(next_pos)
+                if remaining is not None:
+                    remaining.discard(next_pos)
+                    if not remaining:
+                        return distances, parents
+        return distances, parents
+
+    def _cluster_edges(self, cluster):
+        """
+        Abstract-graph edges leaving the cluster's transition nodes, computed on first use:
+        in-cluster distances to the other transition nodes plus the unit step across the border.
+        """
+        if cluster not in self.intra_edges:
+            transitions = self._transition_nodes(cluster)
+            nodes = list(transitions)
+            edges = {node: {partner: 1 for partner in transitions[node]} for node in nodes}
+            for i, node in enumerate(nodes):
+                distances, _ = self._local_search(node, cluster, nodes[i + 1:])
+                for other in nodes[i + 1:]:
+                    if other in distances:
+                        edges[node][other] = distances[other]
+                        edges[other][node] = distances[other]
+            self.intra_edges[cluster] = edges
+        return self.intra_edges[cluster]
+
+    def _local_path(self, start, goal, cluster):
+        """Cell-by-cell path between two cells of the same cluster, or [] if none stays inside it."""
+        _, parents = self._local_search(start, cluster, [goal])
+        if goal not in parents:
+            return []
+        path = []
+        current = goal
+        while current is not None:
+            path.append(current)
+            current = parents[current]
+        path.reverse()
+        return path
+
+    def update_cells(self, cells):
+        """
+        Refresh cluster data after the given cells changed on the map.
+        Only clusters containing a changed cell, and borders that cell lies on, are rebuilt.
+        """
+        for cell in cells:
+            cluster = self.cluster_of(cell)
+            self.intra_edges.pop(cluster, None)
+
+            x0, x1, y0, y1 = self._cluster_bounds(cluster)
+            on_edge = cell[0] in (x0, x1 - 1) or cell[1] in (y0, y1 - 1)
+            if not on_edge:
+                continue
+            for other in self._neighbor_clusters(cluster):
+                key = self._border_key(cluster, other)
+                self._build_border(*key)
+                self.intra_edges.pop(other, None)
+
+    def find_path(self, start, goal):
+        """Plan a path from start to goal. Returns an empty list if none exists."""
+        _, path = self.nearest_goal_path(start, [goal])
+        return path
+
+    def nearest_goal_path(self, start, goals):
+        """
+        Find the nearest reachable goal with one A* search over the abstract graph.
+        Nearness is measured on the abstract graph, so it matches the flat shortest
+        path closely but not always exactly.
+        Returns a (goal, path) tuple, or (None, []) if no goal is reachable.
+        """
+        if self.map[start] != 0:
+            return None, []
+        goals = [goal for goal in goals if 0 <= goal[0] < self.rows and 0 <= goal[1] < self.cols and self.map[goal] == 0]
+        if start in goals:
+            return start, [start]
+
+        # Temporary edges connecting the start and goals to their clusters' transition nodes
+        start_cluster = self.cluster_of(start)
+        start_nodes = self._transition_nodes(start_cluster)
+        distances, _ = self._local_search(start, start_cluster, list(start_nodes) + goals)
+        extra = {start: {node: distances[node] for node in start_nodes if node in distances and node != start}}
+        goal_set = set()
+        for goal in goals:
+            goal_cluster = self.cluster_of(goal)
+            if goal_cluster == start_cluster and goal in distances:
+                extra[start][goal] = distances[goal]
+            goal_nodes = self._transition_nodes(goal_cluster)
+            goal_distances, _ = self._local_search(goal, goal_cluster, goal_nodes)
+            for node in goal_nodes:
+                if node in goal_distances and node != goal:
+                    extra.setdefault(node, {})[goal] = goal_distances[node]
+            goal_set.add(goal)
+
+        def heuristic(pos):
+            # Manhattan distance to the closest goal keeps the search from flooding every cluster
+            return min((abs(pos[0] - g[0]) + abs(pos[1] - g[1]) for g in goal_set), default=0)
+
+        # A* on the abstract graph, stopping at the first goal settled
+        # Entries are (f, -g, node); ties on f prefer the node furthest along
+        pq = [(heuristic(start), 0, start)]
+        best = {start: 0}
+        previous = {start: None}
+        settled = set()
+        reached = None
+        while pq:
+            _, cost, node = heapq.heappop(pq)
+            cost = -cost
+            if node in settled:
+                continue
+            settled.add(node)
+            if node in goal_set:
+                reached = node
+                break
+
+            neighbors = dict(self._cluster_edges(self.cluster_of(node)).get(node, {}))
+            neighbors.update(extra.get(node, {}))
+            for other, step in neighbors.items():
+                new_cost = cost + step
+                if new_cost < best.get(other, float('inf')):
+                    best[other] = new_cost
+                    previous[other] = node
+                    heapq.heappush(pq, (new_cost + heuristic(other), -new_cost, other))
+
+        if reached is None:
+            return None, []
+
+        abstract = []
+        node = reached
+        while node is not None:
+            abstract.append(node)
+            node = previous[node]
+        abstract.reverse()
+
+        return reached, self._refine(abstract)
+
+    def _refine(self, abstract):
+        """Expand an abstract node sequence into a cell-by-cell path."""
+        path = [abstract[0]]
+        for a, b in zip(abstract, abstract[1:]):
+            if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and self.cluster_of(a) != self.cluster_of(b):
+                path.append(b)  # Step across a cluster border
+                continue
+            segment = self._local_path(a, b, self.cluster_of(a))
+            path.extend(segment[1:])
+        return path
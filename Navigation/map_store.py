@@ -0,0 +1,113 @@
+import logging
+import mmap
+import os
+import time
+import numpy as np
+
+# Rows per dirty tile; a tile is a contiguous band of rows in the file
+TILE_ROWS = 64
+
+class MapStore:
+    """
+    Occupancy map kept in a .npy file and used in place through mmap.
+
+    Opening maps the file instead of reading it, so start-up time does not
+    depend on the map size and pages are only loaded as the planners touch
+    them. The array returned by `array` is an ordinary NumPy view of the
+    mapping and can be used anywhere a dense map is expected.
+
+    Writes land in the page cache immediately. mark_dirty() records which
+    bands of TILE_ROWS rows changed, and flush() syncs only those byte ranges
+    to disk, so a mission that maps a few cells never rewrites the whole file.
+    The file stays a valid .npy file and can also be read with numpy.load().
+    """
+
+    def __init__(self, path, shape=None, dtype=np.uint8, flush_interval=5.0):
+        """
+        Open `path`, creating it with the given shape (all free) if it does not exist.
+        An existing file keeps its own shape; `shape` must match it if given.
+        Changes are synced by maybe_flush() at most every `flush_interval` seconds.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.dirty = set()  # Indices of row bands changed since the last flush
+        self.last_flush = time.monotonic()
+
+        if not os.path.exists(path):
+            if shape is None:
+                raise ValueError(f"Map file {path} does not exist and no shape was given to create it.")
+            self._create(path, shape, dtype)
+
+        self.file = open(path, "r+b")
+        version = np.lib.format.read_magic(self.file)
+        if version == (1, 0):
+            shape_on_disk, fortran_order, dtype_on_disk = np.lib.format.read_array_header_1_0(self.file)
+        else:
+            shape_on_disk, fortran_order, dtype_on_disk = np.lib.format.read_array_header_2_0(self.file)
+        if fortran_order or len(shape_on_disk) != 2:
+            self.file.close()
+            raise ValueError(f"Map file {path} must hold a 2-D array in C order.")
+        if shape is not None and tuple(shape) != shape_on_disk:
+            self.file.close()
+            raise ValueError(f"Map file {path} has shape {shape_on_disk}, expected {tuple(shape)}.")
+        self.offset = self.file.tell()
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+        self.array = np.frombuffer(self.mmap, dtype=dtype_on_disk, count=shape_on_disk[0] * shape_on_disk[1],
+                                   offset=self.offset).reshape(shape_on_disk)
+        self.row_bytes = self.array.strides[0]
+        logging.info(f"Opened map store {path} with shape {shape_on_disk}")
+
+    @staticmethod
+    def _create(path, shape, dtype):
+        """Write a header and grow the file to full size; the data is sparse zeros, not written out."""
+        with open(path, "wb") as f:
+            np.lib.format.write_array_header_1_0(f, {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                "fortran_order": False,
+                "shape": tuple(shape)
+            })
+            f.truncate(f.tell() + int(np.prod(shape)) * np.dtype(dtype).itemsize)
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    def mark_dirty(self, cells):
+        """Record that the given (x, y) cells were written."""
+        for x, _ in cells:
+            self.dirty.add(x // TILE_ROWS)
+
+    def flush(self):
+        """Sync every dirty row band to disk."""
+        granularity = mmap.ALLOCATIONGRANULARITY
+        for band in sorted(self.dirty):
+            start = self.offset + band * TILE_ROWS * self.row_bytes
+            end = min(start + TILE_ROWS * self.row_bytes, self.offset + self.array.nbytes)
+            aligned = start - start % granularity  # msync needs a page-aligned offset
+            self.mmap.flush(aligned, end - aligned)
+        flushed = len(self.dirty)
+        self.dirty.clear()
+        self.last_flush = time.monotonic()
+        return flushed
+
+    def maybe_flush(self):
+        """Flush if anything is dirty and flush_interval has passed since the last flush."""
+        if self.dirty and time.monotonic() - self.last_flush >= self.flush_interval:
+            return self.flush()
+        return 0
+
+    def close(self):
+        """
+        Flush outstanding changes and release the mapping. If other views of the
+        array are still alive the mapping stays open until they are garbage collected.
+        """
+        if self.mmap.closed:
+            return
+        self.flush()
+        self.array = None
+        try:
+            self.mmap.close()
+        except BufferError:
+            logging.warning(f"Map store {self.path} is still in use; leaving it mapped")
+            return
+        self.file.close()
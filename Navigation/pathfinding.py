@@ -1,8 +1,28 @@
 import heapq
+import math
+from array import array
+import numpy as np
+from tiled_map import cell_checker  # Bounds check shared by dense and tiled maps
 
-def dijkstra_path(map, start, goal):
-    """Implements Dijkstra's Algorithm to find the shortest path from current position to goal."""
-    rows, cols = map.shape
+# Steps a wavefront parent-direction code leads back toward the flood source
+PARENT_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Search methods accepted by dijkstra_path and nearest_goal_path
+SEARCH_METHODS = ("heap", "wavefront")
+
+def dijkstra_path(map, start, goal, method="heap"):
+    """
+    Implements Dijkstra's Algorithm to find the shortest path from current position to goal.
+    With method="wavefront" the unit-cost map is flooded with wavefront_flood instead
+    of the Python heap. Returns an empty list when the goal is unreachable.
+    """
+    if method == "wavefront":
+        distances, parents = wavefront_flood(map, [start], targets=[goal])
+        return wavefront_path(distances, parents, goal)[::-1]
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Unknown search method '{method}'. Must be one of {SEARCH_METHODS}.")
+
+    on_map = cell_checker(map)
 
     pq = [(0, start)]  # (cost, position)
     distances = {start: 0}
@@ -21,13 +41,16 @@ def dijkstra_path(map, start, goal):
         x, y = current_position
         for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # 4-directional movement
             next_pos = (x + dx, y + dy)
-            if 0 <= next_pos[0] < rows and 0 <= next_pos[1] < cols and map[next_pos] == 0:
+            if on_map(next_pos) and map[next_pos] == 0:
                 new_cost = current_cost + 1
                 if next_pos not in distances or new_cost < distances[next_pos]:
                     distances[next_pos] = new_cost
                     prev_nodes[next_pos] = current_position
                     heapq.heappush(pq, (new_cost, next_pos))
 
+    if goal not in prev_nodes:
+        return []  # Goal is blocked or sealed off from start
+
     # Reconstruct path from goal to start
     path = []
     current = goal
@@ -37,3 +60,222 @@ def dijkstra_path(map, start, goal):
     path.reverse()
 
     return path
+
+def nearest_goal_path(map, start, goals, method="heap"):
+    """
+    Finds the nearest reachable goal and the path to it with a single Dijkstra flood.
+
+    The search starts at `start` and stops as soon as it settles any cell in
+    `goals`, so the cost does not grow with the number of goals.
+    method="wavefront" floods with wavefront_flood instead of the Python heap.
+    Returns a (goal, path) tuple, or (None, []) if no goal is reachable.
+    """
+    if method == "wavefront":
+        distances, parents = wavefront_flood(map, [start], targets=goals)
+        reached = [goal for goal in goals if _on_map(map, goal) and distances[goal] >= 0]
+        if not reached:
+            return None, []
+        nearest = min(reached, key=lambda goal: distances[goal])
+        return nearest, wavefront_path(distances, parents, nearest)[::-1]
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Unknown search method '{method}'. Must be one of {SEARCH_METHODS}.")
+
+    on_map = cell_checker(map)
+    targets = set(goals)
+
+    pq = [(0, start)]  # (cost, position)
+    distances = {start: 0}
+    prev_nodes = {start: None}
+    visited = set()
+    reached = None
+
+    while pq:
+        current_cost, current_position = heapq.heappop(pq)
+        if current_position in visited:
+            continue
+        visited.add(current_position)
+
+        if current_position in targets:
+            reached = current_position
+            break  # First goal settled is the nearest one
+
+        x, y = current_position
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # 4-directional movement
+            next_pos = (x + dx, y + dy)
+            if on_map(next_pos) and map[next_pos] == 0:
+                new_cost = current_cost + 1
+                if next_pos not in distances or new_cost < distances[next_pos]:
+                    distances[next_pos] = new_cost
+                    prev_nodes[next_pos] = current_position
+                    heapq.heappush(pq, (new_cost, next_pos))
+
+    if reached is None:
+        return None, []
+
+    # Reconstruct path from the reached goal back to start
+    path = []
+    current = reached
+    while current is not None:
+        path.append(current)
+        current = prev_nodes.get(current)
+    path.reverse()
+
+    return reached, path
+
+def _on_map(map, pos):
+    return 0 <= pos[0] < map.shape[0] and 0 <= pos[1] < map.shape[1]
+
+def wavefront_flood(map, sources, targets=None):
+    """
+    Breadth-first flood of a unit-cost map that expands a whole frontier per iteration.
+
+    The frontier is a NumPy array of flat cell indices. Each wave shifts it one
+    cell in each of the four directions with array arithmetic and keeps the
+    free, unvisited cells it lands on, so no Python code runs per cell. If
+    `targets` is given, flooding stops after the first wave that reaches any of them.
+
+    Returns:
+        (distances, parents): an int32 array of moves from the nearest source
+        (-1 where unreached) and an int8 array holding, for each reached cell,
+        the index into PARENT_STEPS of the step back toward the source (-1 for
+        sources and unreached cells). Both have the map's shape.
+    """
+    rows, cols = map.shape
+    visited = (map != 0).ravel()  # Obstacles count as visited so they are never entered
+    distances = np.full(rows * cols, -1, dtype=np.int32)
+    parents = np.full(rows * cols, -1, dtype=np.int8)
+
+    starts = sorted({x * cols + y for x, y in sources if _on_map(map, (x, y)) and map[x, y] == 0})
+    frontier = np.array(starts, dtype=np.int64)
+    visited[frontier] = True
+    distances[frontier] = 0
+
+    target_mask = None
+    if targets is not None:
+        target_mask = np.zeros(rows * cols, dtype=bool)
+        for x, y in targets:
+            if _on_map(map, (x, y)):
+                target_mask[x * cols + y] = True
+        if target_mask[frontier].any():
+            return distances.reshape(map.shape), parents.reshape(map.shape)
+
+    wave = 0
+    while frontier.size:
+        wave += 1
+        fx, fy = np.divmod(frontier, cols)
+        reached = []
+        for code, (dx, dy) in enumerate(PARENT_STEPS):
+            # Cells one step before the frontier in this direction; their step back is (dx, dy)
+            nx, ny = fx - dx, fy - dy
+            inside = (nx >= 0) & (nx < rows) & (ny >= 0) & (ny < cols)
+            cells = (nx * cols + ny)[inside]
+            cells = cells[~visited[cells]]
+            visited[cells] = True
+            parents[cells] = code
+            reached.append(cells)
+        frontier = np.concatenate(reached)
+        distances[frontier] = wave
+        if target_mask is not None and target_mask[frontier].any():
+            break
+
+    return distances.reshape(map.shape), parents.reshape(map.shape)
+
+def wavefront_path(distances, parents, cell):
+    """
+    Follow wavefront_flood parent directions from `cell` back to its source.
+    Returns the path from cell to the source, or an empty list if cell was not reached.
+    """
+    if not (0 <= cell[0] < distances.shape[0] and 0 <= cell[1] < distances.shape[1]) or distances[cell] < 0:
+        return []
+    path = [cell]
+    current = cell
+    while distances[current] > 0:
+        dx, dy = PARENT_STEPS[parents[current]]
+        current = (current[0] + dx, current[1] + dy)
+        path.append(current)
+    return path
+
+def distance_field(map, source):
+    """Moves from `source` to every cell of a unit-cost map (-1 where unreachable), via wavefront_flood."""
+    distances, _ = wavefront_flood(map, [source])
+    return distances
+
+def weighted_nearest_goal_path(map, costs, start, goals):
+    """
+    A* to the cheapest-to-reach goal on a map with per-cell traversal costs.
+
+    Entering a cell costs costs[cell] (a float array with the map's shape,
+    every entry positive). Costs, obstacles and search state are read through
+    flat memoryviews and arrays indexed by x * cols + y, so no per-cell dicts
+    or tuples are built. The heuristic is the Manhattan distance to the closest
+    goal times the smallest cost on the map, which never overestimates.
+    Returns a (goal, path) tuple, or (None, []) if no goal is reachable.
+    """
+    rows, cols = map.shape
+    if costs.shape != map.shape:
+        raise ValueError(f"Cost array shape {costs.shape} does not match map shape {map.shape}.")
+    if not _on_map(map, start) or map[start] != 0:
+        return None, []
+
+    cost = memoryview(np.ascontiguousarray(costs, dtype=np.float32).ravel())
+    free = memoryview((map == 0).ravel())
+    targets = {x * cols + y for x, y in goals if _on_map(map, (x, y)) and map[x, y] == 0}
+    if not targets:
+        return None, []
+
+    min_cost = float(costs.min())
+    goal_cells = [divmod(index, cols) for index in targets]
+    use_heuristic = len(goal_cells) <= 8  # Evaluating many goals per push costs more than it saves
+
+    def heuristic(x, y):
+        if not use_heuristic:
+            return 0.0
+        return min_cost * min(abs(x - gx) + abs(y - gy) for gx, gy in goal_cells)
+
+    start_index = start[0] * cols + start[1]
+    g_score = array('d', [math.inf]) * (rows * cols)
+    parent = array('l', [-1]) * (rows * cols)
+    closed = bytearray(rows * cols)
+    g_score[start_index] = 0.0
+    pq = [(heuristic(*start), start_index)]  # (f, flat index)
+    reached = None
+
+    while pq:
+        _, current = heapq.heappop(pq)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        if current in targets:
+            reached = current
+            break
+
+        x, y = divmod(current, cols)
+        current_g = g_score[current]
+        for neighbor, nx, ny in ((current - cols, x - 1, y), (current + cols, x + 1, y),
+                                 (current - 1, x, y - 1), (current + 1, x, y + 1)):
+            if not (0 <= nx < rows and 0 <= ny < cols) or not free[neighbor] or closed[neighbor]:
+                continue
+            new_g = current_g + cost[neighbor]
+            if new_g < g_score[neighbor]:
+                g_score[neighbor] = new_g
+                parent[neighbor] = current
+                heapq.heappush(pq, (new_g + heuristic(nx, ny), neighbor))
+
+    if reached is None:
+        return None, []
+
+    path = []
+    current = reached
+    while current != -1:
+        path.append(divmod(current, cols))
+        current = parent[current]
+    path.reverse()
+
+    return divmod(reached, cols), path
+
+def path_cost(costs, path):
+    """Total traversal cost of a path: the cost of every cell entered after the first."""
+    if len(path) < 2:
+        return 0.0
+    xs, ys = zip(*path[1:])
+    return float(costs[list(xs), list(ys)].sum())
@@ -0,0 +1,202 @@
+import logging
+from array import array
+from collections import deque
+import numpy as np
+
+class ReachabilityIndex:
+    """
+    Connected-component labels of a map's free space (4-connected).
+
+    Every free cell carries the label of its component and obstacles carry 0,
+    so whether one cell can reach another is a single label comparison. Labels
+    are kept up to date as cells change instead of being recomputed:
+
+    - A new obstacle can only split its component if the free cells around it
+      are not already connected through the ring of eight cells surrounding
+      it. When they are not, one breadth-first search per side runs in
+      lockstep; searches that meet are merged, and a side whose search runs
+      dry is the smaller piece and gets a new label. The work is proportional
+      to the pieces split off, not to the whole component.
+    - A cleared cell joins the components of its free neighbors; smaller
+      components are relabelled into the largest with one vectorized write.
+
+    The map is read live (0 for free space, 1 for obstacles); call
+    add_obstacles() or clear_cells() after changing it.
+    """
+
+    def __init__(self, map):
+        self.map = map
+        self.rows, self.cols = map.shape
+        self.labels = array('i', bytes(4 * self.rows * self.cols))  # Flat x * cols + y, 0 = blocked
+        self.label_view = np.frombuffer(self.labels, dtype=np.int32)  # Same memory, for bulk writes
+        self.sizes = {}  # label -> number of cells
+        self.next_label = 1
+        self._label_all()
+        logging.info(f"Reachability index found {len(self.sizes)} free-space components")
+
+    def _neighbors(self, index):
+        x, y = divmod(index, self.cols)
+        if x > 0:
+            yield index - self.cols
+        if x + 1 < self.rows:
+            yield index + self.cols
+        if y > 0:
+            yield index - 1
+        if y + 1 < self.cols:
+            yield index + 1
+
+    def _new_label(self):
+        label = self.next_label
+        self.next_label += 1
+        return label
+
+    def _label_all(self):
+        labels = self.labels
+        free = (self.map == 0).ravel().tolist()
+        for index in range(len(free)):
+            if not free[index] or labels[index]:
+                continue
+            label = self._new_label()
+            labels[index] = label
+            count = 1
+            queue = deque([index])
+            while queue:
+                current = queue.popleft()
+                for neighbor in self._neighbors(current):
+                    if free[neighbor] and not labels[neighbor]:
+                        labels[neighbor] = label
+                        count += 1
+                        queue.append(neighbor)
+            self.sizes[label] = count
+
+    def label(self, pos):
+        """Component label of a cell, or 0 if it is blocked or off the map."""
+        if not (0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols):
+            return 0
+        return self.labels[pos[0] * self.cols + pos[1]]
+
+    def reachable(self, a, b):
+        """True if free cells a and b lie in the same component."""
+        label = self.label(a)
+        return label != 0 and label == self.label(b)
+
+    def _ring_groups(self, index):
+        """
+        Group the free 4-neighbors of a cell by whether they are connected through
+        the eight cells around it. Returns a list of groups, each one neighbor index.
+        """
+        x, y = divmod(index, self.cols)
+        # Ring in order, so consecutive free entries are 4-adjacent to each other
+        ring = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+        free = []
+        for dx, dy in ring:
+            nx, ny = x + dx, y + dy
+            free.append(0 <= nx < self.rows and 0 <= ny < self.cols and self.labels[nx * self.cols + ny] != 0)
+
+        if all(free):
+            return [index - self.cols]  # Fully open ring: one group
+
+        # Walk the ring from a blocked entry so every run of free cells is seen whole
+        begin = free.index(False)
+        groups = []
+        run_has_neighbor = False
+        for k in range(1, 9):
+            i = (begin + k) % 8
+            if not free[i]:
+                run_has_neighbor = False
+                continue
+            dx, dy = ring[i]
+            if (dx == 0 or dy == 0) and not run_has_neighbor:
+                groups.append((x + dx) * self.cols + (y + dy))
+                run_has_neighbor = True
+        return groups
+
+    def _split(self, index, label):
+        """Relabel the pieces of `label`'s component cut off by the new obstacle at `index`."""
+        seeds = self._ring_groups(index)
+        if len(seeds) <= 1:
+            return
+
+        labels = self.labels
+        owner = {seed: i for i, seed in enumerate(seeds)}
+        queues = [deque([seed]) for seed in seeds]
+        members = [[seed] for seed in seeds]
+        root = list(range(len(seeds)))  # Union-find over the searches
+
+        def find(i):
+            while root[i] != i:
+                root[i] = root[root[i]]
+                i = root[i]
+            return i
+
+        active = set(range(len(seeds)))  # Roots of search groups still growing
+        while len(active) > 1:
+            for group in list(active):
+                if group not in active:
+                    continue
+                # Advance every search in this group by one cell
+                searches = [i for i in range(len(seeds)) if find(i) == group and queues[i]]
+                if not searches:
+                    # Ran dry without meeting the others: a separate component
+                    new = self._new_label()
+                    cells = [cell for i in range(len(seeds)) if find(i) == group for cell in members[i]]
+                    for cell in cells:
+                        labels[cell] = new
+                    self.sizes[new] = len(cells)
+                    self.sizes[label] -= len(cells)
+                    active.discard(group)
+                    if len(active) <= 1:
+                        break
+                    continue
+                for i in searches:
+                    current = queues[i].popleft()
+                    for neighbor in self._neighbors(current):
+                        if labels[neighbor] != label:
+                            continue
+                        other = owner.get(neighbor)
+                        if other is None:
+                            owner[neighbor] = i
+                            members[i].append(neighbor)
+                            queues[i].append(neighbor)
+                            continue
+                        a, b = find(i), find(other)
+                        if a != b:
+                            root[b] = a
+                            active.discard(b)
+                            active.add(a)
+
+    def add_obstacles(self, cells):
+        """Update labels after the given cells became obstacles."""
+        for cell in cells:
+            if not (0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols):
+                continue
+            index = cell[0] * self.cols + cell[1]
+            label = self.labels[index]
+            if not label:
+                continue
+            self.labels[index] = 0
+            self.sizes[label] -= 1
+            if self.sizes[label] == 0:
+                del self.sizes[label]
+                continue
+            self._split(index, label)
+
+    def clear_cells(self, cells):
+        """Update labels after the given cells became free."""
+        for cell in cells:
+            if not (0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols):
+                continue
+            index = cell[0] * self.cols + cell[1]
+            if self.labels[index]:
+                continue
+            joined = {self.labels[n] for n in self._neighbors(index)} - {0}
+            if not joined:
+                label = self._new_label()
+                self.sizes[label] = 0
+            else:
+                label = max(joined, key=lambda l: self.sizes[l])
+                for other in joined - {label}:
+                    self.label_view[self.label_view == other] = label
+                    self.sizes[label] += self.sizes.pop(other)
+            self.labels[index] = label
+            self.sizes[label] += 1
@@ -2,7 +2,14 @@ import numpy as np
 import logging
 import time
 import os
-from pathfinding import dijkstra_path  # Import the new dijkstra_path function
+from pathfinding import nearest_goal_path, weighted_nearest_goal_path  # Multi-goal Dijkstra / weighted A* search
+from dstar_lite import DStarLite  # Incremental replanning
+from hierarchical import HierarchicalPlanner  # Cluster-based planning for large maps
+from path_cache import PathCache  # LRU cache of planned paths
+from tour import GoalTour  # Goal visiting order
+from reachability import ReachabilityIndex  # Connected components of free space
+from tiled_map import TiledMap  # Sparse map for open-ended exploration
+from map_store import MapStore  # Memory-mapped map file kept between sessions
 
 # Set up logging
 logging.basicConfig(filename='slam.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -11,76 +18,274 @@ class SLAMError(Exception):
     """Custom exception for SLAM failures."""
     pass
 
+# Path planners RoverSLAM can use: a fresh Dijkstra search on every replan,
+# D* Lite, which keeps its search between moves and repairs it when obstacles appear,
+# HPA*-style hierarchical planning over map clusters for large maps,
+# a NumPy wavefront flood that expands whole BFS layers at once,
+# or weighted A* that minimizes the terrain costs in RoverSLAM.costs instead of the cell count
+PLANNERS = ("dijkstra", "incremental", "hierarchical", "wavefront", "weighted")
+
+# Planners that read the map cell by cell and so also work on a TiledMap
+TILED_PLANNERS = ("dijkstra", "incremental")
+
 class RoverSLAM:
-    def __init__(self, map_size=(20, 20)):
+    def __init__(self, map_size=(20, 20), planner="dijkstra", cluster_size=16, path_cache=None, order_goals=False,
+                 tile_size=None, map_path=None):
         """
         Initialize the SLAM system with a map of given size (default 20x20 grid).
         The grid map stores the environment (0 for free space, 1 for obstacles).
+        `planner` selects how paths are computed, one of PLANNERS; `cluster_size`
+        is the cluster side length used by the hierarchical planner.
+        `path_cache` is an optional PathCache to share with other planners on the same map.
+        With `order_goals` the goals are visited in a planned tour order instead of
+        always heading for the nearest one.
+        With `tile_size` the map is a TiledMap instead: `map_size` is ignored, the rover
+        starts at (0, 0), coordinates may be negative, and memory grows with the mapped
+        area. Only the TILED_PLANNERS work on it.
+        With `map_path` the map lives in a memory-mapped file: an existing file is
+        opened in place with everything learned in earlier sessions, otherwise it is
+        created with `map_size`. Call close() when done to flush the last changes.
         """
-        if not (isinstance(map_size, tuple) and len(map_size) == 2 and all(isinstance(i, int) and i > 0 for i in map_size)):
-            raise SLAMError("Invalid map size. Must be a tuple of two positive integers.")
+        if planner not in PLANNERS:
+            raise SLAMError(f"Unknown planner '{planner}'. Must be one of {PLANNERS}.")
 
-        self.map = np.zeros(map_size)  # Initialize map with free spaces (0s)
-        self.position = (map_size[0] // 2, map_size[1] // 2)  # Start at the center
+        self.tiled = tile_size is not None
+        self.map_store = None
+        if self.tiled and map_path is not None:
+            raise SLAMError("A tiled map cannot be stored in a map file.")
+        if self.tiled:
+            if planner not in TILED_PLANNERS or order_goals:
+                raise SLAMError(f"A tiled map supports only the {TILED_PLANNERS} planners without goal ordering.")
+            self.map = TiledMap(tile_size, margin=tile_size)  # Routes may skirt one tile past the mapped area
+            self.costs = None
+            self.position = (0, 0)
+            self.map.include(self.position)
+        else:
+            if not (isinstance(map_size, tuple) and len(map_size) == 2 and all(isinstance(i, int) and i > 0 for i in map_size)):
+                raise SLAMError("Invalid map size. Must be a tuple of two positive integers.")
+            if map_path is not None:
+                try:
+                    self.map_store = MapStore(map_path, None if os.path.exists(map_path) else map_size)
+                except (OSError, ValueError) as e:
+                    raise SLAMError(f"Could not open map file {map_path}: {e}")
+                self.map = self.map_store.array  # Obstacles learned in earlier sessions
+                map_size = self.map.shape
+            else:
+                self.map = np.zeros(map_size)  # Initialize map with free spaces (0s)
+            self.costs = np.ones(map_size, dtype=np.float32)  # Cost of entering each cell (rubble, slopes, water)
+            self.position = (map_size[0] // 2, map_size[1] // 2)  # Start at the center
         self.orientation = 0  # Rover's initial orientation (angle in degrees)
         self.goals = []  # List of goal positions
         self.path = []  # Path calculated using Dijkstra’s Algorithm
+        self.planner = planner
+        self.incremental_planner = None  # D* Lite search kept between replans
+        self.hierarchical_planner = HierarchicalPlanner(self.map, cluster_size) if planner == "hierarchical" else None
+        self.path_cache = path_cache if path_cache is not None else PathCache()
+        self.goal_tour = GoalTour(self.map) if order_goals else None
+        self.tour_stale = False  # Set when obstacles change the distances the tour was ordered by
+        self.reachability = None  # Component labels, built on first use and updated as obstacles appear
+        self.unreachable_goals = []  # Goals found to be sealed off from the rover at the last replan
 
-        logging.info(f"SLAM system initialized with map size {map_size}")
+        map_description = f"tiles of {tile_size}" if self.tiled else f"map size {map_size}"
+        logging.info(f"SLAM system initialized with {map_description} and {planner} planner")
 
     def set_obstacles(self, obstacle_positions):
         """Manually set obstacles on the map for testing."""
+        changed = []
         for obs in obstacle_positions:
-            if 0 <= obs[0] < self.map.shape[0] and 0 <= obs[1] < self.map.shape[1]:
+            obs = tuple(obs)
+            if self.tiled or (0 <= obs[0] < self.map.shape[0] and 0 <= obs[1] < self.map.shape[1]):
+                if self.map[obs] != 1:
+                    changed.append(obs)
                 self.map[obs] = 1
 
+        # Drop cached paths that cross the new obstacles
+        if changed:
+            self.path_cache.invalidate(changed)
+        # Persist only the changed parts of a stored map, and not on every call
+        if changed and self.map_store is not None:
+            self.map_store.mark_dirty(changed)
+            self.map_store.maybe_flush()
+        # Repair only the affected part of the incremental search
+        if changed and self.incremental_planner is not None:
+            self.incremental_planner.update_cells(changed)
+        # Refresh only the clusters the new obstacles fall in
+        if changed and self.hierarchical_planner is not None:
+            self.hierarchical_planner.update_cells(changed)
+        # Re-label only the components the new obstacles split
+        if changed and self.reachability is not None:
+            self.reachability.add_obstacles(changed)
+        # Goal distances may have grown anywhere, so the tour is re-ordered before the next plan
+        if changed and self.goal_tour is not None:
+            self.goal_tour.invalidate()
+            self.tour_stale = True
+
+    def set_costs(self, positions, costs):
+        """
+        Set the traversal cost of many cells in one vectorized write, e.g. from a sensor sweep.
+        `positions` is a sequence or (n, 2) array of (x, y) cells and `costs` a single
+        positive cost or one per cell. Cells outside the map are ignored.
+        """
+        if self.tiled:
+            raise SLAMError("Traversal costs are not supported on a tiled map.")
+        positions = np.asarray(positions, dtype=np.intp).reshape(-1, 2)
+        try:
+            costs = np.broadcast_to(np.asarray(costs, dtype=np.float32), (len(positions),))
+        except ValueError:
+            raise SLAMError("Costs must be a single value or one value per position.")
+        if not np.all(costs > 0) or not np.all(np.isfinite(costs)):
+            raise SLAMError("Traversal costs must be positive and finite.")
+
+        rows, cols = self.map.shape
+        inside = (positions[:, 0] >= 0) & (positions[:, 0] < rows) & (positions[:, 1] >= 0) & (positions[:, 1] < cols)
+        self.costs[positions[inside, 0], positions[inside, 1]] = costs[inside]
+
+        # Lower costs can open cheaper routes anywhere, so no cached path can be trusted
+        if inside.any():
+            self.path_cache.clear()
+        logging.info(f"Updated traversal costs of {int(inside.sum())} cells")
+
     def set_goals(self, goal_positions):
         """Sets multiple goal positions for path planning."""
         if not isinstance(goal_positions, list) or not all(isinstance(goal, tuple) and len(goal) == 2 for goal in goal_positions):
             raise SLAMError("Goal positions must be a list of tuples (x, y).")
         
         self.goals = goal_positions
+        if self.tiled:
+            # Searches stay inside the map's extent, so it must reach every goal
+            for goal in self.goals:
+                self.map.include(goal)
+        if self.goal_tour is not None:
+            self.goal_tour.set_goals(self.goals)
+            self.order_goals()
         logging.info(f"Goals set to {self.goals}")
 
+    def order_goals(self):
+        """
+        Reorder the goals into a short tour from the current position.
+        Goals that cannot be reached are kept at the end.
+        """
+        ordered, unreachable = self.goal_tour.order(self.position)
+        self.goals = ordered + unreachable
+        self.tour_stale = False
+
+    def reachability_index(self):
+        """The free-space component index, built on first use (None on a tiled map)."""
+        if self.reachability is None and not self.tiled:
+            self.reachability = ReachabilityIndex(self.map)
+        return self.reachability
+
+    def planning_goals(self):
+        """
+        Goals the planners choose between: the next tour stop when ordering goals,
+        otherwise all of them. Goals in a different free-space component than the
+        rover are left out and recorded in unreachable_goals, without any search.
+        """
+        if self.goal_tour is not None:
+            if self.tour_stale:
+                self.order_goals()
+            goals = self.goals[:1]
+        else:
+            goals = self.goals
+
+        index = self.reachability_index()
+        if index is None:
+            return goals
+        unreachable = [goal for goal in self.goals if not index.reachable(self.position, goal)]
+        if unreachable != self.unreachable_goals:
+            if unreachable:
+                logging.warning(f"Goals unreachable from {self.position}: {unreachable}")
+            self.unreachable_goals = unreachable
+        return [goal for goal in goals if goal not in unreachable]
+
     def find_nearest_goal(self):
         """Find the nearest goal from the current position using Dijkstra’s Algorithm."""
+        nearest_goal, _ = self.find_nearest_goal_path()
+        return nearest_goal
+
+    def find_nearest_goal_path(self):
+        """
+        Find the nearest goal and the path to it with one multi-goal Dijkstra search.
+        Returns a (goal, path) tuple, or (None, []) if no goal is reachable.
+        """
         if not self.goals:
             raise SLAMError("No goals set.")
-        
-        nearest_goal = None
-        shortest_distance = float('inf')
-        for goal in self.goals:
-            path = dijkstra_path(self.map, self.position, goal)
-            if path:
-                distance = len(path)
-                if distance < shortest_distance:
-                    shortest_distance = distance
-                    nearest_goal = goal
-        
-        if nearest_goal is not None:
-            return nearest_goal
-        else:
-            return None
+
+        goals = self.planning_goals()
+        if not goals:
+            return None, []
+        if self.planner == "weighted":
+            return weighted_nearest_goal_path(self.map, self.costs, self.position, goals)
+
+        method = "wavefront" if self.planner == "wavefront" else "heap"
+        return nearest_goal_path(self.map, self.position, goals, method=method)
 
     def dijkstra_path(self):
         """Uses the dijkstra_path function from pathfinding.py to find the shortest path."""
         if not self.goals:
             raise SLAMError("Goal positions not set.")
         
-        # Find nearest goal
-        nearest_goal = self.find_nearest_goal()
+        # Find nearest goal together with its path
+        if self.planner == "incremental":
+            nearest_goal, self.path = self.incremental_path()
+        else:
+            nearest_goal, self.path = self.cached_nearest_goal_path()
         if not nearest_goal:
             logging.error("No valid path found to any goal.")
             self.path = []
             return
         
-        self.path = dijkstra_path(self.map, self.position, nearest_goal)
         if self.path:
             logging.info(f"Path found to nearest goal: {self.path}")
         else:
             logging.error("No valid path found.")
             self.path = []
 
+    def cached_nearest_goal_path(self):
+        """
+        Plan to the nearest goal with the Dijkstra or hierarchical planner, reusing
+        a cached path when the rover, the goal list and the map are unchanged.
+        Returns a (goal, path) tuple like find_nearest_goal_path.
+        """
+        goals = self.planning_goals()
+        if not goals:
+            return None, []
+        goals_key = tuple(goals)
+        kind = f"nearest-{self.planner}"
+        path = self.path_cache.get(self.position, goals_key, kind)
+        if path:
+            return path[-1], path
+
+        if self.planner == "hierarchical":
+            nearest_goal, path = self.hierarchical_planner.nearest_goal_path(self.position, goals)
+        else:
+            nearest_goal, path = self.find_nearest_goal_path()
+        if path:
+            self.path_cache.put(self.position, goals_key, kind, path)
+        return nearest_goal, path
+
+    def incremental_path(self):
+        """
+        Plan with D* Lite, reusing the previous search while its goal is still pending.
+        A new search is started only when there is none yet, its goal was reached,
+        or its goal became unreachable. Returns a (goal, path) tuple like find_nearest_goal_path.
+        """
+        planner = self.incremental_planner
+        if planner is not None and planner.goal in self.planning_goals():
+            planner.move_start(self.position)
+            path = planner.path()
+            if path:
+                return planner.goal, path
+            logging.warning(f"Goal {planner.goal} is no longer reachable, choosing another goal.")
+
+        nearest_goal, _ = self.find_nearest_goal_path()
+        if nearest_goal is None:
+            self.incremental_planner = None
+            return None, []
+
+        self.incremental_planner = DStarLite(self.map, self.position, nearest_goal)
+        return nearest_goal, self.incremental_planner.path()
+
     def move_to_next_position(self):
         """Moves the rover along the planned path, updating the map display."""
         if not self.path:
@@ -88,35 +293,58 @@ class RoverSLAM:
             return False
 
         self.position = self.path.pop(0)
+        if self.tiled:
+            self.map.include(self.position)  # The rover has now seen this cell
         logging.info(f"Rover moved to {self.position}")
 
-        # If the rover reaches the current goal, remove it from the list of goals
-        if self.position == self.goals[0]:
-            self.goals.pop(0)
+        # If the rover reaches a goal, remove it from the list of goals
+        if self.position in self.goals:
+            self.goals.remove(self.position)
+            if self.goal_tour is not None:
+                self.goal_tour.remove_goal(self.position)
             logging.info(f"Reached goal {self.position}. Remaining goals: {self.goals}")
 
         return True
 
+    def close(self):
+        """
+        Flush and release the map file, if the map is stored in one.
+
+        The map and every planner built on it are views of the file mapping,
+        and the mapping can only be released once they are gone, so they are
+        dropped first. The rover cannot plan after it has been closed.
+        """
+        if self.map_store is None:
+            return
+        self.map = None
+        self.incremental_planner = None
+        self.hierarchical_planner = None
+        self.goal_tour = None
+        self.reachability = None
+        self.map_store.close()
+
     def display_map(self):
         """Displays the SLAM map with obstacles, rover, goals, and path."""
         os.system('cls' if os.name == 'nt' else 'clear')  # Clear terminal screen
 
-        display_grid = np.full(self.map.shape, '.', dtype=str)
+        # A tiled map is drawn over its extent, shifted so its corner is at (0, 0)
+        grid, (ox, oy) = self.map.to_dense(self.map.margin) if self.tiled else (self.map, (0, 0))
+        display_grid = np.full(grid.shape, '.', dtype=str)
 
         # Mark obstacles
-        obstacle_positions = np.argwhere(self.map == 1)
+        obstacle_positions = np.argwhere(grid == 1)
         for x, y in obstacle_positions:
             display_grid[x, y] = '#'
 
         # Mark path
         for px, py in self.path:
-            display_grid[px, py] = '*'
+            display_grid[px - ox, py - oy] = '*'
 
         # Mark rover and goals
         x, y = self.position
-        display_grid[x, y] = 'R'
+        display_grid[x - ox, y - oy] = 'R'
         for gx, gy in self.goals:
-            display_grid[gx, gy] = 'G'
+            display_grid[gx - ox, gy - oy] = 'G'
 
         # Print the map
         for row in display_grid:
@@ -132,12 +360,12 @@ class RoverSLAM:
                 break
 
             self.dijkstra_path()  # Plan the path to the next goal
-            
-            while self.move_to_next_position():
-                self.display_map()
-                time.sleep(delay)
 
             # If no path is found to the goal, break out of the simulation
             if not self.path:
                 logging.error("Unable to find a path to the goal. Stopping.")
                 break
+            
+            while self.move_to_next_position():
+                self.display_map()
+                time.sleep(delay)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from dstar_lite import DStarLite
+from pathfinding import dijkstra_path
+
+GOAL = (14, 14)
+
+def assert_matches_dijkstra(planner, grid):
+    """The repaired path is free, 4-connected and as short as a fresh Dijkstra search."""
+    path = planner.path()
+    expected = dijkstra_path(grid, planner.start, GOAL)
+    assert len(path) == len(expected)
+    if path:
+        assert path[0] == planner.start and path[-1] == GOAL
+        assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+        assert all(grid[cell] == 0 for cell in path)
+    return path
+
+@pytest.mark.parametrize("seed", range(20))
+def test_repairs_match_dijkstra_as_the_start_moves(seed):
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((15, 15)) < 0.15).astype(int)
+    start = (0, 0)
+    grid[start] = grid[GOAL] = 0
+    planner = DStarLite(grid, start, GOAL)
+    path = assert_matches_dijkstra(planner, grid)
+
+    for _ in range(25):
+        # Advance the rover a few cells along the current path
+        if len(path) > 1:
+            start = path[min(int(rng.integers(1, 4)), len(path) - 2)]
+            planner.move_start(start)
+
+        # Block a cell on the path ahead, clear an obstacle and toggle one cell anywhere
+        changed = [tuple(int(v) for v in rng.integers(0, 15, 2))]
+        if len(path) > 2:
+            changed.append(path[int(rng.integers(1, len(path) - 1))])
+        blocked = np.argwhere(grid == 1)
+        if len(blocked):
+            changed.append(tuple(int(v) for v in blocked[rng.integers(len(blocked))]))
+        changed = list({cell for cell in changed if cell not in (start, GOAL)})
+        for cell in changed:
+            grid[cell] = 1 - grid[cell]
+        planner.update_cells(changed)
+
+        path = assert_matches_dijkstra(planner, grid)
+
+def test_sealed_goal_returns_empty_path():
+    grid = np.zeros((15, 15), dtype=int)
+    planner = DStarLite(grid, (0, 0), GOAL)
+    assert len(planner.path()) == 29
+    wall = [(13, 14), (14, 13)]
+    for cell in wall:
+        grid[cell] = 1
+    planner.update_cells(wall)
+    assert planner.path() == []
+    grid[13, 14] = 0
+    planner.update_cells([(13, 14)])
+    assert len(planner.path()) == 29
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from hierarchical import HierarchicalPlanner
+from pathfinding import dijkstra_path
+
+CLUSTER_SIZE = 8
+
+def assert_valid_path(path, grid, start, goal):
+    assert path[0] == start and path[-1] == goal
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+    assert all(grid[cell] == 0 for cell in path)
+
+@pytest.mark.parametrize("seed", range(30))
+def test_refined_path_is_valid_and_near_shortest(seed):
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((40, 40)) < 0.2).astype(int)
+    start, goal = (tuple(int(v) for v in rng.integers(0, 40, 2)) for _ in range(2))
+    grid[start] = grid[goal] = 0
+    expected = dijkstra_path(grid, start, goal)
+    path = HierarchicalPlanner(grid, CLUSTER_SIZE).find_path(start, goal)
+    if not expected:
+        assert path == []
+        return
+    assert_valid_path(path, grid, start, goal)
+    # Routing through transition cells costs at most a couple of cluster widths of detour
+    assert len(expected) <= len(path) <= len(expected) + 2 * CLUSTER_SIZE
+
+def test_border_cell_update_rebuilds_that_border():
+    grid = np.zeros((16, 16), dtype=int)
+    planner = HierarchicalPlanner(grid, CLUSTER_SIZE)
+    key = ((0, 0), (1, 0))
+    assert planner.borders[key] == [((7, 0), (8, 0)), ((7, 7), (8, 7))]
+    planner.find_path((0, 0), (15, 0))
+    assert (0, 0) in planner.intra_edges and (1, 0) in planner.intra_edges
+
+    grid[8, 0] = 1
+    planner.update_cells([(8, 0)])
+    assert planner.borders[key] == [((7, 1), (8, 1)), ((7, 7), (8, 7))]
+    assert (0, 0) not in planner.intra_edges and (1, 0) not in planner.intra_edges
+    assert_valid_path(planner.find_path((0, 0), (15, 0)), grid, (0, 0), (15, 0))
+
+def test_inner_cell_update_keeps_borders():
+    grid = np.zeros((16, 16), dtype=int)
+    planner = HierarchicalPlanner(grid, CLUSTER_SIZE)
+    borders = dict(planner.borders)
+    planner.find_path((0, 0), (15, 15))
+    grid[3, 3] = 1
+    planner.update_cells([(3, 3)])
+    assert planner.borders == borders
+    assert (0, 0) not in planner.intra_edges
+
+def test_sealed_goal_returns_no_path():
+    grid = np.zeros((16, 16), dtype=int)
+    for cell in [(11, 12), (13, 12), (12, 11), (12, 13)]:
+        grid[cell] = 1
+    planner = HierarchicalPlanner(grid, CLUSTER_SIZE)
+    assert planner.nearest_goal_path((0, 0), [(12, 12)]) == (None, [])
+    assert planner.find_path((0, 0), (12, 12)) == []
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from pathfinding import dijkstra_path
+
+@pytest.mark.parametrize("method", ["heap", "wavefront"])
+def test_unreachable_goal_returns_empty_path(method):
+    grid = np.zeros((6, 6), dtype=int)
+    grid[:, 3] = 1  # Wall splitting the map in two
+    assert dijkstra_path(grid, (0, 0), (0, 5), method=method) == []
+
+@pytest.mark.parametrize("method", ["heap", "wavefront"])
+def test_blocked_goal_returns_empty_path(method):
+    grid = np.zeros((4, 4), dtype=int)
+    grid[3, 3] = 1
+    assert dijkstra_path(grid, (0, 0), (3, 3), method=method) == []
+
+@pytest.mark.parametrize("method", ["heap", "wavefront"])
+def test_path_runs_from_start_to_goal(method):
+    grid = np.zeros((5, 5), dtype=int)
+    grid[1:4, 2] = 1
+    path = dijkstra_path(grid, (2, 0), (2, 4), method=method)
+    assert path[0] == (2, 0) and path[-1] == (2, 4)
+    assert len(path) - 1 == 8  # Around the wall through row 0 or row 4
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+    assert all(grid[cell] == 0 for cell in path)
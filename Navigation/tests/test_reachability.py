@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from reachability import ReachabilityIndex
+
+def assert_same_components(index, grid):
+    """The index partitions free space exactly like a fresh labelling of the same map."""
+    fresh = ReachabilityIndex(grid)
+    incremental = np.frombuffer(index.labels, dtype=np.int32).reshape(grid.shape)
+    expected = np.frombuffer(fresh.labels, dtype=np.int32).reshape(grid.shape)
+    assert np.array_equal(incremental == 0, expected == 0)
+    # Same partition: each fresh label maps to exactly one incremental label and back
+    pairs = set(zip(incremental[expected != 0].tolist(), expected[expected != 0].tolist()))
+    assert len({a for a, _ in pairs}) == len(pairs) == len({b for _, b in pairs})
+    assert sorted(index.sizes.values()) == sorted(fresh.sizes.values())
+
+@pytest.mark.parametrize("seed", range(20))
+def test_updates_match_fresh_relabel(seed):
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((12, 12)) < 0.3).astype(int)
+    index = ReachabilityIndex(grid)
+    for _ in range(30):
+        cells = [tuple(int(v) for v in rng.integers(0, 12, 2)) for _ in range(int(rng.integers(1, 4)))]
+        if rng.random() < 0.6:
+            for cell in cells:
+                grid[cell] = 1
+            index.add_obstacles(cells)
+        else:
+            for cell in cells:
+                grid[cell] = 0
+            index.clear_cells(cells)
+        assert_same_components(index, grid)
+
+def test_wall_splits_and_gap_merges():
+    grid = np.zeros((5, 5), dtype=int)
+    index = ReachabilityIndex(grid)
+    wall = [(2, y) for y in range(5)]
+    for cell in wall:
+        grid[cell] = 1
+    index.add_obstacles(wall)
+    assert not index.reachable((0, 0), (4, 4))
+    assert index.reachable((0, 0), (1, 4))
+
+    grid[2, 3] = 0
+    index.clear_cells([(2, 3)])
+    assert index.reachable((0, 0), (4, 4))
+
+def test_blocked_and_off_map_cells_are_unreachable():
+    grid = np.zeros((3, 3), dtype=int)
+    grid[1, 1] = 1
+    index = ReachabilityIndex(grid)
+    assert not index.reachable((0, 0), (1, 1))
+    assert not index.reachable((0, 0), (5, 5))
@@ -0,0 +1,109 @@
+import numpy as np
+
+class TiledMap:
+    """
+    Sparse occupancy map made of fixed-size square tiles allocated on first write.
+
+    Cells are addressed by (x, y) like a dense map, but coordinates may be
+    negative or arbitrarily large: a cell lives in tile (x // tile_size,
+    y // tile_size). Tiles that were never written are not stored and read as
+    `fill` (0, free space), so memory grows with the area the rover has
+    actually mapped rather than with the bounding box of its travels.
+
+    The map's extent is the bounding box of every cell written or passed to
+    include(), padded by `margin` cells so routes can pass around the outside
+    of known walls. Planners treat cells outside it as off the map, which
+    keeps searches finite even though the coordinate space is not.
+    """
+
+    def __init__(self, tile_size=64, fill=0.0, dtype=np.float64, margin=0):
+        if tile_size < 1:
+            raise ValueError("Tile size must be at least 1.")
+        self.tile_size = tile_size
+        self.fill = fill
+        self.dtype = dtype
+        self.margin = margin
+        self.tiles = {}  # (tile x, tile y) -> tile_size x tile_size array
+        self.bounds = None  # (min_x, min_y, max_x, max_y), inclusive
+
+    def _locate(self, pos):
+        tx, ox = divmod(int(pos[0]), self.tile_size)
+        ty, oy = divmod(int(pos[1]), self.tile_size)
+        return (tx, ty), ox, oy
+
+    def __getitem__(self, pos):
+        key, ox, oy = self._locate(pos)
+        tile = self.tiles.get(key)
+        return self.fill if tile is None else tile[ox, oy]
+
+    def __setitem__(self, pos, value):
+        key, ox, oy = self._locate(pos)
+        tile = self.tiles.get(key)
+        if tile is None:
+            if value == self.fill:
+                self.include(pos)
+                return  # Writing the fill value does not need a tile
+            tile = self.tiles[key] = np.full((self.tile_size, self.tile_size), self.fill, dtype=self.dtype)
+        tile[ox, oy] = value
+        self.include(pos)
+
+    def include(self, pos):
+        """Grow the map's extent to cover pos without allocating anything."""
+        x, y = int(pos[0]), int(pos[1])
+        if self.bounds is None:
+            self.bounds = (x, y, x, y)
+        else:
+            min_x, min_y, max_x, max_y = self.bounds
+            self.bounds = (min(min_x, x), min(min_y, y), max(max_x, x), max(max_y, y))
+
+    def contains(self, pos):
+        if self.bounds is None:
+            return False
+        min_x, min_y, max_x, max_y = self.bounds
+        m = self.margin
+        return min_x - m <= pos[0] <= max_x + m and min_y - m <= pos[1] <= max_y + m
+
+    @property
+    def nbytes(self):
+        """Bytes held by allocated tiles."""
+        return sum(tile.nbytes for tile in self.tiles.values())
+
+    def cells_equal(self, value):
+        """(x, y) cells whose stored value equals `value` (unallocated cells are not listed)."""
+        cells = []
+        for (tx, ty), tile in self.tiles.items():
+            for ox, oy in np.argwhere(tile == value):
+                cells.append((tx * self.tile_size + int(ox), ty * self.tile_size + int(oy)))
+        return cells
+
+    def to_dense(self, pad=0):
+        """
+        Copy the map's extent, widened by `pad` cells on every side, into a dense array.
+        Returns (array, (min_x, min_y)); the array is indexed by (x - min_x, y - min_y).
+        """
+        if self.bounds is None:
+            return np.zeros((0, 0), dtype=self.dtype), (0, 0)
+        min_x, min_y, max_x, max_y = self.bounds
+        min_x, min_y, max_x, max_y = min_x - pad, min_y - pad, max_x + pad, max_y + pad
+        dense = np.full((max_x - min_x + 1, max_y - min_y + 1), self.fill, dtype=self.dtype)
+        for (tx, ty), tile in self.tiles.items():
+            x0, y0 = tx * self.tile_size, ty * self.tile_size
+            # Clip the tile to the extent
+            ax0, ay0 = max(x0, min_x), max(y0, min_y)
+            ax1, ay1 = min(x0 + self.tile_size, max_x + 1), min(y0 + self.tile_size, max_y + 1)
+            if ax0 < ax1 and ay0 < ay1:
+                dense[ax0 - min_x:ax1 - min_x, ay0 - min_y:ay1 - min_y] = tile[ax0 - x0:ax1 - x0, ay0 - y0:ay1 - y0]
+        return dense, (min_x, min_y)
+
+def cell_checker(map):
+    """
+    Return a function telling whether a cell lies on `map`.
+
+    This is the cell-access interface the search planners share: a dense
+    NumPy map covers 0 <= x < rows and 0 <= y < cols, anything else (such as a
+    TiledMap) provides contains(). Cells are then read with map[pos].
+    """
+    if isinstance(map, np.ndarray):
+        rows, cols = map.shape
+        return lambda pos: 0 <= pos[0] < rows and 0 <= pos[1] < cols
+    return map.contains
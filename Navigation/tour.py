@@ -0,0 +1,132 @@
+import logging
+from pathfinding import distance_field  # One wavefront flood per goal
+
+class GoalTour:
+    """
+    Orders a set of goals into a short visiting tour.
+
+    Every goal keeps its own distance field (moves from the goal to every cell),
+    so the goal-to-goal distance matrix and the distance from any start cell are
+    plain lookups. Adding a goal floods only that goal and removing one drops
+    only its row; obstacle changes mark every field stale, and the fields are
+    rebuilt the next time an order is requested.
+
+    The order is built by nearest neighbor from the start and then improved
+    with 2-opt and Or-opt moves until neither shortens the tour.
+    """
+
+    def __init__(self, map):
+        self.map = map
+        self.fields = {}  # goal -> distance array over the map
+        self.floods = 0  # Total distance fields computed, for checking incremental updates
+
+    def add_goal(self, goal):
+        if goal not in self.fields:
+            self.fields[goal] = distance_field(self.map, goal)
+            self.floods += 1
+
+    def remove_goal(self, goal):
+        self.fields.pop(goal, None)
+
+    def set_goals(self, goals):
+        """Keep the fields of goals that are still wanted and flood only the new ones."""
+        for goal in [g for g in self.fields if g not in goals]:
+            self.remove_goal(goal)
+        for goal in goals:
+            self.add_goal(goal)
+
+    def invalidate(self):
+        """Mark every distance field stale after the map changed."""
+        for goal in self.fields:
+            self.fields[goal] = None
+
+    def _field(self, goal):
+        if self.fields[goal] is None:
+            self.fields[goal] = distance_field(self.map, goal)
+            self.floods += 1
+        return self.fields[goal]
+
+    def distance(self, a, b):
+        """Moves between goal `a` and any cell `b`, or None if b cannot be reached from a."""
+        d = self._field(a)[b]
+        return None if d < 0 else int(d)
+
+    def _tour_length(self, start, order):
+        stops = [start] + order
+        return sum(self.distance(b, a) for a, b in zip(stops, stops[1:]))
+
+    def order(self, start):
+        """
+        Visiting order for every goal reachable from `start`.
+        Returns (ordered goals, unreachable goals).
+        """
+        reachable = [g for g in self.fields if self.distance(g, start) is not None]
+        unreachable = [g for g in self.fields if g not in reachable]
+        if unreachable:
+            logging.warning(f"Goals unreachable from {start}: {unreachable}")
+
+        # Nearest neighbor from the start
+        order = []
+        remaining = set(reachable)
+        current = start
+        while remaining:
+            current = min(remaining, key=lambda g: (self.distance(g, current), g))
+            order.append(current)
+            remaining.remove(current)
+
+        self._improve(start, order)
+        logging.info(f"Goal tour from {start}: {order} ({self._tour_length(start, order)} moves)")
+        return order, unreachable
+
+    def _improve(self, start, order):
+        """Apply 2-opt and Or-opt moves to an open tour that starts at `start`, in place."""
+        def dist(a, b):
+            if b is None:
+                return 0  # The tour may end anywhere
+            return self.distance(a, b) if a in self.fields else self.distance(b, a)
+
+        improved = True
+        while improved:
+            improved = False
+            stops = [start] + order
+
+            # 2-opt: reverse order[i:j + 1]
+            for i in range(len(order) - 1):
+                for j in range(i + 1, len(order)):
+                    before, first, last = stops[i], stops[i + 1], stops[j + 1]
+                    after = stops[j + 2] if j + 2 < len(stops) else None
+                    delta = dist(before, last) + dist(first, after) - dist(before, first) - dist(last, after)
+                    if delta < 0:
+                        order[i:j + 1] = reversed(order[i:j + 1])
+                        improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                continue
+
+            # Or-opt: move a run of up to three goals elsewhere in the tour
+            for length in (1, 2, 3):
+                for i in range(len(order) - length + 1):
+                    segment = order[i:i + length]
+                    rest = order[:i] + order[i + length:]
+                    before = ([start] + order)[i]
+                    after = order[i + length] if i + length < len(order) else None
+                    removed = dist(before, segment[0]) + dist(segment[-1], after) - dist(before, after)
+                    for k in range(len(rest) + 1):
+                        if k == i:
+                            continue
+                        prev = ([start] + rest)[k]
+                        nxt = rest[k] if k < len(rest) else None
+                        for run in (segment, segment[::-1]):
+                            added = dist(prev, run[0]) + dist(run[-1], nxt) - dist(prev, nxt)
+                            if added < removed:
+                                order[:] = rest[:k] + run + rest[k:]
+                                improved = True
+                                break
+                        if improved:
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
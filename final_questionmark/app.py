@@ -6,6 +6,7 @@ import time  # Make sure time is properly imported at the top level
 import json
 from datetime import datetime, timedelta
 from rover_direction import determine_rover_direction
+from astar import grid_astar
 from config import API_BASE_URL
 import traceback
 
@@ -913,63 +914,12 @@ def get_position_data():
         "current_position": rover_state['current_position']
     })
 
-# A* Algorithm implementation
-def heuristic(a, b):
-    try:
-        return abs(int(a[0]) - int(b[0])) + abs(int(a[1]) - int(b[1]))
-    except (ValueError, TypeError) as e:
-        app.logger.error(f"Error in heuristic: {str(e)}")
-        return float('inf')
-
+# A* path planning for the return journey (see astar.grid_astar)
 def a_star_search(start, goal):
     try:
         start = (int(start[0]), int(start[1]))
         goal = (int(goal[0]), int(goal[1]))
-        
-        open_set = []
-        came_from = {}
-        g_score = {start: 0}
-        f_score = {start: heuristic(start, goal)}
-        
-        open_set.append(start)
-        
-        while open_set:
-            current = min(open_set, key=lambda x: f_score[x])
-            
-            if current == goal:
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start)
-                path.reverse()
-                return path
-            
-            open_set.remove(current)
-            
-            # Consider all 4 possible directions (up, down, left, right)
-            neighbors = [
-                (current[0] + 1, current[1]),  # right
-                (current[0] - 1, current[1]),  # left
-                (current[0], current[1] + 1),  # down
-                (current[0], current[1] - 1)   # up
-            ]
-            
-            for neighbor in neighbors:
-                try:
-                    tentative_g_score = g_score[current] + 1
-                    
-                    if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                        came_from[neighbor] = current
-                        g_score[neighbor] = tentative_g_score
-                        f_score[neighbor] = g_score[neighbor] + heuristic(neighbor, goal)
-                        if neighbor not in open_set:
-                            open_set.append(neighbor)
-                except (ValueError, TypeError) as e:
-                    app.logger.error(f"Error processing neighbor {neighbor}: {str(e)}")
-                    continue
-        
-        return []  # No path found
+        return grid_astar(start, goal)
     except Exception as e:
         app.logger.error(f"Error in A* search: {str(e)}")
         return []
@@ -1,7 +1,713 @@
 import heapq
 import math
+import time
+from array import array
 
-def astar(start, goal, obstacles=None):
+# Number of cells the default search region extends past the start/goal/obstacle box
+SEARCH_MARGIN = 20
+
+# Obstacles farther than this many cells outside the start/goal box do not widen the default search region
+OBSTACLE_REACH = 100
+
+# How many expansions pass between wall-clock deadline checks
+DEADLINE_CHECK_INTERVAL = 256
+
+# Move cost for diagonal steps (√2); orthogonal steps cost 1.0
+DIAGONAL_COST = 1.414
+
+# Heuristic inflation the anytime planner starts from, and how much it drops per improved path
+ANYTIME_INITIAL_EPSILON = 3.0
+ANYTIME_EPSILON_STEP = 0.5
+
+class OccupancyGrid:
+    """
+    Rectangular occupancy grid stored as a flat bytearray (1 = blocked).
+
+    World cells (x, y) inside the inclusive bounds (min_x, min_y, max_x, max_y)
+    map to flat integer indices as (y - min_y) * width + (x - min_x), so
+    planners can keep their per-cell state in preallocated arrays instead of
+    dicts keyed by tuples.
+    """
+
+    def __init__(self, bounds, obstacles=None):
+        self.min_x, self.min_y, self.max_x, self.max_y = bounds
+        self.width = self.max_x - self.min_x + 1
+        self.height = self.max_y - self.min_y + 1
+        if self.width <= 0 or self.height <= 0:
+            raise ValueError(f"Invalid grid bounds {bounds}")
+        self.size = self.width * self.height
+        self.blocked = bytearray(self.size)
+        if obstacles:
+            self.add_obstacles(obstacles)
+
+    @property
+    def bounds(self):
+        return (self.min_x, self.min_y, self.max_x, self.max_y)
+
+    def contains(self, pos):
+        return self.min_x <= pos[0] <= self.max_x and self.min_y <= pos[1] <= self.max_y
+
+    def index(self, pos):
+        return (pos[1] - self.min_y) * self.width + (pos[0] - self.min_x)
+
+    def position(self, index):
+        y, x = divmod(index, self.width)
+        return (x + self.min_x, y + self.min_y)
+
+    def is_blocked(self, pos):
+        return self.blocked[self.index(pos)] == 1
+
+    def add_obstacles(self, cells):
+        """Mark cells as blocked; cells outside the grid are ignored."""
+        for cell in cells:
+            if self.contains(cell):
+                self.blocked[self.index(cell)] = 1
+
+    def clear_obstacles(self, cells):
+        """Mark cells as free; cells outside the grid are ignored."""
+        for cell in cells:
+            if self.contains(cell):
+                self.blocked[self.index(cell)] = 0
+
+class SearchResult:
+    """
+    Structured outcome of a bounded grid search.
+
+    `status` is one of FOUND, NO_PATH (the reachable region inside the bounds
+    was exhausted), BUDGET_EXHAUSTED (max_expansions hit) or DEADLINE_EXCEEDED
+    (the wall-clock deadline passed). `path` is empty unless status is FOUND.
+    """
+
+    FOUND = "found"
+    NO_PATH = "no_path"
+    BUDGET_EXHAUSTED = "budget_exhausted"
+    DEADLINE_EXCEEDED = "deadline_exceeded"
+
+    def __init__(self, status, path=None, expanded=0, elapsed=0.0):
+        self.status = status
+        self.path = path or []
+        self.expanded = expanded
+        self.elapsed = elapsed
+
+    @property
+    def found(self):
+        return self.status == SearchResult.FOUND
+
+    def to_dict(self):
+        return {
+            "status": self.status,
+            "path": self.path,
+            "expanded": self.expanded,
+            "elapsed": self.elapsed
+        }
+
+    def __repr__(self):
+        return (f"SearchResult(status={self.status!r}, steps={len(self.path)}, "
+                f"expanded={self.expanded}, elapsed={self.elapsed:.4f})")
+
+class AnyAngleResult(SearchResult):
+    """
+    SearchResult of the any-angle planner.
+
+    `waypoints` are the corners of the any-angle path: consecutive waypoints
+    see each other across free cells. `path` is the same route expanded into
+    4-connected cells (see expand_waypoints), so it can be driven with the
+    usual up/down/left/right moves.
+    """
+
+    def __init__(self, status, path=None, expanded=0, elapsed=0.0, waypoints=None):
+        super().__init__(status, path, expanded, elapsed)
+        self.waypoints = waypoints or []
+
+    def to_dict(self):
+        result = super().to_dict()
+        result["waypoints"] = self.waypoints
+        return result
+
+    def __repr__(self):
+        return (f"AnyAngleResult(status={self.status!r}, steps={len(self.path)}, waypoints={len(self.waypoints)}, "
+                f"expanded={self.expanded}, elapsed={self.elapsed:.4f})")
+
+class AnytimeResult(SearchResult):
+    """
+    SearchResult of the anytime planner.
+
+    `epsilon` is the suboptimality bound of the returned path: its cost is at
+    most epsilon times the cost of the shortest path (1.0 means optimal, None
+    when no path was found). `iterations` counts the improved paths produced
+    before the planner finished or ran out of time.
+    """
+
+    def __init__(self, status, path=None, expanded=0, elapsed=0.0, epsilon=None, iterations=0):
+        super().__init__(status, path, expanded, elapsed)
+        self.epsilon = epsilon
+        self.iterations = iterations
+
+    def to_dict(self):
+        result = super().to_dict()
+        result["epsilon"] = self.epsilon
+        result["iterations"] = self.iterations
+        return result
+
+    def __repr__(self):
+        return (f"AnytimeResult(status={self.status!r}, steps={len(self.path)}, epsilon={self.epsilon}, "
+                f"iterations={self.iterations}, expanded={self.expanded}, elapsed={self.elapsed:.4f})")
+
+def search_bounds(start, goal, obstacles=None, margin=SEARCH_MARGIN, reach=OBSTACLE_REACH):
+    """
+    Compute the default search region for a start/goal pair.
+
+    The region is the bounding box of the start, the goal and the obstacles
+    lying within `reach` cells of that box, padded by `margin` cells so paths
+    can route around the outside of walls. Obstacles farther out are left
+    out of the region, so a single stray reading cannot blow up the grid.
+
+    Args:
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        obstacles: Set of tuples representing obstacle positions (optional)
+        margin: Number of cells to pad the bounding box with
+        reach: How far outside the start/goal box an obstacle may lie and
+            still widen the region
+
+    Returns:
+        Tuple (min_x, min_y, max_x, max_y), inclusive on all sides
+    """
+    min_x, max_x = min(start[0], goal[0]), max(start[0], goal[0])
+    min_y, max_y = min(start[1], goal[1]), max(start[1], goal[1])
+    if obstacles:
+        low_x, low_y, high_x, high_y = min_x - reach, min_y - reach, max_x + reach, max_y + reach
+        nearby = [o for o in obstacles if low_x <= o[0] <= high_x and low_y <= o[1] <= high_y]
+        if nearby:
+            min_x = min(min_x, min(o[0] for o in nearby))
+            max_x = max(max_x, max(o[0] for o in nearby))
+            min_y = min(min_y, min(o[1] for o in nearby))
+            max_y = max(max_y, max(o[1] for o in nearby))
+    return (min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+
+def _is_sealed(grid, index, diagonal):
+    """True if every neighbor of the cell at `index` is blocked or off-grid."""
+    y, x = divmod(index, grid.width)
+    steps = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+    if diagonal:
+        steps += [(1, 1), (-1, 1), (1, -1), (-1, -1)]
+    for dx, dy in steps:
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < grid.width and 0 <= ny < grid.height and not grid.blocked[ny * grid.width + nx]:
+            return False
+    return True
+
+def _grid_moves(current, x, y, width, height, diagonal):
+    """Moves out of the cell at flat index `current` as (neighbor index, neighbor x, neighbor y, move cost)."""
+    moves = []
+    if x + 1 < width:
+        moves.append((current + 1, x + 1, y, 1.0))
+    if x > 0:
+        moves.append((current - 1, x - 1, y, 1.0))
+    if y + 1 < height:
+        moves.append((current + width, x, y + 1, 1.0))
+    if y > 0:
+        moves.append((current - width, x, y - 1, 1.0))
+    if diagonal:
+        if x + 1 < width and y + 1 < height:
+            moves.append((current + width + 1, x + 1, y + 1, DIAGONAL_COST))
+        if x > 0 and y + 1 < height:
+            moves.append((current + width - 1, x - 1, y + 1, DIAGONAL_COST))
+        if x + 1 < width and y > 0:
+            moves.append((current - width + 1, x + 1, y - 1, DIAGONAL_COST))
+        if x > 0 and y > 0:
+            moves.append((current - width - 1, x - 1, y - 1, DIAGONAL_COST))
+    return moves
+
+def search_grid(grid, start, goal, diagonal=False, max_expansions=None, deadline=None):
+    """
+    A* planning kernel over an OccupancyGrid using flat cell indices.
+
+    g-scores, parents and the closed set live in arrays preallocated to the
+    grid size. The g-score array doubles as the open-set index: a cell is only
+    pushed onto the binary heap when its g-score improves (decrease-key in
+    O(log n)), membership is an O(1) array lookup, and stale heap entries are
+    skipped when popped because the cell is already closed.
+
+    Args:
+        grid: OccupancyGrid to plan on; cells outside it are treated as walls
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        diagonal: Allow 8-connected moves (cost √2) with a Euclidean heuristic
+            instead of 4-connected unit moves with a Manhattan heuristic
+        max_expansions: Stop after closing this many cells (optional)
+        deadline: time.monotonic() value after which the search gives up (optional)
+
+    Returns:
+        SearchResult describing the path or why none was returned
+    """
+    began = time.monotonic()
+
+    def finish(status, path=None, expanded=0):
+        return SearchResult(status, path, expanded, time.monotonic() - began)
+
+    if not grid.contains(start) or not grid.contains(goal):
+        return finish(SearchResult.NO_PATH)
+    if start == goal:
+        return finish(SearchResult.FOUND, [start])
+
+    blocked = grid.blocked
+    width, height = grid.width, grid.height
+    start_index, goal_index = grid.index(start), grid.index(goal)
+
+    # A blocked or walled-in goal is rejected without searching
+    if blocked[goal_index] or _is_sealed(grid, goal_index, diagonal):
+        return finish(SearchResult.NO_PATH)
+
+    goal_y, goal_x = divmod(goal_index, width)
+
+    g_score = array('d', [math.inf]) * grid.size
+    parent = array('l', [-1]) * grid.size
+    closed = bytearray(grid.size)
+
+    def heuristic(x, y):
+        if diagonal:
+            return math.sqrt((goal_x - x) ** 2 + (goal_y - y) ** 2)
+        return abs(goal_x - x) + abs(goal_y - y)
+
+    start_y, start_x = divmod(start_index, width)
+    h = heuristic(start_x, start_y)
+    g_score[start_index] = 0.0
+    # Entries are (f, h, index); ties on f prefer the cell closer to the goal
+    open_set = [(h, h, start_index)]
+    expanded = 0
+
+    while open_set:
+        _, _, current = heapq.heappop(open_set)
+        if closed[current]:
+            continue  # Stale entry left behind by a cheaper push
+
+        if current == goal_index:
+            indices = [current]
+            while parent[current] != -1:
+                current = parent[current]
+                indices.append(current)
+            indices.reverse()
+            return finish(SearchResult.FOUND, [grid.position(i) for i in indices], expanded)
+
+        if max_expansions is not None and expanded >= max_expansions:
+            return finish(SearchResult.BUDGET_EXHAUSTED, expanded=expanded)
+        if deadline is not None and expanded % DEADLINE_CHECK_INTERVAL == 0 and time.monotonic() >= deadline:
+            return finish(SearchResult.DEADLINE_EXCEEDED, expanded=expanded)
+
+        closed[current] = 1
+        expanded += 1
+        y, x = divmod(current, width)
+        current_g = g_score[current]
+
+        moves = _grid_moves(current, x, y, width, height, diagonal)
+
+        for neighbor, nx, ny, cost in moves:
+            if closed[neighbor] or blocked[neighbor]:
+                continue
+            tentative_g = current_g + cost
+            if tentative_g >= g_score[neighbor]:
+                continue
+
+            parent[neighbor] = current
+            g_score[neighbor] = tentative_g
+            h = heuristic(nx, ny)
+            heapq.heappush(open_set, (tentative_g + h, h, neighbor))
+
+    return finish(SearchResult.NO_PATH, expanded=expanded)
+
+def plan_on_grid(grid, start, goal, diagonal=False, max_expansions=None, deadline=None):
+    """
+    Convenience wrapper around search_grid that returns just the path.
+
+    Returns:
+        List of tuples representing the path from start to goal, or an empty
+        list if no path was found within the grid, budget and deadline
+    """
+    return search_grid(grid, start, goal, diagonal, max_expansions, deadline).path
+
+def anytime_search(grid, start, goal, deadline=None, diagonal=False,
+                   initial_epsilon=ANYTIME_INITIAL_EPSILON, epsilon_step=ANYTIME_EPSILON_STEP):
+    """
+    Anytime Repairing A* (ARA*) over an OccupancyGrid.
+
+    The first search inflates the heuristic by `initial_epsilon`, which finds
+    a path quickly that is at most epsilon times longer than the shortest one.
+    Each following search lowers epsilon by `epsilon_step` and reuses the
+    previous g-scores, only re-expanding cells whose cost improved, until the
+    path is proven optimal or the deadline passes. The best completed path is
+    returned together with the bound it was proven against.
+
+    Args:
+        grid: OccupancyGrid to plan on; cells outside it are treated as walls
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        deadline: time.monotonic() value by which the planner must return (optional;
+            without one it runs until the path is optimal)
+        diagonal: Allow 8-connected moves, as in search_grid
+        initial_epsilon: Heuristic inflation of the first search (at least 1.0)
+        epsilon_step: Amount epsilon is lowered after each improved path
+
+    Returns:
+        AnytimeResult with status FOUND (possibly cut short by the deadline, see
+        `epsilon`), NO_PATH, or DEADLINE_EXCEEDED if no path was found in time
+    """
+    if initial_epsilon < 1.0 or epsilon_step <= 0:
+        raise ValueError("Epsilon must start at 1.0 or more and decrease by a positive step")
+
+    began = time.monotonic()
+    expanded = 0
+    iterations = 0
+    best_path = []
+    bound = None
+
+    def finish(status):
+        return AnytimeResult(status, best_path, expanded, time.monotonic() - began, bound, iterations)
+
+    if not grid.contains(start) or not grid.contains(goal):
+        return finish(SearchResult.NO_PATH)
+    if start == goal:
+        best_path, bound = [start], 1.0
+        return finish(SearchResult.FOUND)
+
+    blocked = grid.blocked
+    width, height = grid.width, grid.height
+    start_index, goal_index = grid.index(start), grid.index(goal)
+
+    if blocked[goal_index] or _is_sealed(grid, goal_index, diagonal):
+        return finish(SearchResult.NO_PATH)
+
+    goal_y, goal_x = divmod(goal_index, width)
+
+    def heuristic(index):
+        y, x = divmod(index, width)
+        if diagonal:
+            return math.sqrt((goal_x - x) ** 2 + (goal_y - y) ** 2)
+        return abs(goal_x - x) + abs(goal_y - y)
+
+    g_score = array('d', [math.inf]) * grid.size
+    parent = array('l', [-1]) * grid.size
+    in_open = bytearray(grid.size)
+    inconsistent = set()  # Cells improved after they were closed in the current search
+
+    epsilon = initial_epsilon
+    g_score[start_index] = 0.0
+    h = heuristic(start_index)
+    in_open[start_index] = 1
+    # Entries are (g + epsilon * h, h, index)
+    open_set = [(epsilon * h, h, start_index)]
+
+    while True:
+        closed = bytearray(grid.size)
+
+        # Expand while some open cell could still lead to a cheaper goal under this epsilon
+        while open_set:
+            f, _, current = open_set[0]
+            if closed[current] or not in_open[current]:
+                heapq.heappop(open_set)
+                continue  # Stale entry
+            if f >= g_score[goal_index]:
+                break
+            if deadline is not None and expanded % DEADLINE_CHECK_INTERVAL == 0 and time.monotonic() >= deadline:
+                return finish(SearchResult.FOUND if best_path else SearchResult.DEADLINE_EXCEEDED)
+
+            heapq.heappop(open_set)
+            in_open[current] = 0
+            closed[current] = 1
+            expanded += 1
+            y, x = divmod(current, width)
+            current_g = g_score[current]
+
+            for neighbor, nx, ny, cost in _grid_moves(current, x, y, width, height, diagonal):
+                if blocked[neighbor]:
+                    continue
+                tentative_g = current_g + cost
+                if tentative_g >= g_score[neighbor]:
+                    continue
+
+                parent[neighbor] = current
+                g_score[neighbor] = tentative_g
+                if closed[neighbor]:
+                    inconsistent.add(neighbor)
+                else:
+                    in_open[neighbor] = 1
+                    h = heuristic(neighbor)
+                    heapq.heappush(open_set, (tentative_g + epsilon * h, h, neighbor))
+
+        goal_g = g_score[goal_index]
+        if goal_g == math.inf:
+            return finish(SearchResult.NO_PATH)
+
+        iterations += 1
+        indices = [goal_index]
+        while indices[-1] != start_index:
+            indices.append(parent[indices[-1]])
+        indices.reverse()
+        best_path = [grid.position(i) for i in indices]
+
+        # Cells still open or inconsistent bound how much shorter any other path could be
+        pending = {i for _, _, i in open_set if in_open[i]} | inconsistent
+        lowest = min((g_score[i] + heuristic(i) for i in pending), default=goal_g)
+        bound = min(epsilon, goal_g / lowest) if lowest > 0 else epsilon
+        bound = max(bound, 1.0)
+        if bound == 1.0:
+            return finish(SearchResult.FOUND)
+
+        epsilon = max(1.0, epsilon - epsilon_step)
+        open_set = []
+        for i in pending:
+            in_open[i] = 1
+            h = heuristic(i)
+            open_set.append((g_score[i] + epsilon * h, h, i))
+        heapq.heapify(open_set)
+        inconsistent = set()
+
+def anytime_astar(start, goal, obstacles=None, bounds=None, deadline=None, diagonal=False):
+    """
+    Anytime A* between two positions with a fixed obstacle set.
+
+    Builds the grid like grid_astar() (4-connected unless `diagonal`) and runs
+    anytime_search() on it until the path is optimal or `deadline` passes.
+
+    Returns:
+        AnytimeResult whose `epsilon` tells how far from optimal the path may be
+    """
+    if bounds is None:
+        bounds = search_bounds(start, goal, obstacles)
+    grid = OccupancyGrid(bounds, obstacles)
+    return anytime_search(grid, start, goal, deadline, diagonal)
+
+def trace_line(grid, a, b):
+    """
+    Cells crossed by the straight segment between the centers of cells a and b.
+
+    The cells are returned in order and 4-connected. Where the segment passes
+    exactly through a cell corner both cells beside the corner are required to
+    be free, so the line never squeezes between two diagonal obstacles.
+
+    Returns:
+        List of (x, y) cells from a to b, or None if any of them is blocked
+        or outside the grid
+    """
+    if not grid.contains(a) or not grid.contains(b):
+        return None
+    blocked, width = grid.blocked, grid.width
+    x, y = a[0] - grid.min_x, a[1] - grid.min_y
+    dx, dy = abs(b[0] - a[0]), abs(b[1] - a[1])
+    sx = 1 if b[0] > a[0] else -1
+    sy = 1 if b[1] > a[1] else -1
+    if blocked[y * width + x]:
+        return None
+
+    cells = [a]
+    ix = iy = 0  # Steps taken along each axis
+    while ix < dx or iy < dy:
+        # Which cell border the segment crosses next, compared without division
+        crossing = (1 + 2 * ix) * dy - (1 + 2 * iy) * dx
+        if crossing == 0:
+            # Through a corner: both side cells must be free; the path goes via the x side
+            if blocked[y * width + x + sx] or blocked[(y + sy) * width + x]:
+                return None
+            x += sx
+            cells.append((x + grid.min_x, y + grid.min_y))
+            y += sy
+            ix += 1
+            iy += 1
+        elif crossing < 0:
+            x += sx
+            ix += 1
+        else:
+            y += sy
+            iy += 1
+        if blocked[y * width + x]:
+            return None
+        cells.append((x + grid.min_x, y + grid.min_y))
+    return cells
+
+def line_of_sight(grid, a, b):
+    """True if the straight segment between cells a and b crosses only free cells."""
+    return trace_line(grid, a, b) is not None
+
+def _leg_cells(grid, a, b, x_first):
+    """Cells of the L-shaped route from a to b (one straight run per axis), or None if it is blocked."""
+    corner = (b[0], a[1]) if x_first else (a[0], b[1])
+    first = trace_line(grid, a, corner)
+    second = trace_line(grid, corner, b) if first is not None else None
+    if second is None:
+        return None
+    return first + second[1:]
+
+def _straighten(grid, cells, x_first):
+    """
+    Replace a free 4-connected run of cells with as few straight runs as possible.
+
+    Uses an L between the end cells when one is free; otherwise splits the run
+    at its middle cell and straightens both halves.
+    """
+    a, b = cells[0], cells[-1]
+    leg = _leg_cells(grid, a, b, x_first) or _leg_cells(grid, a, b, not x_first)
+    if leg is not None or len(cells) <= 2:
+        return leg or cells
+    middle = len(cells) // 2
+    first = _straighten(grid, cells[:middle + 1], x_first)
+    x_first = first[-1][1] == first[-2][1]
+    return first + _straighten(grid, cells[middle:], x_first)[1:]
+
+def expand_waypoints(grid, waypoints):
+    """
+    Expand an any-angle path into 4-connected cells for up/down/left/right driving.
+
+    Each leg between two waypoints becomes an L of at most two straight runs
+    when one of the two L shapes is free, preferring the one that carries on
+    in the previous leg's direction so runs merge across the waypoint. Legs
+    with no free L are split along the cells under the straight line until
+    every piece has one (see _straighten).
+
+    Returns:
+        List of (x, y) cells from the first waypoint to the last
+    """
+    if not waypoints:
+        return []
+    path = [waypoints[0]]
+    x_first = True
+    for a, b in zip(waypoints, waypoints[1:]):
+        cells = trace_line(grid, a, b)
+        if cells is None:
+            raise ValueError(f"No line of sight between waypoints {a} and {b}")
+        path.extend(_straighten(grid, cells, x_first)[1:])
+        # Start the next leg along the axis this one ended on
+        x_first = len(path) < 2 or path[-1][1] == path[-2][1]
+    return path
+
+def theta_star_search(grid, start, goal, max_expansions=None, deadline=None):
+    """
+    Lazy Theta* any-angle search over an OccupancyGrid.
+
+    Expands cells 8-connected like A* (diagonal moves may not cut a blocked
+    corner), but a new neighbor takes the current cell's parent as its own
+    parent, so paths run in straight lines at any angle and only bend at
+    obstacle corners. The line of sight behind that shortcut is only checked
+    once the neighbor is expanded; if it fails, the cell falls back to its
+    cheapest expanded neighbor. That is one check per expansion instead of
+    one per neighbor. Costs and the heuristic are Euclidean distances between
+    cell centers.
+
+    Args:
+        grid: OccupancyGrid to plan on; cells outside it are treated as walls
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        max_expansions: Stop after closing this many cells (optional)
+        deadline: time.monotonic() value after which the search gives up (optional)
+
+    Returns:
+        AnyAngleResult holding the waypoints and their 4-connected expansion
+    """
+    began = time.monotonic()
+
+    def finish(status, waypoints=None, expanded=0):
+        path = expand_waypoints(grid, waypoints) if waypoints else None
+        return AnyAngleResult(status, path, expanded, time.monotonic() - began, waypoints)
+
+    if not grid.contains(start) or not grid.contains(goal):
+        return finish(SearchResult.NO_PATH)
+    if start == goal:
+        return finish(SearchResult.FOUND, [start])
+
+    blocked = grid.blocked
+    width, height = grid.width, grid.height
+    start_index, goal_index = grid.index(start), grid.index(goal)
+
+    # Without corner cutting a goal walled in on four sides cannot be reached
+    if blocked[goal_index] or _is_sealed(grid, goal_index, False):
+        return finish(SearchResult.NO_PATH)
+
+    goal_y, goal_x = divmod(goal_index, width)
+
+    g_score = array('d', [math.inf]) * grid.size
+    parent = array('l', [-1]) * grid.size
+    closed = bytearray(grid.size)
+
+    def heuristic(x, y):
+        return math.hypot(goal_x - x, goal_y - y)
+
+    start_y, start_x = divmod(start_index, width)
+    h = heuristic(start_x, start_y)
+    g_score[start_index] = 0.0
+    parent[start_index] = start_index
+    open_set = [(h, h, start_index)]
+    expanded = 0
+
+    while open_set:
+        _, _, current = heapq.heappop(open_set)
+        if closed[current]:
+            continue
+
+        y, x = divmod(current, width)
+        via = parent[current]
+        if via != current and not line_of_sight(grid, grid.position(via), grid.position(current)):
+            # The assumed shortcut is blocked: attach to the best expanded neighbor
+            g_score[current] = math.inf
+            for neighbor, nx, ny, _ in _grid_moves(current, x, y, width, height, True):
+                if not closed[neighbor]:
+                    continue
+                if nx != x and ny != y and (blocked[y * width + nx] or blocked[ny * width + x]):
+                    continue
+                g = g_score[neighbor] + math.hypot(nx - x, ny - y)
+                if g < g_score[current]:
+                    g_score[current] = g
+                    parent[current] = neighbor
+
+        if current == goal_index:
+            indices = [current]
+            while parent[current] != current:
+                current = parent[current]
+                indices.append(current)
+            indices.reverse()
+            return finish(SearchResult.FOUND, [grid.position(i) for i in indices], expanded)
+
+        if max_expansions is not None and expanded >= max_expansions:
+            return finish(SearchResult.BUDGET_EXHAUSTED, expanded=expanded)
+        if deadline is not None and expanded % DEADLINE_CHECK_INTERVAL == 0 and time.monotonic() >= deadline:
+            return finish(SearchResult.DEADLINE_EXCEEDED, expanded=expanded)
+
+        closed[current] = 1
+        expanded += 1
+        via = parent[current]
+        via_y, via_x = divmod(via, width)
+
+        for neighbor, nx, ny, _ in _grid_moves(current, x, y, width, height, True):
+            if closed[neighbor] or blocked[neighbor]:
+                continue
+            if nx != x and ny != y and (blocked[y * width + nx] or blocked[ny * width + x]):
+                continue  # Diagonal move would cut a blocked corner
+
+            # Assume the parent sees the neighbor; checked when the neighbor is expanded
+            tentative_g = g_score[via] + math.hypot(nx - via_x, ny - via_y)
+            if tentative_g >= g_score[neighbor]:
+                continue
+
+            parent[neighbor] = via
+            g_score[neighbor] = tentative_g
+            h = heuristic(nx, ny)
+            heapq.heappush(open_set, (tentative_g + h, h, neighbor))
+
+    return finish(SearchResult.NO_PATH, expanded=expanded)
+
+def any_angle_astar(start, goal, obstacles=None, bounds=None, max_expansions=None, deadline=None):
+    """
+    Any-angle path between two positions with a fixed obstacle set.
+
+    Builds the grid like grid_astar() and runs theta_star_search() on it.
+
+    Returns:
+        AnyAngleResult with the waypoints and the 4-connected cell path
+    """
+    if bounds is None:
+        bounds = search_bounds(start, goal, obstacles)
+    grid = OccupancyGrid(bounds, obstacles)
+    return theta_star_search(grid, start, goal, max_expansions, deadline)
+
+def astar(start, goal, obstacles=None, bounds=None, max_expansions=None, deadline=None, verbose=False):
     """
     A* pathfinding algorithm implementation.
     
@@ -9,105 +715,82 @@ def astar(start, goal, obstacles=None):
         start: Tuple (x, y) representing start position
         goal: Tuple (x, y) representing goal position
         obstacles: Set of tuples representing obstacle positions (optional)
+        bounds: Tuple (min_x, min_y, max_x, max_y) limiting the search (optional,
+            defaults to search_bounds(start, goal, obstacles))
+        max_expansions: Give up after expanding this many cells (optional)
+        deadline: time.monotonic() value after which the search gives up (optional)
+        verbose: Print progress messages (off by default so tight loops stay quiet)
     
     Returns:
-        List of tuples representing the path from start to goal
+        List of tuples representing the path from start to goal, or None if
+        no path was found (see astar_search for the reason)
     """
     # Validate input parameters
     if not isinstance(start, tuple) or len(start) != 2:
         raise ValueError(f"Start position must be a tuple of (x,y), got {start}")
-        
+    
     if not isinstance(goal, tuple) or len(goal) != 2:
         raise ValueError(f"Goal position must be a tuple of (x,y), got {goal}")
     
-    print(f"A* pathfinding from {start} to {goal}")
+    if verbose:
+        print(f"A* pathfinding from {start} to {goal}")
     
     # If start and goal are the same, return a path with just that position
     if start == goal:
-        print("Start and goal are the same position, returning direct path")
+        if verbose:
+            print("Start and goal are the same position, returning direct path")
         return [start]
     
-    if obstacles is None:
-        obstacles = set()
-    
-    # Helper function to calculate heuristic (Euclidean distance)
-    def heuristic(a, b):
-        return math.sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2)
-    
-    # Initialize open and closed sets
-    open_set = []
-    closed_set = set()
-    came_from = {}
-    
-    # Initialize g and f scores
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, goal)}
-    
-    # Add start node to open set
-    heapq.heappush(open_set, (f_score[start], start))
-    
-    # Main loop
-    while open_set:
-        # Get the node with the lowest f_score
-        current_f, current = heapq.heappop(open_set)
-        
-        # If we've reached the goal, reconstruct and return the path
-        if current == goal:
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            path.append(start)
-            path = path[::-1]  # Reverse the path
+    result = astar_search(start, goal, obstacles, bounds, max_expansions, deadline)
+
+    if result.found:
+        path = result.path
+        if verbose:
             print(f"Path found with {len(path)} steps from {path[0]} to {path[-1]}")
-            return path
-        
-        # Add current node to closed set
-        closed_set.add(current)
-        
-        # Define possible moves (up, down, left, right, and diagonals)
-        neighbors = [
-            (current[0]+1, current[1]),    # right
-            (current[0]-1, current[1]),    # left
-            (current[0], current[1]+1),    # up
-            (current[0], current[1]-1),    # down
-            (current[0]+1, current[1]+1),  # diagonal: up-right
-            (current[0]-1, current[1]+1),  # diagonal: up-left
-            (current[0]+1, current[1]-1),  # diagonal: down-right
-            (current[0]-1, current[1]-1),  # diagonal: down-left
-        ]
-        
-        for neighbor in neighbors:
-            # Skip if the neighbor is in the closed set or is an obstacle
-            if neighbor in closed_set or neighbor in obstacles:
-                continue
-            
-            # Calculate tentative g_score
-            # Use 1.414 (√2) for diagonal movement, 1.0 for orthogonal
-            if abs(neighbor[0] - current[0]) == 1 and abs(neighbor[1] - current[1]) == 1:
-                # Diagonal movement
-                tentative_g = g_score.get(current, float('inf')) + 1.414
-            else:
-                # Orthogonal movement
-                tentative_g = g_score.get(current, float('inf')) + 1.0
-            
-            # If this is not a better path, skip
-            if neighbor in g_score and tentative_g >= g_score[neighbor]:
-                continue
-            
-            # This path is the best so far, record it
-            came_from[neighbor] = current
-            g_score[neighbor] = tentative_g
-            f_score[neighbor] = tentative_g + heuristic(neighbor, goal)
-            
-            # Add to open set if not already there
-            if neighbor not in [i[1] for i in open_set]:
-                heapq.heappush(open_set, (f_score[neighbor], neighbor))
-    
+        return path
+
     # If we get here, there's no path to the goal
-    print(f"No path found from {start} to {goal}")
+    if verbose:
+        print(f"No path found from {start} to {goal} ({result.status} after {result.expanded} expansions)")
     return None
 
+def astar_search(start, goal, obstacles=None, bounds=None, max_expansions=None, deadline=None):
+    """
+    Bounded 8-connected A* that reports why it stopped.
+
+    Same arguments as astar(); the search region defaults to
+    search_bounds(start, goal, obstacles).
+
+    Returns:
+        SearchResult with status FOUND, NO_PATH, BUDGET_EXHAUSTED or DEADLINE_EXCEEDED
+    """
+    if bounds is None:
+        bounds = search_bounds(start, goal, obstacles)
+    grid = OccupancyGrid(bounds, obstacles)
+    return search_grid(grid, start, goal, True, max_expansions, deadline)
+
+def grid_astar(start, goal, obstacles=None, bounds=None, max_expansions=None, deadline=None):
+    """
+    A* over a 4-connected grid where every move costs 1.
+
+    Args:
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        obstacles: Set of tuples representing obstacle positions (optional)
+        bounds: Tuple (min_x, min_y, max_x, max_y) limiting the search (optional,
+            defaults to search_bounds(start, goal, obstacles))
+        max_expansions: Give up after expanding this many cells (optional)
+        deadline: time.monotonic() value after which the search gives up (optional)
+
+    Returns:
+        List of tuples representing the path from start to goal, or an empty
+        list if the goal cannot be reached inside the search region and budget
+    """
+    if bounds is None:
+        bounds = search_bounds(start, goal, obstacles)
+    grid = OccupancyGrid(bounds, obstacles)
+    return plan_on_grid(grid, start, goal, False, max_expansions, deadline)
+
 # Example usage: a simple test case
 if __name__ == "__main__":
     # Define start and goal positions
@@ -118,6 +801,6 @@ if __name__ == "__main__":
     obstacles = {(2, 2), (2, 3), (3, 2), (3, 3)}
     
     # Calculate path
-    path = astar(start, goal, obstacles)
+    path = astar(start, goal, obstacles, verbose=True)
     
-    print("A* Path:", path)
+    print("A* Path:", path)
\ No newline at end of file
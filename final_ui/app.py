@@ -1,12 +1,21 @@
 from flask import Flask, jsonify, render_template, request
-import requests
 import logging
 import threading
 import time  # Make sure time is properly imported at the top level
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from rover_direction import determine_rover_direction
-from config import API_BASE_URL
+from astar import OccupancyGrid, any_angle_astar, anytime_astar, search_bounds
+from distance_field import DistanceField
+from path_cache import PathCache
+from batch_planner import plan_batch
+from mission_engine import MissionEngine
+from upstream import client as upstream
+from resilience import CircuitOpenError
+from telemetry import (LOW_BATTERY_LEVEL, NAVIGATION_STEP_INTERVAL, RECHARGED_LEVEL, battery_level,
+                       normalize_position, parse_sensor_data, recharge_reason)
 import traceback
 
 app = Flask(__name__)
@@ -24,7 +33,8 @@ rover_state = {
     "current_direction": None,  # Track current direction during navigation
     "last_position_before_recharge": None,  # Store position before recharging
     "navigation_active": False,  # Flag to track if navigation is active
-    "return_thread": None  # Added to track return journey thread
+    "return_thread": None,  # Added to track return journey thread
+    "return_plan": None  # Latest route home planned during auto-navigation
 }
 
 # Cache for sensor data to reduce API calls
@@ -37,9 +47,67 @@ sensor_data_cache = {
 # Navigation thread reference
 navigation_thread = None
 
-# If API_BASE_URL is not set, use the default
-if not API_BASE_URL:
-    API_BASE_URL = "https://roverdata2-production.up.railway.app/api"
+# Runs the status and sensor reads of a navigation step side by side
+step_reader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="step-read")
+
+# Timings of the most recent auto-navigation steps, for /auto-navigate/status
+STEP_TIMING_WINDOW = 100
+step_timings = deque(maxlen=STEP_TIMING_WINDOW)
+
+# Longest a return-to-base plan may search before giving up (seconds)
+PLAN_TIME_LIMIT = 2.0
+
+# Planning time each refresh of the route home may spend (seconds)
+STEP_PLAN_BUDGET = 0.25
+
+# Refreshes the route home in the background so a navigation step never waits on the planner
+return_planner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="return-plan")
+return_plan_future = None
+return_plan_lock = threading.Lock()
+
+# Seconds the rover needs to cross one cell on the return journey
+RETURN_STEP_TIME = 1.0
+
+# Seconds between position checks once a return-journey run is due to arrive
+RETURN_POLL_INTERVAL = 0.25
+
+# Seconds past steps * RETURN_STEP_TIME after which a run that has not arrived is cut short
+RETURN_RUN_SLACK = 2.0
+
+# Runs in a row that may end without any progress before the return journey gives up
+RETURN_MAX_STALLS = 3
+
+# Longest straight run (in cells) driven on the return journey between battery checks
+RETURN_BATTERY_CHECK_DISTANCE = 10
+
+# Planners /go-back-to-base accepts: the distance field / A* grid route, or an any-angle route with fewer turns
+RETURN_PLANNERS = ("grid", "any_angle")
+
+# Most (start, goal) queries accepted by one /plan/batch request
+MAX_BATCH_QUERIES = 1000
+
+# Obstacle cells reported to the planner, as (x, y) tuples; planners read obstacle_snapshot()
+known_obstacles = set()
+obstacles_lock = threading.Lock()
+
+# Cache of planned paths, invalidated as obstacles are reported
+path_cache = PathCache(maxsize=128)
+
+# Distance-to-base field over the known map, built once the initial position is known
+base_field = None
+base_field_lock = threading.Lock()
+
+# Cells of free space kept around the base and the rover when (re)building the field
+BASE_FIELD_MARGIN = 50
+
+# asyncio engine driving any number of sessions at once, created on first use (needs aiohttp)
+mission_engine = None
+mission_engine_lock = threading.Lock()
+
+# An upstream endpoint that keeps failing answers 503 at once instead of tying up the request
+@app.errorhandler(CircuitOpenError)
+def upstream_circuit_open(e):
+    return jsonify({"error": str(e), "retry_in": e.retry_in}), 503
 
 # Serve the main rover control interface
 @app.route('/')
@@ -51,7 +119,7 @@ def index():
 @app.route('/start-session', methods=['POST'])
 def start_session():
     """Start a new session and return the session ID."""
-    response = requests.post(f"{API_BASE_URL}/session/start")
+    response = upstream.post("/session/start")
     if response.status_code == 200:
         session_data = response.json()
         rover_state['session_id'] = session_data.get('session_id')
@@ -63,7 +131,7 @@ def start_session():
 def get_rover_status():
     """Fetch the rover status using the stored session ID."""
     if rover_state['session_id']:
-        response = requests.get(f"{API_BASE_URL}/rover/status?session_id={rover_state['session_id']}")
+        response = upstream.snapshot("/rover/status", rover_state['session_id'])
         if response.status_code == 200:
             rover_state['status'] = response.json()
             return jsonify(rover_state['status'])
@@ -83,7 +151,7 @@ def get_sensor_data():
             return jsonify(sensor_data_cache["data"])
         
         # Otherwise, fetch new data from API
-        response = requests.get(f"{API_BASE_URL}/rover/sensor-data?session_id={rover_state['session_id']}")
+        response = upstream.snapshot("/rover/sensor-data", rover_state['session_id'])
         if response.status_code == 200:
             sensor_data = response.json()
             
@@ -248,7 +316,7 @@ def refresh_sensor_data():
 def move_rover(direction):
     """Move the rover in a specified direction."""
     if rover_state['session_id']:
-        response = requests.post(f"{API_BASE_URL}/rover/move?session_id={rover_state['session_id']}&direction={direction}")
+        response = upstream.post("/rover/move", session_id=rover_state['session_id'], direction=direction)
         if response.status_code == 200:
             return jsonify({"success": True, "message": f"Rover moving {direction}"})
     return jsonify({"error": "Failed to move rover"}), 400
@@ -258,7 +326,7 @@ def move_rover(direction):
 def recharge_rover():
     """Recharge the rover."""
     if rover_state['session_id']:
-        response = requests.post(f"{API_BASE_URL}/rover/charge?session_id={rover_state['session_id']}")
+        response = upstream.post("/rover/charge", session_id=rover_state['session_id'])
         if response.status_code == 200:
             return jsonify(response.json())
     return jsonify({"error": "Failed to recharge rover"}), 400
@@ -269,9 +337,8 @@ def stop_rover():
     """Stop the rover."""
     if rover_state['session_id']:
         try:
-            stop_url = f"{API_BASE_URL}/rover/stop?session_id={rover_state['session_id']}"
-            print(f"Stopping rover with request to: {stop_url}")
-            stop_response = requests.post(stop_url)
+            print("Stopping rover with request to: /rover/stop")
+            stop_response = upstream.post("/rover/stop", session_id=rover_state['session_id'])
             print(f"Stop response: {stop_response.status_code}")
         except Exception as e:
             print(f"Error stopping rover: {str(e)}")
@@ -301,10 +368,9 @@ def start_auto_navigate():
         
         # Get current status including position
         try:
-            status_url = f"{API_BASE_URL}/rover/status?session_id={rover_state['session_id']}"
-            print(f"Fetching initial rover status from: {status_url}")
+            print("Fetching initial rover status from: /rover/status")
             
-            response = requests.get(status_url)
+            response = upstream.snapshot("/rover/status", rover_state['session_id'])
             print(f"Status response code: {response.status_code}")
             
             if response.status_code == 200:
@@ -391,8 +457,7 @@ def stop_auto_navigate():
         # Stop the rover
         if rover_state['session_id']:
             try:
-                stop_url = f"{API_BASE_URL}/rover/stop?session_id={rover_state['session_id']}"
-                response = requests.post(stop_url)
+                response = upstream.post("/rover/stop", session_id=rover_state['session_id'])
                 print(f"Stop response: {response.status_code}")
             except Exception as e:
                 print(f"Error stopping rover: {str(e)}")
@@ -420,6 +485,7 @@ def auto_navigation_thread():
         while rover_state['navigation_active'] and rover_state['session_id']:
             try:
                 # Run a single navigation step
+                step_began = time.monotonic()
                 next_direction = auto_navigate(current_direction)
                 
                 # Check if we need to update the direction
@@ -438,8 +504,8 @@ def auto_navigation_thread():
                     print(f"Navigation failed: {rover_state['navigation_status']}")
                     break
                 
-                # Wait between steps
-                time.sleep(3)
+                # Keep a steady cadence: wait out whatever the step left of its interval
+                time.sleep(max(0.0, NAVIGATION_STEP_INTERVAL - (time.monotonic() - step_began)))
             except Exception as e:
                 print(f"Error in navigation step: {str(e)}")
                 traceback.print_exc()
@@ -455,59 +521,76 @@ def auto_navigation_thread():
         # Ensure navigation_active is set to False when the thread exits
         rover_state['navigation_active'] = False
 
+def record_step_timing(began, read, decided, moved):
+    """Store the phase durations of one auto-navigation step (monotonic timestamps in, seconds out)."""
+    step_timings.append({
+        "reads": read - began,
+        "decide": decided - read,
+        "move": moved - decided,
+        "total": moved - began
+    })
+
+def step_latency_stats():
+    """Mean and 95th percentile of each step phase over the last STEP_TIMING_WINDOW steps."""
+    timings = list(step_timings)
+    if not timings:
+        return {"steps": 0}
+    result = {"steps": len(timings), "last": timings[-1]}
+    for phase in ("reads", "decide", "move", "total"):
+        values = sorted(t[phase] for t in timings)
+        result[phase] = {
+            "mean": sum(values) / len(values),
+            "p95": values[min(len(values) - 1, int(0.95 * len(values)))]
+        }
+    return result
+
 # Auto-navigate function - single navigation step
 def auto_navigate(current_direction):
-    """Auto navigate the rover based on sensor data and direction logic. Returns the next direction."""
+    """
+    Run one auto-navigation step and return the next direction (None once
+    navigation has finished or failed; auto_navigation_thread repeats steps).
+    
+    The status and sensor reads are independent, so both are issued at once
+    and the step waits one round trip for them instead of two. There is no
+    separate read after the move: the next step's status read reports where
+    the move took the rover.
+    """
     try:
         if not rover_state['session_id']:
             rover_state['navigation_status'] = "Failed: No active session"
             return None
         
-        print(f"Auto-navigating with session {rover_state['session_id']}, current direction: {current_direction}")
+        session_id = rover_state['session_id']
+        print(f"Auto-navigating with session {session_id}, current direction: {current_direction}")
+        step_began = time.monotonic()
+        status_future = step_reader.submit(upstream.snapshot, "/rover/status", session_id)
+        sensor_future = step_reader.submit(upstream.snapshot, "/rover/sensor-data", session_id)
         
         # --------------------------------------------------------------
         # BATTERY CHECK AND RECHARGE - SIMPLIFIED AND MORE DIRECT
         # --------------------------------------------------------------
         need_recharge = False
-        battery_level = None
         
         # Always check battery status first
         try:
             print("*** CHECKING BATTERY STATUS ***")
-            status_url = f"{API_BASE_URL}/rover/status?session_id={rover_state['session_id']}"
-            status_response = requests.get(status_url, timeout=15)
+            status_response = status_future.result()
             
             if status_response.status_code == 200:
                 status_data = status_response.json()
                 print(f"Status data: {status_data}")
                 
-                # Check battery in any form it might appear
-                # First check the battery field directly
-                if 'battery' in status_data:
-                    bat_data = status_data['battery']
-                    if isinstance(bat_data, dict) and 'level' in bat_data:
-                        battery_level = bat_data['level']
-                    elif isinstance(bat_data, (int, float)):
-                        battery_level = bat_data
-                    
-                    print(f"BATTERY LEVEL: {battery_level}%")
-                    
-                    if battery_level is not None and battery_level <= 20:  # More aggressive threshold
-                        need_recharge = True
-                        print(f"*** LOW BATTERY DETECTED: {battery_level}% - RECHARGE NEEDED ***")
+                # Position after the previous step's move
+                position = normalize_position(status_data.get('position'))
+                if position is not None:
+                    rover_state['current_position'] = position
                 
-                # Also check if the status field indicates low battery
-                if 'status' in status_data:
-                    status_text = str(status_data['status']).lower()
-                    if 'low' in status_text or 'battery' in status_text or 'intermittent' in status_text:
-                        need_recharge = True
-                        print(f"*** STATUS INDICATES RECHARGE NEEDED: {status_data['status']} ***")
+                print(f"BATTERY LEVEL: {battery_level(status_data)}%")
                 
-                # Additional direct check for any fields that might indicate battery status
-                for key, value in status_data.items():
-                    if isinstance(value, str) and ('low' in value.lower() or 'battery' in value.lower()):
-                        need_recharge = True
-                        print(f"*** DETECTED BATTERY ISSUE IN FIELD {key}: {value} ***")
+                reason = recharge_reason(status_data)
+                if reason:
+                    need_recharge = True
+                    print(f"*** RECHARGE NEEDED: {reason} ***")
             else:
                 print(f"Failed to get status: {status_response.text}")
                 # Assume we need to recharge if we get an error
@@ -529,8 +612,7 @@ def auto_navigate(current_direction):
             # Stop the rover first
             try:
                 print("Stopping rover before recharge...")
-                stop_url = f"{API_BASE_URL}/rover/stop?session_id={rover_state['session_id']}"
-                stop_response = requests.post(stop_url, timeout=10)
+                stop_response = upstream.post("/rover/stop", session_id=rover_state['session_id'])
                 print(f"Stop response: {stop_response.status_code}")
                 time.sleep(2)  # Brief pause after stopping
             except Exception as e:
@@ -542,24 +624,18 @@ def auto_navigate(current_direction):
             # Execute recharge - very direct approach
             print("EXECUTING RECHARGE...")
             
+            # The upstream client retries the charge request with backoff (see upstream.RETRY_POLICIES)
             recharge_success = False
-            for attempt in range(1, 6):  # 5 attempts
-                try:
-                    print(f"Recharge attempt {attempt}/5...")
-                    recharge_url = f"{API_BASE_URL}/rover/charge?session_id={rover_state['session_id']}"
-                    recharge_response = requests.post(recharge_url, timeout=20)
-                    
-                    if recharge_response.status_code == 200:
-                        print(f"RECHARGE SUCCESS! Response: {recharge_response.text}")
-                        recharge_success = True
-                        break
-                    else:
-                        print(f"Recharge attempt {attempt} failed: {recharge_response.status_code}")
-                except Exception as e:
-                    print(f"Error during recharge attempt {attempt}: {str(e)}")
+            try:
+                recharge_response = upstream.post("/rover/charge", session_id=rover_state['session_id'])
                 
-                # Wait between attempts
-                time.sleep(3)
+                if recharge_response.status_code == 200:
+                    print(f"RECHARGE SUCCESS! Response: {recharge_response.text}")
+                    recharge_success = True
+                else:
+                    print(f"Recharge failed: {recharge_response.status_code}")
+            except Exception as e:
+                print(f"Error during recharge: {str(e)}")
             
             if recharge_success:
                 print("RECHARGE COMPLETED SUCCESSFULLY")
@@ -571,8 +647,7 @@ def auto_navigate(current_direction):
                 # Resume movement
                 try:
                     print(f"Resuming movement in direction: {last_direction}")
-                    move_url = f"{API_BASE_URL}/rover/move?session_id={rover_state['session_id']}&direction={last_direction.lower()}"
-                    move_response = requests.post(move_url, timeout=10)
+                    move_response = upstream.post("/rover/move", session_id=rover_state['session_id'], direction=last_direction.lower())
                     
                     if move_response.status_code == 200:
                         print("Movement resumed successfully")
@@ -581,137 +656,47 @@ def auto_navigate(current_direction):
                 except Exception as e:
                     print(f"Error resuming movement: {str(e)}")
             else:
-                print("ALL RECHARGE ATTEMPTS FAILED")
+                print("RECHARGE FAILED")
                 rover_state['navigation_status'] = "Recharge failed - attempting to continue"
             
             # Always return the last direction to maintain course
             return last_direction
         
-        # Get sensor data with retry logic
-        max_retries = 3
+        # Get sensor data (already requested alongside the status); communication
+        # errors such as 502 were retried with backoff by the upstream client
         sensor_data = None
-        
-        for retry in range(max_retries):
-            try:
-                sensor_url = f"{API_BASE_URL}/rover/sensor-data?session_id={rover_state['session_id']}"
-                print(f"Requesting sensor data from: {sensor_url} (attempt {retry+1})")
-                response = requests.get(sensor_url, timeout=15)
-                print(f"Sensor data response code: {response.status_code}")
-                
-                if response.status_code == 200:
-                    sensor_data = response.json()
-                    print(f"Received sensor data: {sensor_data}")
-                    break
-                elif response.status_code == 502:
-                    print(f"502 error on sensor data attempt {retry+1} - communication issues")
-                    time.sleep(2 * (retry + 1))  # Exponential backoff
-                else:
-                    print(f"Failed to get sensor data: {response.status_code} - {response.text}")
-                    time.sleep(2)
-            except Exception as e:
-                print(f"Exception getting sensor data (attempt {retry+1}): {str(e)}")
-                time.sleep(2)
+        try:
+            response = sensor_future.result()
+            print(f"Sensor data response code: {response.status_code}")
+            
+            if response.status_code == 200:
+                sensor_data = response.json()
+                print(f"Received sensor data: {sensor_data}")
+            else:
+                print(f"Failed to get sensor data: {response.status_code} - {response.text}")
+        except Exception as e:
+            print(f"Exception getting sensor data: {str(e)}")
         
         if not sensor_data:
-            rover_state['navigation_status'] = f"Failed: Could not get sensor data after {max_retries} attempts"
+            rover_state['navigation_status'] = "Failed: Could not get sensor data"
             return
+        step_read = time.monotonic()
         
-        # CAREFULLY Extract required sensor values for direction determination AND SUPPLY DROP CHECK
-        # Initialize with defaults to ensure values exist
-        rfid_detected = False
-        ir_detected = False
-        ultrasonic_data = (0, False)
-        accelerometer_data = [0, 0, 0]
-        
-        # Process RFID data - CRITICAL FOR SUPPLY DROP
-        if 'rfid' in sensor_data:
-            rfid_data = sensor_data['rfid']
-            # DETAILED LOGGING for RFID data
-            print(f"RFID data raw value: {rfid_data}")
-            
-            if isinstance(rfid_data, dict):
-                if 'tag_detected' in rfid_data:
-                    rfid_detected = rfid_data['tag_detected']
-                elif 'detected' in rfid_data:
-                    rfid_detected = rfid_data['detected']
-                elif 'value' in rfid_data:
-                    rfid_detected = bool(rfid_data['value'])
-            elif isinstance(rfid_data, bool):
-                rfid_detected = rfid_data
-            elif isinstance(rfid_data, (int, float, str)):
-                # Convert various data types to boolean
-                if isinstance(rfid_data, str):
-                    rfid_detected = rfid_data.lower() in ('true', 'yes', '1', 'detected')
-                else:
-                    rfid_detected = bool(rfid_data)
-        
-        # Explicit logging of RFID detection status
+        # Extract the sensor values for direction determination AND SUPPLY DROP CHECK
+        readings = parse_sensor_data(sensor_data)
+        rfid_detected = readings['rfid']
+        ir_detected = readings['ir']
+        ultrasonic_data = readings['ultrasonic']
+        accelerometer_data = readings['accelerometer']
         print(f"*** RFID DETECTION STATUS: {rfid_detected} ***")
-        
-        # Process IR data
-        if 'ir' in sensor_data:
-            ir_data = sensor_data['ir']
-            print(f"IR data raw value: {ir_data}")
-            
-            if isinstance(ir_data, dict):
-                if 'reflection' in ir_data:
-                    ir_detected = ir_data['reflection']
-                elif 'detected' in ir_data:
-                    ir_detected = ir_data['detected']
-                elif 'value' in ir_data:
-                    ir_detected = bool(ir_data['value'])
-            elif isinstance(ir_data, bool):
-                ir_detected = ir_data
-            elif isinstance(ir_data, (int, float, str)):
-                if isinstance(ir_data, str):
-                    ir_detected = ir_data.lower() in ('true', 'yes', '1', 'detected')
-                else:
-                    ir_detected = bool(ir_data)
-        
         print(f"IR DETECTION STATUS: {ir_detected}")
-        
-        # Process ultrasonic data
-        if 'ultrasonic' in sensor_data:
-            us_data = sensor_data['ultrasonic']
-            print(f"Ultrasonic data raw value: {us_data}")
-            
-            distance = 0
-            detection = False
-            
-            if isinstance(us_data, dict):
-                distance = us_data.get('distance', 0)
-                detection = us_data.get('detection', False)
-                if 'detected' in us_data:
-                    detection = us_data['detected']
-            elif isinstance(us_data, (int, float)):
-                distance = float(us_data) if us_data is not None else 0
-                detection = distance < 100  # Example threshold
-            
-            ultrasonic_data = (distance, detection)
-        
         print(f"ULTRASONIC DETECTION: Distance={ultrasonic_data[0]}, Detected={ultrasonic_data[1]}")
         
-        # Process accelerometer data
-        if 'accelerometer' in sensor_data:
-            accel_data = sensor_data['accelerometer']
-            if isinstance(accel_data, dict):
-                accelerometer_data = [accel_data.get('x', 0), accel_data.get('y', 0), accel_data.get('z', 0)]
-            elif isinstance(accel_data, list) and len(accel_data) >= 3:
-                accelerometer_data = accel_data[0:3]
-        
-        # Process position data
-        if 'position' in sensor_data:
-            position = sensor_data['position']
-            if isinstance(position, dict):
-                rover_state['current_position'] = position
-                print(f"Updated current position from sensor data: {position}")
-            elif isinstance(position, list) and len(position) >= 2:
-                rover_state['current_position'] = {'x': position[0], 'y': position[1]}
-                print(f"Updated current position from sensor data array: {rover_state['current_position']}")
-            else:
-                print(f"Unexpected position format: {position}")
+        if readings['position'] is not None:
+            rover_state['current_position'] = readings['position']
+            print(f"Updated current position from sensor data: {readings['position']}")
         else:
-            print("No position data found in sensor response")
+            print("No usable position data found in sensor response")
         
         # SUPPLY DROP CONDITION CHECK - SIMPLIFIED AND MORE DIRECT
         # Special case: If RFID is detected, consider this as a supply drop point
@@ -728,9 +713,8 @@ def auto_navigate(current_direction):
             
             # Stop the rover
             try:
-                stop_url = f"{API_BASE_URL}/rover/stop?session_id={rover_state['session_id']}"
-                print(f"Stopping rover with request to: {stop_url}")
-                stop_response = requests.post(stop_url)
+                print("Stopping rover with request to: /rover/stop")
+                stop_response = upstream.post("/rover/stop", session_id=rover_state['session_id'])
                 print(f"Stop response: {stop_response.status_code}")
             except Exception as e:
                 print(f"Error stopping rover: {str(e)}")
@@ -763,7 +747,7 @@ def auto_navigate(current_direction):
             
             # Get current position before stopping
             try:
-                status_response = requests.get(f"{API_BASE_URL}/rover/status?session_id={rover_state['session_id']}")
+                status_response = upstream.snapshot("/rover/status", rover_state['session_id'])
                 print(f"Status response at destination: {status_response.status_code}")
                 
                 if status_response.status_code == 200:
@@ -785,9 +769,8 @@ def auto_navigate(current_direction):
         
             # Stop the rover
             try:
-                stop_url = f"{API_BASE_URL}/rover/stop?session_id={rover_state['session_id']}"
-                print(f"Stopping rover with request to: {stop_url}")
-                stop_response = requests.post(stop_url)
+                print("Stopping rover with request to: /rover/stop")
+                stop_response = upstream.post("/rover/stop", session_id=rover_state['session_id'])
                 print(f"Stop response: {stop_response.status_code}")
             except Exception as e:
                 print(f"Error stopping rover: {str(e)}")
@@ -799,15 +782,15 @@ def auto_navigate(current_direction):
         
         # Convert direction string to lowercase for API call
         move_direction = next_direction.lower()
+        step_decided = time.monotonic()
         
         # Move the rover
         try:
             # Format the URL correctly with session_id and direction
-            move_url = f"{API_BASE_URL}/rover/move?session_id={rover_state['session_id']}&direction={move_direction}"
-            print(f"Moving rover with request to: {move_url}")
+            print(f"Moving rover with request to: /rover/move ({move_direction})")
             
             # Make the POST request to move the rover
-            move_response = requests.post(move_url)
+            move_response = upstream.post("/rover/move", session_id=rover_state['session_id'], direction=move_direction)
             print(f"Move response status: {move_response.status_code}")
             
             if move_response.status_code == 200:
@@ -821,36 +804,12 @@ def auto_navigate(current_direction):
             print(f"Exception moving rover: {str(e)}")
             return
         
-        # Get updated rover status to update current position
-        try:
-            status_url = f"{API_BASE_URL}/rover/status?session_id={rover_state['session_id']}"
-            print(f"Getting updated status from: {status_url}")
-            status_response = requests.get(status_url)
-            
-            if status_response.status_code == 200:
-                status_data = status_response.json()
-                print(f"Updated status data: {status_data}")
-                
-                if 'position' in status_data:
-                    position = status_data['position']
-                    if not isinstance(position, dict):
-                        if isinstance(position, list) and len(position) >= 2:
-                            position = {'x': position[0], 'y': position[1]}
-                        else:
-                            position = {'x': 0, 'y': 0}
-                    rover_state['current_position'] = position
-                    print(f"Updated position after move: {position}")
-            else:
-                print(f"Failed to get updated status: {status_response.status_code}")
-        except Exception as e:
-            print(f"Error getting updated status: {str(e)}")
+        record_step_timing(step_began, step_read, step_decided, time.monotonic())
         
-        # Wait a bit before making the next move
-        time.sleep(1.5)
+        # Refresh the route home on the planner thread while the rover moves
+        refresh_return_plan(rover_state['current_position'])
         
-        # Recursively call auto_navigate with the new direction
-        print(f"Recursively calling auto_navigate with direction: {next_direction}")
-        auto_navigate(next_direction)
+        return next_direction
     except Exception as e:
         print(f"Exception in auto_navigate: {str(e)}")
         rover_state['navigation_status'] = f"Failed: {str(e)}"
@@ -869,19 +828,13 @@ def get_auto_navigation_status():
     # Fetch battery level if available
     if rover_state['session_id']:
         try:
-            status_url = f"{API_BASE_URL}/rover/status?session_id={rover_state['session_id']}"
-            response = requests.get(status_url, timeout=10)
+            response = upstream.snapshot("/rover/status", rover_state['session_id'])
             
             if response.status_code == 200:
                 status_data = response.json()
                 
                 # Extract battery level
-                if 'battery' in status_data:
-                    bat_data = status_data['battery']
-                    if isinstance(bat_data, dict) and 'level' in bat_data:
-                        result['battery_level'] = bat_data['level']
-                    elif isinstance(bat_data, (int, float)):
-                        result['battery_level'] = bat_data
+                result['battery_level'] = battery_level(status_data)
                 
                 # Add current position if available
                 if 'position' in status_data:
@@ -900,6 +853,9 @@ def get_auto_navigation_status():
         result['initial_position'] = rover_state['initial_position']
     if rover_state['final_position']:
         result['final_position'] = rover_state['final_position']
+    result['distance_home'] = get_distance_home(result.get('current_position') or rover_state['current_position'])
+    result['return_plan'] = rover_state['return_plan']
+    result['step_latency'] = step_latency_stats()
     
     return jsonify(result)
 
@@ -910,69 +866,258 @@ def get_position_data():
     return jsonify({
         "initial_position": rover_state['initial_position'],
         "final_position": rover_state['final_position'],
-        "current_position": rover_state['current_position']
+        "current_position": rover_state['current_position'],
+        "distance_home": get_distance_home(rover_state['current_position'])
     })
 
-# A* Algorithm implementation
-def heuristic(a, b):
+# Report obstacle cells to the planner or list the known ones
+@app.route('/map/obstacles', methods=['GET', 'POST'])
+def map_obstacles():
+    """Add obstacle cells ({"obstacles": [[x, y], ...]}) or list the known ones."""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            cells = {(int(cell[0]), int(cell[1])) for cell in data.get('obstacles', [])}
+        except (ValueError, TypeError, IndexError) as e:
+            return jsonify({"error": f"Invalid obstacle coordinates: {str(e)}"}), 400
+        
+        with obstacles_lock:
+            new_cells = cells - known_obstacles
+            known_obstacles.update(new_cells)
+        if new_cells:
+            path_cache.invalidate(new_cells)
+            with base_field_lock:
+                if base_field is not None:
+                    base_field.add_obstacles(new_cells)
+    
+    return jsonify({
+        "obstacles": sorted(obstacle_snapshot()),
+        "map_version": path_cache.version
+    })
+
+# Path cache counters for tuning
+@app.route('/planner/cache-stats', methods=['GET'])
+def planner_cache_stats():
+    """Get hit rate, eviction and invalidation counters of the path cache."""
+    return jsonify(path_cache.stats())
+
+# Upstream API call counts and latency per endpoint
+@app.route('/upstream/stats', methods=['GET'])
+def upstream_stats():
+    """Get per-endpoint upstream latency and errors, calls saved by coalescing, circuit breaker states and the retry budget."""
+    return jsonify(upstream.stats())
+
+def get_mission_engine():
+    """Return the shared MissionEngine, creating it on first use; raises RuntimeError without aiohttp."""
+    global mission_engine
+    with mission_engine_lock:
+        if mission_engine is None:
+            mission_engine = MissionEngine(upstream.base_url)
+        return mission_engine
+
+# Drive a session with the asyncio mission engine
+@app.route('/missions', methods=['GET', 'POST'])
+def missions():
+    """
+    GET: list every mission run by the engine.
+    POST: start a mission ({"session_id": ..., "direction": "forward"}); without
+    a session_id a new session is started for it.
+    """
+    if request.method == 'GET':
+        return jsonify({"missions": mission_engine.missions() if mission_engine is not None else []})
+    
+    data = request.get_json(silent=True) or {}
     try:
-        return abs(int(a[0]) - int(b[0])) + abs(int(a[1]) - int(b[1]))
-    except (ValueError, TypeError) as e:
-        app.logger.error(f"Error in heuristic: {str(e)}")
-        return float('inf')
+        engine = get_mission_engine()
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    try:
+        mission = engine.launch(data.get('session_id'), data.get('direction', 'forward'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        app.logger.error(f"Error starting mission: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    return jsonify(mission), 201
+
+@app.route('/missions/<session_id>', methods=['GET'])
+def mission_status(session_id):
+    """Get the state of one session's mission."""
+    mission = mission_engine.mission(session_id) if mission_engine is not None else None
+    if mission is None:
+        return jsonify({"error": f"No mission for session {session_id}"}), 404
+    return jsonify(mission)
+
+@app.route('/missions/<session_id>/cancel', methods=['POST'])
+def cancel_mission(session_id):
+    """Cancel a session's mission immediately and stop the rover."""
+    if mission_engine is None or not mission_engine.cancel(session_id):
+        return jsonify({"error": f"No active mission for session {session_id}"}), 404
+    return jsonify({"success": True, "message": f"Mission for session {session_id} cancelled"})
+
+# Plan many routes at once over the known map
+@app.route('/plan/batch', methods=['POST'])
+def plan_batch_route():
+    """
+    Plan a list of queries ({"queries": [[[sx, sy], [gx, gy]], ...], "diagonal": false})
+    against the known obstacles in worker processes. Results come back in query order.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        queries = [((int(q[0][0]), int(q[0][1])), (int(q[1][0]), int(q[1][1]))) for q in data.get('queries', [])]
+    except (ValueError, TypeError, IndexError) as e:
+        return jsonify({"error": f"Invalid query coordinates: {str(e)}"}), 400
+    if not queries:
+        return jsonify({"error": "No queries given"}), 400
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}), 400
+    
+    started = time.monotonic()
+    try:
+        results = plan_batch(queries, obstacle_snapshot(), diagonal=bool(data.get('diagonal', False)),
+                             time_limit=PLAN_TIME_LIMIT)
+    except Exception as e:
+        app.logger.error(f"Error in batch planning: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+    return jsonify({
+        "results": [result.to_dict() for result in results],
+        "elapsed": time.monotonic() - started
+    })
 
-def a_star_search(start, goal):
+def position_to_tuple(position):
+    """Convert a {'x', 'y'} dict or [x, y] list position to an (x, y) tuple of ints, or None."""
+    try:
+        if isinstance(position, dict):
+            return (int(position.get('x', 0)), int(position.get('y', 0)))
+        if isinstance(position, (list, tuple)) and len(position) >= 2:
+            return (int(position[0]), int(position[1]))
+    except (ValueError, TypeError):
+        pass
+    return None
+
+def obstacle_snapshot():
+    """Frozen copy of known_obstacles, safe to iterate while /map/obstacles adds cells."""
+    with obstacles_lock:
+        return frozenset(known_obstacles)
+
+def get_base_field(position=None):
+    """
+    Get the distance-to-base field, building it on first use and rebuilding it
+    when the base changes or `position` lies outside its grid. Returns None
+    until the initial position is known.
+    """
+    global base_field
+    base = position_to_tuple(rover_state['initial_position'])
+    if base is None:
+        return None
+    
+    with base_field_lock:
+        field = base_field
+        if field is None or field.base != base or (position is not None and not field.grid.contains(position)):
+            obstacles = obstacle_snapshot()
+            bounds = search_bounds(base, position or base, obstacles, margin=BASE_FIELD_MARGIN)
+            if field is not None and field.base == base:
+                # Grow the grid rather than forgetting the area already covered
+                bounds = (min(bounds[0], field.grid.min_x), min(bounds[1], field.grid.min_y),
+                          max(bounds[2], field.grid.max_x), max(bounds[3], field.grid.max_y))
+            field = DistanceField(OccupancyGrid(bounds, obstacles), base)
+            base_field = field
+        return field
+
+def get_distance_home(position):
+    """Number of moves from position back to the initial position, or None if unknown."""
+    position = position_to_tuple(position)
+    if position is None:
+        return None
+    field = get_base_field(position)
+    if field is None:
+        return None
+    with base_field_lock:
+        return field.distance(position)
+
+# A* path planning for the return journey (see astar.anytime_astar)
+def a_star_search(start, goal, deadline=None):
+    """
+    Plan a 4-connected path, returning the best path found by `deadline`
+    (PLAN_TIME_LIMIT from now by default). Only paths proven optimal are cached.
+    """
     try:
         start = (int(start[0]), int(start[1]))
         goal = (int(goal[0]), int(goal[1]))
-        
-        open_set = []
-        came_from = {}
-        g_score = {start: 0}
-        f_score = {start: heuristic(start, goal)}
-        
-        open_set.append(start)
-        
-        while open_set:
-            current = min(open_set, key=lambda x: f_score[x])
-            
-            if current == goal:
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start)
-                path.reverse()
-                return path
-            
-            open_set.remove(current)
-            
-            # Consider all 4 possible directions (up, down, left, right)
-            neighbors = [
-                (current[0] + 1, current[1]),  # right
-                (current[0] - 1, current[1]),  # left
-                (current[0], current[1] + 1),  # down
-                (current[0], current[1] - 1)   # up
-            ]
-            
-            for neighbor in neighbors:
-                try:
-                    tentative_g_score = g_score[current] + 1
-                    
-                    if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                        came_from[neighbor] = current
-                        g_score[neighbor] = tentative_g_score
-                        f_score[neighbor] = g_score[neighbor] + heuristic(neighbor, goal)
-                        if neighbor not in open_set:
-                            open_set.append(neighbor)
-                except (ValueError, TypeError) as e:
-                    app.logger.error(f"Error processing neighbor {neighbor}: {str(e)}")
-                    continue
-        
-        return []  # No path found
+        if deadline is None:
+            deadline = time.monotonic() + PLAN_TIME_LIMIT
+        result = anytime_astar(start, goal, obstacle_snapshot(), deadline=deadline)
+        if result.found:
+            app.logger.info(f"Planned {len(result.path)} steps from {start} to {goal} "
+                            f"within {result.epsilon:.2f}x of optimal ({result.iterations} iterations)")
+            if result.epsilon == 1.0:
+                path_cache.put(start, goal, "astar", result.path)
+        return result
     except Exception as e:
         app.logger.error(f"Error in A* search: {str(e)}")
-        return []
+        return None
+
+# Any-angle planning for the return journey (see astar.any_angle_astar)
+def any_angle_search(start, goal, deadline=None):
+    """
+    Plan an any-angle route, returning an AnyAngleResult whose path is already
+    expanded into 4-connected cells, or None on error. Found routes are cached.
+    """
+    try:
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        if deadline is None:
+            deadline = time.monotonic() + PLAN_TIME_LIMIT
+        result = any_angle_astar(start, goal, obstacle_snapshot(), deadline=deadline)
+        if result.found:
+            app.logger.info(f"Planned {len(result.waypoints)} waypoints ({len(result.path)} steps) "
+                            f"from {start} to {goal}")
+            path_cache.put(start, goal, "any_angle", result.path)
+        return result
+    except Exception as e:
+        app.logger.error(f"Error in any-angle search: {str(e)}")
+        return None
+
+def plan_return_route(position, deadline):
+    """
+    Plan from position back to the initial position before `deadline` and
+    record the route's length and suboptimality bound in rover_state.
+    Optimal routes land in the path cache for go_back_to_base.
+    """
+    start = position_to_tuple(position)
+    base = position_to_tuple(rover_state['initial_position'])
+    if start is None or base is None:
+        return
+    if path_cache.contains(start, base, "astar"):
+        return  # Already have an optimal route from here
+    
+    result = a_star_search(start, base, deadline)
+    if result is None:
+        return
+    rover_state['return_plan'] = {
+        "from": list(start),
+        "status": result.status,
+        "steps": len(result.path) - 1 if result.path else None,
+        "epsilon": result.epsilon,
+        "elapsed": result.elapsed
+    }
+
+def refresh_return_plan(position):
+    """
+    Run plan_return_route() from position on the planner thread within
+    STEP_PLAN_BUDGET. Skipped while the previous refresh is still running,
+    so a slow plan never queues up behind the navigation steps.
+    """
+    global return_plan_future
+    position = position_to_tuple(position)
+    if position is None:
+        return
+    with return_plan_lock:
+        if return_plan_future is not None and not return_plan_future.done():
+            return
+        return_plan_future = return_planner.submit(
+            lambda: plan_return_route(position, time.monotonic() + STEP_PLAN_BUDGET))
 
 def get_direction(current, next_pos):
     try:
@@ -992,6 +1137,156 @@ def get_direction(current, next_pos):
         app.logger.error(f"Error in get_direction: {str(e)}")
         return "stay"
 
+def path_to_segments(path, max_steps=None):
+    """
+    Collapse a cell-by-cell path into straight runs of get_direction() moves.
+    
+    Args:
+        path: List of (x, y) cells
+        max_steps: Split runs longer than this many cells (optional)
+    
+    Returns:
+        List of (direction, steps, start cell, end cell) tuples; cells where
+        get_direction() says "stay" are skipped
+    """
+    segments = []
+    for current, next_pos in zip(path, path[1:]):
+        direction = get_direction(current, next_pos)
+        if direction == "stay":
+            continue
+        if segments:
+            last_direction, steps, start, _ = segments[-1]
+            if last_direction == direction and (max_steps is None or steps < max_steps):
+                segments[-1] = (direction, steps + 1, start, next_pos)
+                continue
+        segments.append((direction, 1, current, next_pos))
+    return segments
+
+def plan_route_home(start, base, planner):
+    """
+    Path from start to base with one of RETURN_PLANNERS, reusing a cached
+    route when there is one. An any-angle search that runs out of time or
+    node budget falls back to the grid route. Returns an empty list if no
+    path is found.
+    """
+    path = []
+    if planner == "any_angle":
+        # Straight lines between obstacle corners, driven as L-shaped runs
+        path = path_cache.get(start, base, "any_angle")
+        if path:
+            return path
+        result = any_angle_search(start, base)
+        if result is not None and result.found:
+            return result.path
+        # Lazy Theta* expands far more cells than A* on cluttered maps and often
+        # hits the deadline first; the grid route still gets the rover home
+        app.logger.warning(f"Any-angle search from {start} to {base} ended with "
+                           f"{result.status if result is not None else 'an error'}; using the grid route")
+    
+    # Follow the distance-to-base field home without searching
+    field = get_base_field(start)
+    if field is not None and field.base == base:
+        with base_field_lock:
+            path = field.path_home(start)
+    
+    # Otherwise calculate path using A* from start to base, reusing a cached
+    # path if no obstacle has been reported on it since it was planned
+    if not path:
+        path = path_cache.get(start, base, "astar")
+    if not path:
+        result = a_star_search(start, base)
+        path = result.path if result is not None else []
+    return path
+
+def read_rover_position():
+    """The rover's position as an (x, y) tuple from a fresh /rover/status read, or None."""
+    response = upstream.snapshot("/rover/status", rover_state['session_id'])
+    if response.status_code != 200:
+        return None
+    return position_to_tuple(normalize_position(response.json().get('position')))
+
+def drive_run(direction, steps, start, end):
+    """
+    Drive one straight return-journey run and return where the rover ended up.
+    
+    A /rover/move sets the rover driving in `direction` until the next move
+    or stop; it is not a single-cell step (the recharge path and the stop
+    button rely on the same behaviour). So the run sends one move, waits
+    until the rover is due one cell before `end`, then polls /rover/status
+    every RETURN_POLL_INTERVAL and stops the rover as soon as it reports
+    `end`. The run is cut short if the rover leaves the line from `start`
+    to `end`, or is still short of `end` RETURN_RUN_SLACK seconds after it
+    was due.
+    
+    Returns:
+        The (x, y) position the rover reports after the stop, which the
+        caller compares with `end`, or None if it could not be read
+    """
+    def on_run(position):
+        return (min(start[0], end[0]) <= position[0] <= max(start[0], end[0]) and
+                min(start[1], end[1]) <= position[1] <= max(start[1], end[1]))
+    
+    session_id = rover_state['session_id']
+    due = time.monotonic() + steps * RETURN_STEP_TIME
+    move_response = upstream.post("/rover/move", session_id=session_id, direction=direction)
+    if move_response.status_code != 200:
+        app.logger.error(f"Failed to move rover {direction}: {move_response.status_code}")
+    else:
+        time.sleep(max(0.0, due - RETURN_STEP_TIME - time.monotonic()))
+        while time.monotonic() < due + RETURN_RUN_SLACK:
+            position = read_rover_position()
+            if position == end:
+                break
+            if position is not None and not on_run(position):
+                app.logger.warning(f"Rover left the run from {start} to {end} at {position}")
+                break
+            time.sleep(RETURN_POLL_INTERVAL)
+    
+    upstream.post("/rover/stop", session_id=session_id)
+    position = read_rover_position()
+    if position is not None:
+        rover_state['current_position'] = {'x': position[0], 'y': position[1]}
+    return position
+
+def recharge_if_low(position):
+    """
+    Check the battery over the sensor-data endpoint and recharge to
+    RECHARGED_LEVEL if it is at LOW_BATTERY_LEVEL or below.
+    """
+    battery_response = upstream.snapshot("/rover/sensor-data", rover_state['session_id'])
+    if battery_response.status_code != 200:
+        return
+    battery_level = battery_response.json().get('battery', 100)
+    rover_state['battery'] = battery_level
+    if battery_level > LOW_BATTERY_LEVEL:
+        return
+    
+    rover_state['navigation_status'] = "Low battery - Recharging"
+    rover_state['last_position_before_recharge'] = position
+    
+    # Stop the rover
+    stop_response = upstream.post("/rover/stop", session_id=rover_state['session_id'])
+    if stop_response.status_code != 200:
+        app.logger.error("Failed to stop rover")
+        return
+    
+    # Start recharging
+    recharge_response = upstream.post("/rover/charge", session_id=rover_state['session_id'])
+    if recharge_response.status_code != 200:
+        app.logger.error("Failed to recharge")
+        return
+    
+    # Wait for charging to complete
+    while True:
+        battery_check = upstream.snapshot("/rover/sensor-data", rover_state['session_id'])
+        if battery_check.status_code == 200:
+            current_battery = battery_check.json().get('battery', 0)
+            rover_state['battery'] = current_battery
+            if current_battery >= RECHARGED_LEVEL:
+                rover_state['navigation_status'] = "Recharged - Resuming journey"
+                break
+        time.sleep(1)
+
 # Endpoint for Go Back to Base functionality
 @app.route('/go-back-to-base', methods=['POST'])
 def go_back_to_base():
@@ -1027,69 +1322,50 @@ def go_back_to_base():
         if final_pos == initial_pos:
             return jsonify({"message": "Already at initial position"})
         
-        # Calculate path using A* from final_pos to initial_pos
-        path = a_star_search(final_pos, initial_pos)
+        data = request.get_json(silent=True) or {}
+        planner = data.get('planner', 'grid')
+        if planner not in RETURN_PLANNERS:
+            return jsonify({"error": f"Unknown planner {planner!r}; choose from {list(RETURN_PLANNERS)}"}), 400
+        
+        path = plan_route_home(final_pos, initial_pos, planner)
         
         if not path:
             return jsonify({"error": "No path found to initial position"}), 400
         
+        # Drive straight runs as one move each, checking the battery between runs
+        segments = path_to_segments(path, RETURN_BATTERY_CHECK_DISTANCE)
+        
         # Start navigation thread for return journey
         def return_journey_thread():
             try:
-                for i in range(len(path) - 1):
-                    current = path[i]
-                    next_pos = path[i + 1]
-                    
-                    # Update current position in state
-                    rover_state['current_position'] = {'x': current[0], 'y': current[1]}
-                    
-                    # Check battery level
-                    battery_response = requests.get(f"{API_BASE_URL}/rover/sensor-data?session_id={rover_state['session_id']}")
-                    if battery_response.status_code == 200:
-                        battery_level = battery_response.json().get('battery', 100)
-                        rover_state['battery'] = battery_level
+                position = final_pos
+                route = segments
+                stalls = 0
+                while position != initial_pos:
+                    for direction, steps, start, end in route:
+                        rover_state['current_position'] = {'x': start[0], 'y': start[1]}
+                        recharge_if_low(start)
                         
-                        # If battery is low, recharge
-                        if battery_level <= 20:
-                            rover_state['navigation_status'] = "Low battery - Recharging"
-                            rover_state['last_position_before_recharge'] = current
-                            
-                            # Stop the rover
-                            stop_response = requests.post(f"{API_BASE_URL}/rover/stop?session_id={rover_state['session_id']}")
-                            if stop_response.status_code != 200:
-                                app.logger.error("Failed to stop rover")
-                                continue
-                            
-                            # Start recharging
-                            recharge_response = requests.post(f"{API_BASE_URL}/rover/charge?session_id={rover_state['session_id']}")
-                            if recharge_response.status_code != 200:
-                                app.logger.error("Failed to recharge")
-                                continue
-                            
-                            # Wait for charging to complete
-                            while True:
-                                battery_check = requests.get(f"{API_BASE_URL}/rover/sensor-data?session_id={rover_state['session_id']}")
-                                if battery_check.status_code == 200:
-                                    current_battery = battery_check.json().get('battery', 0)
-                                    rover_state['battery'] = current_battery
-                                    if current_battery >= 90:
-                                        rover_state['navigation_status'] = "Recharged - Resuming journey"
-                                        break
-                                time.sleep(1)
+                        rover_state['navigation_status'] = f"Moving {direction} {steps} cells to {end}"
+                        reached = drive_run(direction, steps, start, end)
+                        if reached is None:
+                            raise RuntimeError("rover position unavailable")
+                        stalls = stalls + 1 if reached == start else 0
+                        position = reached
+                        if reached != end:
+                            break
                     
-                    # Move to next position
-                    direction = get_direction(current, next_pos)
-                    if direction == "stay":
-                        continue
-                    
-                    rover_state['navigation_status'] = f"Moving {direction} to {next_pos}"
-                    move_response = requests.post(f"{API_BASE_URL}/rover/move?session_id={rover_state['session_id']}&direction={direction}")
-                    
-                    if move_response.status_code != 200:
-                        app.logger.error(f"Failed to move rover in direction {direction}")
-                        continue
+                    if position == initial_pos:
+                        break
+                    if stalls >= RETURN_MAX_STALLS:
+                        raise RuntimeError(f"rover made no progress from {position} after {stalls} runs")
                     
-                    time.sleep(1)  # Wait for movement to complete
+                    # The run did not end where planned: re-plan from the reported position
+                    app.logger.warning(f"Return journey off plan at {position}; re-planning")
+                    new_path = plan_route_home(position, initial_pos, planner)
+                    if not new_path:
+                        raise RuntimeError(f"no path found from {position}")
+                    route = path_to_segments(new_path, RETURN_BATTERY_CHECK_DISTANCE)
                 
                 # Update state when journey is complete
                 rover_state['navigation_status'] = "Return to base completed"
@@ -1098,6 +1374,10 @@ def go_back_to_base():
             except Exception as e:
                 app.logger.error(f"Error in return journey: {str(e)}")
                 rover_state['navigation_status'] = f"Return journey failed: {str(e)}"
+                try:
+                    upstream.post("/rover/stop", session_id=rover_state['session_id'])
+                except Exception:
+                    pass
                 
         # Start the return journey thread
         if rover_state.get('return_thread') and rover_state['return_thread'].is_alive():
@@ -1108,7 +1388,8 @@ def go_back_to_base():
         rover_state['return_thread'] = return_thread
         return_thread.start()
         
-        return jsonify({"message": "Return journey started"})
+        return jsonify({"message": "Return journey started", "planner": planner,
+                        "steps": len(path) - 1, "segments": len(segments)})
         
     except Exception as e:
         app.logger.error(f"Error in go_back_to_base: {str(e)}")
@@ -0,0 +1,129 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from astar import OccupancyGrid, search_bounds, search_grid
+
+# Batches smaller than this are planned in the calling process; pool start-up would cost more
+MIN_PARALLEL_QUERIES = 16
+
+# Worker processes kept alive between batches, started on first use (see _get_pool)
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# Grid of the batch the current worker process last planned on, attached by _attach_grid
+_worker_grid = None
+_worker_memory = None
+_worker_view = None
+
+def batch_bounds(queries, obstacles=None):
+    """Search region covering every start and goal of a batch (see astar.search_bounds)."""
+    xs = [cell[0] for query in queries for cell in query]
+    ys = [cell[1] for query in queries for cell in query]
+    return search_bounds((min(xs), min(ys)), (max(xs), max(ys)), obstacles)
+
+def _attach_grid(name, bounds):
+    """
+    Map a batch's occupancy bytes into this worker without copying them.
+    The mapping is kept for the rest of the batch; the previous batch's
+    block is released when a new one arrives.
+    """
+    global _worker_grid, _worker_memory, _worker_view
+    if _worker_memory is not None:
+        if _worker_memory.name == name.lstrip("/"):
+            return _worker_grid
+        _worker_grid = None
+        _worker_view.release()
+        _worker_memory.close()
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    grid = OccupancyGrid(bounds)
+    _worker_view = _worker_memory.buf[:grid.size]
+    grid.blocked = _worker_view
+    _worker_grid = grid
+    return grid
+
+def _plan_query(args):
+    name, bounds, start, goal, diagonal, time_limit = args
+    grid = _attach_grid(name, bounds)
+    deadline = time.monotonic() + time_limit if time_limit is not None else None
+    return search_grid(grid, start, goal, diagonal, deadline=deadline)
+
+def _get_pool(workers):
+    """The shared worker pool, (re)started if it is not running with `workers` processes."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+def shutdown_pool():
+    """Stop the worker processes; the next parallel batch starts a new pool."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+            _pool_workers = 0
+
+atexit.register(shutdown_pool)
+
+def plan_batch(queries, obstacles=None, bounds=None, diagonal=False, time_limit=None, workers=None):
+    """
+    Plan many (start, goal) queries against one obstacle map across processes.
+
+    The occupancy grid is built once and copied into a shared memory block
+    that the workers map when they pick up the batch, so only the queries and
+    results cross process boundaries. The worker processes are started by the
+    first parallel batch and kept for later ones. Queries are handed out in
+    chunks and results come back in query order.
+
+    Args:
+        queries: List of ((x, y) start, (x, y) goal) pairs
+        obstacles: Set of tuples representing obstacle positions (optional)
+        bounds: Tuple (min_x, min_y, max_x, max_y) shared by all queries (optional,
+            defaults to batch_bounds(queries, obstacles))
+        diagonal: Allow 8-connected moves, as in astar.search_grid
+        time_limit: Seconds each query may search before giving up (optional)
+        workers: Number of worker processes (defaults to the CPU count; a
+            different count restarts the shared pool)
+
+    Returns:
+        List of SearchResult, one per query
+    """
+    queries = [(tuple(start), tuple(goal)) for start, goal in queries]
+    if not queries:
+        return []
+    if bounds is None:
+        bounds = batch_bounds(queries, obstacles)
+    grid = OccupancyGrid(bounds, obstacles)
+    workers = workers or os.cpu_count() or 1
+    jobs = [(start, goal, diagonal, time_limit) for start, goal in queries]
+
+    if workers == 1 or len(queries) < MIN_PARALLEL_QUERIES:
+        results = []
+        for start, goal, _, _ in jobs:
+            deadline = time.monotonic() + time_limit if time_limit is not None else None
+            results.append(search_grid(grid, start, goal, diagonal, deadline=deadline))
+        return results
+
+    memory = shared_memory.SharedMemory(create=True, size=grid.size)
+    try:
+        memory.buf[:grid.size] = grid.blocked
+        chunksize = max(1, len(queries) // (workers * 4))
+        tasks = [(memory.name, bounds) + job for job in jobs]
+        try:
+            return list(_get_pool(workers).map(_plan_query, tasks, chunksize=chunksize))
+        except BrokenProcessPool:
+            shutdown_pool()  # A worker died; start afresh next time
+            raise
+    finally:
+        memory.close()
+        memory.unlink()
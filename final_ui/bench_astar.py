@@ -0,0 +1,186 @@
+"""
+Benchmarks for the A* planners.
+
+Open grids: compares the original list-scanning A* that used to live in
+app.py against astar.grid_astar, planning a corner-to-corner trip.
+
+Obstacle fields: compares the original astar.astar, which scanned the whole
+heap for every neighbor, against the current astar.astar on random obstacle
+fields of several densities.
+
+Usage:
+    python bench_astar.py [--sizes 100 1000] [--repeat 3] [--legacy-limit 200]
+                          [--field-sizes 50 100 200] [--densities 0.1 0.25] [--seed 7]
+"""
+import argparse
+import heapq
+import math
+import random
+import time
+
+from astar import astar, grid_astar
+
+def legacy_a_star_search(start, goal):
+    """The original app.py planner: open set kept as a plain list."""
+    def heuristic(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    open_set = [start]
+    came_from = {}
+    g_score = {start: 0}
+    f_score = {start: heuristic(start, goal)}
+
+    while open_set:
+        current = min(open_set, key=lambda x: f_score[x])
+
+        if current == goal:
+            path = []
+            while current in came_from:
+                path.append(current)
+                current = came_from[current]
+            path.append(start)
+            path.reverse()
+            return path
+
+        open_set.remove(current)
+
+        neighbors = [
+            (current[0] + 1, current[1]),
+            (current[0] - 1, current[1]),
+            (current[0], current[1] + 1),
+            (current[0], current[1] - 1)
+        ]
+
+        for neighbor in neighbors:
+            tentative_g_score = g_score[current] + 1
+            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                f_score[neighbor] = g_score[neighbor] + heuristic(neighbor, goal)
+                if neighbor not in open_set:
+                    open_set.append(neighbor)
+
+    return []
+
+def legacy_astar(start, goal, obstacles):
+    """The original astar.astar, minus its print calls."""
+    def heuristic(a, b):
+        return math.sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2)
+
+    open_set = []
+    closed_set = set()
+    came_from = {}
+    g_score = {start: 0}
+    f_score = {start: heuristic(start, goal)}
+    heapq.heappush(open_set, (f_score[start], start))
+
+    while open_set:
+        current_f, current = heapq.heappop(open_set)
+
+        if current == goal:
+            path = []
+            while current in came_from:
+                path.append(current)
+                current = came_from[current]
+            path.append(start)
+            return path[::-1]
+
+        closed_set.add(current)
+
+        neighbors = [
+            (current[0]+1, current[1]),
+            (current[0]-1, current[1]),
+            (current[0], current[1]+1),
+            (current[0], current[1]-1),
+            (current[0]+1, current[1]+1),
+            (current[0]-1, current[1]+1),
+            (current[0]+1, current[1]-1),
+            (current[0]-1, current[1]-1),
+        ]
+
+        for neighbor in neighbors:
+            if neighbor in closed_set or neighbor in obstacles:
+                continue
+
+            if abs(neighbor[0] - current[0]) == 1 and abs(neighbor[1] - current[1]) == 1:
+                tentative_g = g_score.get(current, float('inf')) + 1.414
+            else:
+                tentative_g = g_score.get(current, float('inf')) + 1.0
+
+            if neighbor in g_score and tentative_g >= g_score[neighbor]:
+                continue
+
+            came_from[neighbor] = current
+            g_score[neighbor] = tentative_g
+            f_score[neighbor] = tentative_g + heuristic(neighbor, goal)
+
+            if neighbor not in [i[1] for i in open_set]:
+                heapq.heappush(open_set, (f_score[neighbor], neighbor))
+
+    return None
+
+def obstacle_field(size, density, rng):
+    """Random obstacle set on a size x size field, walled in and keeping both corners free."""
+    obstacles = {(x, y) for x in range(size) for y in range(size) if rng.random() < density}
+    obstacles |= {(x, -1) for x in range(-1, size + 1)} | {(x, size) for x in range(-1, size + 1)}
+    obstacles |= {(-1, y) for y in range(size)} | {(size, y) for y in range(size)}
+    obstacles -= {(0, 0), (size - 1, size - 1)}
+    return obstacles
+
+def time_planner(planner, start, goal, repeat, *args):
+    """Return (best wall-clock seconds, path length) over `repeat` runs."""
+    best = float('inf')
+    path = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        path = planner(start, goal, *args) or []
+        best = min(best, time.perf_counter() - began)
+    return best, len(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark return-to-base A* planners")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000],
+                        help="Grid side lengths to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per planner, best time is kept")
+    parser.add_argument("--legacy-limit", type=int, default=200,
+                        help="Largest grid side the legacy planner is run on; larger sizes are skipped")
+    parser.add_argument("--field-sizes", type=int, nargs="+", default=[50, 100, 200],
+                        help="Obstacle field side lengths to benchmark")
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.1, 0.25],
+                        help="Fraction of obstacle cells in each field")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the obstacle fields")
+    args = parser.parse_args()
+
+    print("Open grids (app.py a_star_search)")
+
+    print(f"{'grid':>11} {'planner':>8} {'time (s)':>10} {'path':>6} {'speedup':>8}")
+    for size in args.sizes:
+        start, goal = (0, 0), (size - 1, size - 1)
+        grid = f"{size}x{size}"
+
+        new_time, new_len = time_planner(grid_astar, start, goal, args.repeat)
+        if size <= args.legacy_limit:
+            old_time, old_len = time_planner(legacy_a_star_search, start, goal, args.repeat)
+            print(f"{grid:>11} {'legacy':>8} {old_time:>10.4f} {old_len:>6}")
+            print(f"{grid:>11} {'heap':>8} {new_time:>10.4f} {new_len:>6} {old_time / new_time:>7.1f}x")
+        else:
+            print(f"{grid:>11} {'legacy':>8} {'skipped':>10}")
+            print(f"{grid:>11} {'heap':>8} {new_time:>10.4f} {new_len:>6}")
+
+    print()
+    print("Random obstacle fields (astar.astar)")
+    print(f"{'field':>15} {'planner':>8} {'time (s)':>10} {'path':>6} {'speedup':>8}")
+    rng = random.Random(args.seed)
+    for size in args.field_sizes:
+        for density in args.densities:
+            obstacles = obstacle_field(size, density, rng)
+            start, goal = (0, 0), (size - 1, size - 1)
+            field = f"{size}x{size}@{density:.2f}"
+
+            old_time, old_len = time_planner(legacy_astar, start, goal, args.repeat, obstacles)
+            new_time, new_len = time_planner(astar, start, goal, args.repeat, obstacles)
+            print(f"{field:>15} {'legacy':>8} {old_time:>10.4f} {old_len:>6}")
+            print(f"{field:>15} {'indexed':>8} {new_time:>10.4f} {new_len:>6} {old_time / new_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import heapq
+from array import array
+from collections import deque
+
+# Distance stored for cells that cannot reach the base
+UNREACHABLE = 2 ** 31 - 1
+
+class DistanceField:
+    """
+    Distance-to-base field over an OccupancyGrid (4-connected, unit moves).
+
+    A breadth-first search from the base fills in every free cell's distance
+    home once. After that the next step home from any cell is the neighbor
+    whose distance is one less, so a full return route is read off in
+    O(path length) without searching. add_obstacles() and clear_obstacles()
+    repair only the cells whose distances actually change.
+    """
+
+    def __init__(self, grid, base):
+        if not grid.contains(base):
+            raise ValueError(f"Base {base} is outside the grid {grid.bounds}")
+        self.grid = grid
+        self.base = base
+        self.base_index = grid.index(base)
+        self.dist = array('i', [UNREACHABLE]) * grid.size
+        self._flood()
+
+    def _neighbors(self, index):
+        width = self.grid.width
+        y, x = divmod(index, width)
+        if x + 1 < width:
+            yield index + 1
+        if x > 0:
+            yield index - 1
+        if y + 1 < self.grid.height:
+            yield index + width
+        if y > 0:
+            yield index - width
+
+    def _flood(self):
+        """Breadth-first search from the base over the whole grid."""
+        dist, blocked = self.dist, self.grid.blocked
+        if blocked[self.base_index]:
+            return
+        dist[self.base_index] = 0
+        queue = deque([self.base_index])
+        while queue:
+            current = queue.popleft()
+            next_dist = dist[current] + 1
+            for neighbor in self._neighbors(current):
+                if not blocked[neighbor] and dist[neighbor] > next_dist:
+                    dist[neighbor] = next_dist
+                    queue.append(neighbor)
+
+    def _propagate(self, seeds):
+        """Lower distances outward from (distance, index) seeds until nothing improves."""
+        dist, blocked = self.dist, self.grid.blocked
+        heapq.heapify(seeds)
+        while seeds:
+            d, current = heapq.heappop(seeds)
+            if d > dist[current]:
+                continue
+            for neighbor in self._neighbors(current):
+                if not blocked[neighbor] and dist[neighbor] > d + 1:
+                    dist[neighbor] = d + 1
+                    heapq.heappush(seeds, (d + 1, neighbor))
+
+    def distance(self, pos):
+        """Number of moves from pos to the base, or None if unknown or unreachable."""
+        if not self.grid.contains(pos):
+            return None
+        d = self.dist[self.grid.index(pos)]
+        return None if d == UNREACHABLE else d
+
+    def next_step(self, pos):
+        """The neighboring cell one move closer to the base, or None if there is none."""
+        d = self.distance(pos)
+        if not d:
+            return None
+        for neighbor in self._neighbors(self.grid.index(pos)):
+            if self.dist[neighbor] == d - 1:
+                return self.grid.position(neighbor)
+        return None
+
+    def path_home(self, pos):
+        """
+        Follow the field downhill from pos to the base.
+
+        Returns:
+            List of tuples from pos to the base, or an empty list if pos cannot reach it
+        """
+        d = self.distance(pos)
+        if d is None:
+            return []
+        path = [pos]
+        dist = self.dist
+        current = self.grid.index(pos)
+        while d > 0:
+            for neighbor in self._neighbors(current):
+                if dist[neighbor] == d - 1:
+                    current = neighbor
+                    break
+            d -= 1
+            path.append(self.grid.position(current))
+        return path
+
+    def add_obstacles(self, cells):
+        """
+        Block cells and repair the field.
+
+        Cells whose shortest route home ran through a new obstacle, and that have
+        no other neighbor one step closer, lose their distance. They are
+        processed in order of their old distance, so a cell is only invalidated
+        once everything closer to home is settled. They are then re-seeded from
+        their still-valid neighbors.
+        """
+        grid, dist = self.grid, self.dist
+        pending = []
+        for cell in cells:
+            if not grid.contains(cell):
+                continue
+            index = grid.index(cell)
+            if grid.blocked[index]:
+                continue
+            grid.blocked[index] = 1
+            old = dist[index]
+            dist[index] = UNREACHABLE
+            if old != UNREACHABLE:
+                for neighbor in self._neighbors(index):
+                    if dist[neighbor] == old + 1:
+                        heapq.heappush(pending, (old + 1, neighbor))
+
+        invalidated = []
+        while pending:
+            d, current = heapq.heappop(pending)
+            if dist[current] != d:
+                continue  # Already invalidated or never depended on this path
+            if any(dist[n] == d - 1 for n in self._neighbors(current)):
+                continue  # Still supported by another neighbor closer to home
+            dist[current] = UNREACHABLE
+            invalidated.append(current)
+            for neighbor in self._neighbors(current):
+                if dist[neighbor] == d + 1:
+                    heapq.heappush(pending, (d + 1, neighbor))
+
+        seeds = []
+        for current in invalidated:
+            best = min((dist[n] for n in self._neighbors(current)), default=UNREACHABLE)
+            if best != UNREACHABLE:
+                dist[current] = best + 1
+                seeds.append((best + 1, current))
+        self._propagate(seeds)
+
+    def clear_obstacles(self, cells):
+        """Free cells and lower the distances of everything that gets a shorter way home."""
+        grid, dist = self.grid, self.dist
+        seeds = []
+        for cell in cells:
+            if not grid.contains(cell):
+                continue
+            index = grid.index(cell)
+            if not grid.blocked[index]:
+                continue
+            grid.blocked[index] = 0
+            if index == self.base_index:
+                dist[index] = 0
+                seeds.append((0, index))
+                continue
+            best = min((dist[n] for n in self._neighbors(index)), default=UNREACHABLE)
+            if best != UNREACHABLE:
+                dist[index] = best + 1
+                seeds.append((best + 1, index))
+        self._propagate(seeds)
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import threading
+import time
+
+from rover_direction import determine_rover_direction
+from telemetry import NAVIGATION_STEP_INTERVAL, battery_level, normalize_position, parse_sensor_data, recharge_reason
+from upstream import AsyncUpstreamClient
+
+logger = logging.getLogger(__name__)
+
+class Mission:
+    """State of one rover session driven by the MissionEngine."""
+
+    def __init__(self, session_id, direction="forward"):
+        self.session_id = session_id
+        self.direction = direction
+        self.status = "Starting"
+        self.battery = None
+        self.initial_position = None
+        self.current_position = None
+        self.final_position = None
+        self.steps = 0
+        self.started = time.time()
+        self.finished = None
+        self.task = None
+
+    @property
+    def active(self):
+        return self.task is not None and not self.task.done()
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "active": self.active,
+            "status": self.status,
+            "direction": self.direction,
+            "battery": self.battery,
+            "initial_position": self.initial_position,
+            "current_position": self.current_position,
+            "final_position": self.final_position,
+            "steps": self.steps,
+            "started": self.started,
+            "finished": self.finished
+        }
+
+class MissionEngine:
+    """
+    Drives many rover sessions concurrently from one asyncio event loop.
+
+    Each mission is a task running the same steps as app.auto_navigate:
+    check the battery and recharge if needed, read the sensors, stop on an
+    RFID tag or when determine_rover_direction() says "Reached", otherwise
+    move. Like the navigation thread, a mission starts a step every
+    NAVIGATION_STEP_INTERVAL seconds. While a mission waits on the API or between
+    steps it costs no thread, so one process can run as many missions as
+    the async client's connection pool allows.
+
+    The loop runs in its own daemon thread; launch(), cancel() and missions()
+    can be called from Flask request handlers. Cancelling a mission
+    interrupts whatever it is awaiting at once (an API call or a sleep) and
+    sends the rover a stop command.
+    """
+
+    def __init__(self, base_url, step_interval=NAVIGATION_STEP_INTERVAL, client=None):
+        self.client = client or AsyncUpstreamClient(base_url)
+        self.step_interval = step_interval
+        self.sessions = {}  # session_id -> Mission
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the event loop thread if it is not running yet."""
+        with self.lock:
+            if self.loop is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self.loop.run_forever, name="mission-engine", daemon=True)
+            self.thread.start()
+
+    def _call(self, coroutine):
+        """Run a coroutine on the engine's loop from another thread and wait for its result."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def launch(self, session_id=None, direction="forward"):
+        """
+        Start a mission for `session_id`, or for a new session if it is None.
+        Raises ValueError if that session already has an active mission.
+        """
+        return self._call(self._launch(session_id, direction))
+
+    def cancel(self, session_id):
+        """Cancel a session's mission. Returns False if it has no active mission."""
+        return self._call(self._cancel(session_id))
+
+    def missions(self):
+        """Snapshot of every mission, active or finished."""
+        return [mission.to_dict() for mission in list(self.sessions.values())]
+
+    def mission(self, session_id):
+        mission = self.sessions.get(session_id)
+        return mission.to_dict() if mission is not None else None
+
+    def shutdown(self):
+        """Cancel every mission, close the client and stop the loop."""
+        if self.loop is None:
+            return
+        self._call(self._shutdown())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+
+    async def _launch(self, session_id, direction):
+        if session_id is None:
+            response = await self.client.post("/session/start")
+            if response.status_code != 200:
+                raise RuntimeError(f"Failed to start session: {response.status_code}")
+            session_id = response.json().get('session_id')
+        existing = self.sessions.get(session_id)
+        if existing is not None and existing.active:
+            raise ValueError(f"Session {session_id} already has an active mission")
+        mission = Mission(session_id, direction)
+        mission.task = asyncio.create_task(self._run(mission), name=f"mission-{session_id}")
+        self.sessions[session_id] = mission
+        return mission.to_dict()
+
+    async def _cancel(self, session_id):
+        mission = self.sessions.get(session_id)
+        if mission is None or not mission.active:
+            return False
+        mission.task.cancel()
+        return True
+
+    async def _shutdown(self):
+        tasks = [mission.task for mission in self.sessions.values() if mission.active]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.client.close()
+
+    async def _run(self, mission):
+        try:
+            status_data = await self._read_status(mission)
+            if status_data is None:
+                mission.status = "Failed: Could not get rover status"
+                return
+            mission.initial_position = mission.current_position
+            mission.status = "Navigating"
+            loop = asyncio.get_running_loop()
+            while True:
+                step_began = loop.time()
+                if not await self._step(mission):
+                    break
+                await asyncio.sleep(max(0.0, self.step_interval - (loop.time() - step_began)))
+        except asyncio.CancelledError:
+            mission.status = "Cancelled"
+            await self._stop(mission)
+            raise
+        except Exception as e:
+            logger.exception(f"Mission {mission.session_id} failed")
+            mission.status = f"Failed: {str(e)}"
+        finally:
+            mission.finished = time.time()
+
+    async def _read_status(self, mission):
+        """GET /rover/status and record battery and position; None if the call failed."""
+        try:
+            response = await self.client.get("/rover/status", session_id=mission.session_id)
+        except Exception as e:
+            logger.warning(f"Mission {mission.session_id}: status request failed: {str(e)}")
+            return None
+        if response.status_code != 200:
+            return None
+        status_data = response.json()
+        mission.battery = battery_level(status_data)
+        position = normalize_position(status_data.get('position'))
+        if position is not None:
+            mission.current_position = position
+        return status_data
+
+    async def _read_sensors(self, mission):
+        """GET /rover/sensor-data (retried by the client); None if it failed."""
+        try:
+            response = await self.client.get("/rover/sensor-data", session_id=mission.session_id)
+        except Exception as e:
+            logger.warning(f"Mission {mission.session_id}: sensor request failed: {str(e)}")
+            return None
+        if response.status_code != 200:
+            logger.warning(f"Mission {mission.session_id}: sensor data returned {response.status_code}")
+            return None
+        return response.json()
+
+    async def _stop(self, mission):
+        try:
+            await self.client.post("/rover/stop", session_id=mission.session_id)
+        except Exception as e:
+            logger.warning(f"Mission {mission.session_id}: stop request failed: {str(e)}")
+
+    async def _recharge(self, mission, reason):
+        mission.status = f"Recharging: {reason}"
+        await self._stop(mission)
+        try:
+            response = await self.client.post("/rover/charge", session_id=mission.session_id)
+            if response.status_code == 200:
+                mission.status = "Recharged - Resuming exploration"
+                await self.client.post("/rover/move", session_id=mission.session_id,
+                                       direction=mission.direction.lower())
+                return
+        except Exception as e:
+            logger.warning(f"Mission {mission.session_id}: charge request failed: {str(e)}")
+        mission.status = "Recharge failed - attempting to continue"
+
+    async def _step(self, mission):
+        """Run one navigation step. Returns False once the mission has finished."""
+        status_data = await self._read_status(mission)
+        reason = "status unavailable" if status_data is None else recharge_reason(status_data)
+        if reason:
+            await self._recharge(mission, reason)
+            return True
+
+        sensor_data = await self._read_sensors(mission)
+        if sensor_data is None:
+            mission.status = "Failed: Could not get sensor data"
+            return False
+        readings = parse_sensor_data(sensor_data)
+        if readings['position'] is not None:
+            mission.current_position = readings['position']
+
+        if readings['rfid']:
+            mission.final_position = mission.current_position
+            await self._stop(mission)
+            mission.status = "Completed - Supply Dropped at RFID location"
+            return False
+
+        next_direction = determine_rover_direction(mission.direction or "forward", readings['rfid'], readings['ir'],
+                                                   readings['ultrasonic'], readings['accelerometer'])
+        if next_direction.lower() == "reached":
+            await self._read_status(mission)
+            mission.final_position = mission.current_position
+            await self._stop(mission)
+            mission.status = "Completed"
+            return False
+
+        response = await self.client.post("/rover/move", session_id=mission.session_id,
+                                          direction=next_direction.lower())
+        if response.status_code != 200:
+            mission.status = f"Failed to move: {response.status_code} - {response.text}"
+            return False
+        mission.direction = next_direction
+        mission.steps += 1
+        mission.status = f"Moving {next_direction.lower()}"
+        return True
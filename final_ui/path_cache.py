@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+
+class PathCache:
+    """
+    Size-bounded LRU cache of planned paths shared by the path planners.
+
+    Entries are keyed on (start, goal, planner kind, map version). The map
+    version increases every time obstacles change. Adding obstacles only
+    invalidates the cached paths that cross a changed cell: every other path
+    is still valid, and still shortest, so it is carried over to the new
+    version. Clearing obstacles can open shorter routes anywhere, so it
+    drops everything.
+    """
+
+    def __init__(self, maxsize=256):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1.")
+        self.maxsize = maxsize
+        self.version = 0
+        self.entries = OrderedDict()  # (start, goal, kind, version) -> (path, set of path cells)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def get(self, start, goal, kind):
+        """Return a copy of the cached path for the current map version, or None."""
+        key = (start, goal, kind, self.version)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def contains(self, start, goal, kind):
+        """True if a path is cached for the current map version; unlike get(), not counted as a lookup."""
+        with self.lock:
+            return (start, goal, kind, self.version) in self.entries
+
+    def put(self, start, goal, kind, path):
+        """Store a path for the current map version, evicting the least recently used entry if full."""
+        key = (start, goal, kind, self.version)
+        with self.lock:
+            self.entries[key] = (list(path), frozenset(path))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, cells):
+        """
+        Record that the given cells became obstacles.
+        Bumps the map version and drops only the paths that cross those cells.
+        """
+        changed = set(cells)
+        with self.lock:
+            self.version += 1
+            kept = OrderedDict()
+            for (start, goal, kind, _), (path, path_cells) in self.entries.items():
+                if path_cells.isdisjoint(changed):
+                    kept[(start, goal, kind, self.version)] = (path, path_cells)
+                else:
+                    self.invalidations += 1
+            self.entries = kept
+
+    def clear(self):
+        """Drop every cached path, e.g. after obstacles were removed."""
+        with self.lock:
+            self.version += 1
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def stats(self):
+        """Counters for tuning the cache size."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,163 @@
+import random
+import threading
+import time
+from collections import deque
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"Circuit for {name} is open; retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one endpoint.
+
+    CLOSED: calls go through; `failure_threshold` failures in a row open the
+    circuit. OPEN: calls are rejected without being sent until
+    `reset_timeout` seconds have passed. HALF_OPEN: one probe call is let
+    through; its success closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=15.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0  # Consecutive failures
+        self.opened_at = None
+        self.probing = False  # A half-open probe is in flight
+        self.times_opened = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may be sent now; a half-open circuit admits a single probe."""
+        with self.lock:
+            if self.state == CircuitBreaker.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = CircuitBreaker.HALF_OPEN
+                self.probing = False
+            if self.state == CircuitBreaker.HALF_OPEN:
+                if self.probing:
+                    self.rejected += 1
+                    return False
+                self.probing = True
+            return True
+
+    def retry_in(self):
+        """Seconds until an open circuit admits a probe (0 unless open)."""
+        with self.lock:
+            if self.state != CircuitBreaker.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self.lock:
+            self.state = CircuitBreaker.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == CircuitBreaker.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != CircuitBreaker.OPEN:
+                    self.times_opened += 1
+                self.state = CircuitBreaker.OPEN
+                self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """Forget an admitted call that ended without a result (e.g. cancelled), freeing the probe slot."""
+        with self.lock:
+            self.probing = False
+
+    def snapshot(self):
+        retry_in = self.retry_in()
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_in": retry_in
+            }
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent traffic so retries cannot multiply load on a struggling upstream.
+
+    Over the last `window` seconds, retries may make up at most `ratio` of
+    the first attempts, plus `min_per_second` retries per second so that a
+    quiet client can still retry at all.
+    """
+
+    def __init__(self, ratio=0.2, min_per_second=1.0, window=10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self.requests = deque()  # Timestamps of first attempts
+        self.retries = deque()  # Timestamps of retries
+        self.exhausted = 0  # Retries refused
+        self.lock = threading.Lock()
+
+    def _trim(self, now):
+        for stamps in (self.requests, self.retries):
+            while stamps and now - stamps[0] > self.window:
+                stamps.popleft()
+
+    def record_request(self):
+        with self.lock:
+            now = time.monotonic()
+            self._trim(now)
+            self.requests.append(now)
+
+    def try_retry(self):
+        """Take one retry from the budget; False (and nothing taken) if it is spent."""
+        with self.lock:
+            now = time.monotonic()
+            self._trim(now)
+            if len(self.retries) >= self.min_per_second * self.window + self.ratio * len(self.requests):
+                self.exhausted += 1
+                return False
+            self.retries.append(now)
+            return True
+
+    def snapshot(self):
+        with self.lock:
+            self._trim(time.monotonic())
+            return {
+                "requests": len(self.requests),
+                "retries": len(self.retries),
+                "allowed": self.min_per_second * self.window + self.ratio * len(self.requests),
+                "exhausted": self.exhausted
+            }
+
+class RetryPolicy:
+    """
+    How many times an endpoint is tried and how long to wait between tries.
+
+    Waits grow exponentially from `base_delay` up to `max_delay` with full
+    jitter (a uniform draw between 0 and the cap), so clients that failed
+    together do not retry together. Connection errors, timeouts and the
+    `retry_statuses` HTTP codes are retried; other responses are returned.
+    """
+
+    def __init__(self, attempts=1, base_delay=0.5, max_delay=8.0, retry_statuses=(502, 503, 504)):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def delay(self, attempt, rng=random):
+        """Seconds to wait after failed attempt number `attempt` (0-based)."""
+        return rng.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** attempt))
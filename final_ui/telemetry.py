@@ -0,0 +1,106 @@
+# Battery level at or below which navigation stops to recharge (percent)
+LOW_BATTERY_LEVEL = 20
+
+# Battery level a recharge waits for before the return journey resumes (percent)
+RECHARGED_LEVEL = 90
+
+# Seconds from the start of one navigation step to the start of the next, for the
+# navigation thread and the mission engine alike
+NAVIGATION_STEP_INTERVAL = 1.5
+
+def normalize_position(position):
+    """Return a {'x', 'y'} dict for a dict or [x, y] list position, or None if it has neither form."""
+    if isinstance(position, dict):
+        return position
+    if isinstance(position, list) and len(position) >= 2:
+        return {'x': position[0], 'y': position[1]}
+    return None
+
+def battery_level(status_data):
+    """Battery percentage from a /rover/status response, or None if it has none."""
+    bat_data = status_data.get('battery')
+    if isinstance(bat_data, dict) and 'level' in bat_data:
+        return bat_data['level']
+    if isinstance(bat_data, (int, float)):
+        return bat_data
+    return None
+
+def recharge_reason(status_data):
+    """
+    Why a /rover/status response calls for a recharge, or None if it does not.
+
+    A recharge is needed when the battery is at or below LOW_BATTERY_LEVEL,
+    or when the status text or any other string field mentions a low battery
+    or intermittent power.
+    """
+    level = battery_level(status_data)
+    if level is not None and level <= LOW_BATTERY_LEVEL:
+        return f"battery at {level}%"
+    if 'status' in status_data:
+        status_text = str(status_data['status']).lower()
+        if 'low' in status_text or 'battery' in status_text or 'intermittent' in status_text:
+            return f"status {status_data['status']!r}"
+    for key, value in status_data.items():
+        if isinstance(value, str) and ('low' in value.lower() or 'battery' in value.lower()):
+            return f"field {key} is {value!r}"
+    return None
+
+def _detected(data, keys):
+    """Read a boolean detection from a sensor value that may be a dict, bool, number or string."""
+    if isinstance(data, dict):
+        for key in keys:
+            if key in data:
+                return bool(data[key]) if key == 'value' else data[key]
+        return False
+    if isinstance(data, bool):
+        return data
+    if isinstance(data, str):
+        return data.lower() in ('true', 'yes', '1', 'detected')
+    if isinstance(data, (int, float)):
+        return bool(data)
+    return False
+
+def parse_sensor_data(sensor_data):
+    """
+    Extract the inputs of determine_rover_direction from a /rover/sensor-data response.
+
+    Returns:
+        Dict with 'rfid' and 'ir' booleans, 'ultrasonic' as a (distance, detected)
+        tuple, 'accelerometer' as [x, y, z] and 'position' as a {'x', 'y'} dict or None
+    """
+    readings = {
+        'rfid': False,
+        'ir': False,
+        'ultrasonic': (0, False),
+        'accelerometer': [0, 0, 0],
+        'position': normalize_position(sensor_data.get('position'))
+    }
+
+    if 'rfid' in sensor_data:
+        readings['rfid'] = _detected(sensor_data['rfid'], ('tag_detected', 'detected', 'value'))
+
+    if 'ir' in sensor_data:
+        readings['ir'] = _detected(sensor_data['ir'], ('reflection', 'detected', 'value'))
+
+    if 'ultrasonic' in sensor_data:
+        us_data = sensor_data['ultrasonic']
+        distance = 0
+        detection = False
+        if isinstance(us_data, dict):
+            distance = us_data.get('distance', 0)
+            detection = us_data.get('detection', False)
+            if 'detected' in us_data:
+                detection = us_data['detected']
+        elif isinstance(us_data, (int, float)):
+            distance = float(us_data)
+            detection = distance < 100  # Example threshold
+        readings['ultrasonic'] = (distance, detection)
+
+    if 'accelerometer' in sensor_data:
+        accel_data = sensor_data['accelerometer']
+        if isinstance(accel_data, dict):
+            readings['accelerometer'] = [accel_data.get('x', 0), accel_data.get('y', 0), accel_data.get('z', 0)]
+        elif isinstance(accel_data, list) and len(accel_data) >= 3:
+            readings['accelerometer'] = accel_data[0:3]
+
+    return readings
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from astar import AnyAngleResult, OccupancyGrid, SearchResult, expand_waypoints, grid_astar, theta_star_search, trace_line
+
+BOUNDS = (0, 0, 29, 29)
+
+def assert_valid_path(path, start, goal, obstacles):
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+    assert not set(path) & set(obstacles)
+
+def random_obstacles(seed, density=0.2):
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(30) for y in range(30) if (x, y) not in ((0, 0), (29, 29))]
+    return set(rng.sample(cells, int(len(cells) * density)))
+
+def test_trace_line_is_4_connected():
+    grid = OccupancyGrid(BOUNDS)
+    for b in [(7, 3), (3, 7), (5, 5), (0, 9), (12, 0), (1, 1)]:
+        cells = trace_line(grid, (0, 0), b)
+        assert_valid_path(cells, (0, 0), b, ())
+
+def test_trace_line_through_a_corner_needs_both_side_cells():
+    grid = OccupancyGrid(BOUNDS, [(1, 0)])
+    assert trace_line(grid, (0, 0), (1, 1)) is None
+    assert trace_line(grid, (0, 0), (0, 1)) == [(0, 0), (0, 1)]
+
+def test_trace_line_blocked_or_off_grid():
+    grid = OccupancyGrid(BOUNDS, [(3, 3)])
+    assert trace_line(grid, (0, 0), (6, 6)) is None
+    assert trace_line(grid, (0, 0), (30, 0)) is None
+
+def test_expand_waypoints_drives_straight_runs():
+    grid = OccupancyGrid(BOUNDS)
+    path = expand_waypoints(grid, [(0, 0), (6, 4), (6, 10)])
+    assert_valid_path(path, (0, 0), (6, 10), ())
+    assert len(path) == 6 + 4 + 6 + 1
+    assert expand_waypoints(grid, []) == []
+
+def test_expand_waypoints_rejects_a_blocked_leg():
+    grid = OccupancyGrid(BOUNDS, [(3, 3)])
+    with pytest.raises(ValueError):
+        expand_waypoints(grid, [(0, 0), (6, 6)])
+
+@pytest.mark.parametrize("seed", range(10))
+def test_theta_star_path_is_valid_and_has_fewer_waypoints(seed):
+    obstacles = random_obstacles(seed)
+    grid_path = grid_astar((0, 0), (29, 29), obstacles, bounds=BOUNDS)
+    result = theta_star_search(OccupancyGrid(BOUNDS, obstacles), (0, 0), (29, 29))
+    if not grid_path:
+        assert result.status == SearchResult.NO_PATH
+        return
+    assert result.status == SearchResult.FOUND
+    assert_valid_path(result.path, (0, 0), (29, 29), obstacles)
+    assert len(result.waypoints) < len(grid_path)
+
+def test_theta_star_sealed_goal():
+    ring = [(14, 13), (14, 15), (13, 14), (15, 14)]
+    result = theta_star_search(OccupancyGrid(BOUNDS, ring), (0, 0), (14, 14))
+    assert result.status == SearchResult.NO_PATH and result.path == []
+
+def test_theta_star_budget():
+    result = theta_star_search(OccupancyGrid(BOUNDS, random_obstacles(0)), (0, 0), (29, 29), max_expansions=5)
+    assert result.status == SearchResult.BUDGET_EXHAUSTED and not result.found
+
+def test_route_home_falls_back_to_grid_when_any_angle_runs_out_of_time(monkeypatch):
+    import app
+    from path_cache import PathCache
+
+    obstacles = random_obstacles(0)
+    monkeypatch.setattr(app, "known_obstacles", set(obstacles))
+    monkeypatch.setattr(app, "path_cache", PathCache(maxsize=8))
+    monkeypatch.setattr(app, "base_field", None)
+    monkeypatch.setitem(app.rover_state, "initial_position", {"x": 0, "y": 0})
+    monkeypatch.setattr(app, "any_angle_search",
+                        lambda start, goal: AnyAngleResult(SearchResult.DEADLINE_EXCEEDED, None, 0, 2.0, None))
+
+    path = app.plan_route_home((29, 29), (0, 0), "any_angle")
+    assert_valid_path(path, (29, 29), (0, 0), obstacles)
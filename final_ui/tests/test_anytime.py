@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+import astar
+from astar import AnytimeResult, OccupancyGrid, SearchResult, anytime_astar, anytime_search, grid_astar
+
+BOUNDS = (0, 0, 39, 39)
+START, GOAL = (0, 0), (39, 39)
+
+class TickingClock:
+    """Stands in for the time module: monotonic() advances one tick per call."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        self.now += 1.0
+        return self.now
+
+def random_obstacles(seed, density=0.3):
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(40) for y in range(40) if (x, y) not in (START, GOAL)]
+    return set(rng.sample(cells, int(len(cells) * density)))
+
+def reachable_maps():
+    """Seeds whose maps connect START and GOAL, with the optimal path length."""
+    maps = []
+    for seed in range(40):
+        obstacles = random_obstacles(seed)
+        optimal = grid_astar(START, GOAL, obstacles, bounds=BOUNDS)
+        if optimal:
+            maps.append((obstacles, len(optimal) - 1))
+        if len(maps) == 5:
+            return maps
+    raise AssertionError("Too few connected maps")
+
+@pytest.mark.parametrize("obstacles, optimal", reachable_maps())
+def test_without_deadline_path_is_optimal(obstacles, optimal):
+    result = anytime_astar(START, GOAL, obstacles, bounds=BOUNDS)
+    assert result.status == SearchResult.FOUND
+    assert result.epsilon == 1.0
+    assert len(result.path) - 1 == optimal
+    assert result.path[0] == START and result.path[-1] == GOAL
+
+@pytest.mark.parametrize("obstacles, optimal", reachable_maps())
+def test_short_deadline_keeps_path_within_epsilon(monkeypatch, obstacles, optimal):
+    # Check the clock on every expansion so the deadline counts expansions
+    monkeypatch.setattr(astar, "DEADLINE_CHECK_INTERVAL", 1)
+    grid = OccupancyGrid(BOUNDS, obstacles)
+    bounds_seen = set()
+    for ticks in range(1, 2000, 7):
+        clock = TickingClock()
+        monkeypatch.setattr(astar, "time", clock)
+        result = anytime_search(grid, START, GOAL, deadline=ticks)
+        if result.status == SearchResult.DEADLINE_EXCEEDED:
+            assert result.path == [] and result.epsilon is None
+            continue
+        assert result.status == SearchResult.FOUND
+        assert result.epsilon >= 1.0
+        assert len(result.path) - 1 <= result.epsilon * optimal + 1e-9
+        bounds_seen.add(result.epsilon > 1.0)
+    # Some deadlines cut the search short with a bounded path, and later ones let it finish
+    assert bounds_seen == {True, False}
+
+def test_unreachable_goal():
+    wall = {(20, y) for y in range(40)}
+    result = anytime_astar(START, GOAL, wall, bounds=BOUNDS)
+    assert result.status == SearchResult.NO_PATH
+    assert result.path == [] and result.epsilon is None
+
+def test_sealed_goal():
+    ring = {(38, 39), (39, 38)}
+    result = anytime_astar(START, GOAL, ring, bounds=BOUNDS)
+    assert result.status == SearchResult.NO_PATH
+
+@pytest.mark.parametrize("epsilon, cached", [(1.5, False), (1.0, True)])
+def test_app_caches_only_optimal_paths(monkeypatch, epsilon, cached):
+    import app
+    from path_cache import PathCache
+
+    path = [(0, 0), (1, 0), (1, 1)]
+    monkeypatch.setattr(app, "path_cache", PathCache(maxsize=8))
+    monkeypatch.setattr(app, "anytime_astar",
+                        lambda start, goal, obstacles, deadline: AnytimeResult(SearchResult.FOUND, path, 3, 0.1, epsilon, 1))
+    assert app.a_star_search((0, 0), (1, 1)).path == path
+    assert app.path_cache.contains((0, 0), (1, 1), "astar") == cached
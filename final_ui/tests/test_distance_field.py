@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from astar import OccupancyGrid, grid_astar
+from distance_field import DistanceField
+
+BOUNDS = (0, 0, 11, 11)
+BASE = (0, 0)
+
+def fresh_distances(grid):
+    """Distances of a DistanceField flooded from scratch over a copy of the grid."""
+    copy = OccupancyGrid(grid.bounds)
+    copy.blocked[:] = grid.blocked
+    return list(DistanceField(copy, BASE).dist)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_repairs_match_full_recomputation(seed):
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(12) for y in range(12) if (x, y) != BASE]
+    grid = OccupancyGrid(BOUNDS, rng.sample(cells, 30))
+    field = DistanceField(grid, BASE)
+    for _ in range(30):
+        changed = rng.sample(cells, rng.randint(1, 3))
+        if rng.random() < 0.6:
+            field.add_obstacles(changed)
+        else:
+            field.clear_obstacles(changed)
+        assert list(field.dist) == fresh_distances(grid)
+
+def test_path_home_is_a_shortest_path():
+    wall = [(5, y) for y in range(11)]
+    field = DistanceField(OccupancyGrid(BOUNDS, wall), BASE)
+    path = field.path_home((9, 0))
+    assert path[0] == (9, 0) and path[-1] == BASE
+    assert len(path) == len(grid_astar((9, 0), BASE, set(wall), bounds=BOUNDS))
+    assert field.distance((9, 0)) == len(path) - 1
+
+def test_sealed_cell_has_no_route_home():
+    ring = [(5, 4), (5, 6), (4, 5), (6, 5)]
+    field = DistanceField(OccupancyGrid(BOUNDS, ring), BASE)
+    assert field.distance((5, 5)) is None
+    assert field.path_home((5, 5)) == []
@@ -0,0 +1,46 @@
+import pytest
+
+from path_cache import PathCache
+
+def test_new_obstacles_drop_only_paths_crossing_them():
+    cache = PathCache(maxsize=8)
+    cache.put((0, 0), (3, 0), "astar", [(0, 0), (1, 0), (2, 0), (3, 0)])
+    cache.put((0, 1), (3, 1), "astar", [(0, 1), (1, 1), (2, 1), (3, 1)])
+    cache.invalidate([(2, 0)])
+    assert cache.get((0, 0), (3, 0), "astar") is None
+    assert cache.get((0, 1), (3, 1), "astar") == [(0, 1), (1, 1), (2, 1), (3, 1)]
+    assert cache.stats()["invalidations"] == 1
+
+def test_clear_drops_everything():
+    cache = PathCache(maxsize=8)
+    cache.put((0, 0), (1, 0), "astar", [(0, 0), (1, 0)])
+    cache.clear()
+    assert cache.get((0, 0), (1, 0), "astar") is None
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PathCache(maxsize=2)
+    cache.put((0, 0), (1, 0), "astar", [(0, 0), (1, 0)])
+    cache.put((0, 0), (0, 1), "astar", [(0, 0), (0, 1)])
+    cache.get((0, 0), (1, 0), "astar")  # Now the most recently used
+    cache.put((0, 0), (2, 0), "astar", [(0, 0), (1, 0), (2, 0)])
+    assert cache.get((0, 0), (0, 1), "astar") is None
+    assert cache.get((0, 0), (1, 0), "astar") is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_contains_does_not_count_as_a_lookup():
+    cache = PathCache(maxsize=2)
+    cache.put((0, 0), (1, 0), "astar", [(0, 0), (1, 0)])
+    assert cache.contains((0, 0), (1, 0), "astar")
+    assert not cache.contains((0, 0), (1, 0), "any_angle")
+    stats = cache.stats()
+    assert stats["hits"] == stats["misses"] == 0
+
+def test_cached_paths_are_copies():
+    cache = PathCache(maxsize=2)
+    cache.put((0, 0), (1, 0), "astar", [(0, 0), (1, 0)])
+    cache.get((0, 0), (1, 0), "astar").append((9, 9))
+    assert cache.get((0, 0), (1, 0), "astar") == [(0, 0), (1, 0)]
+
+def test_rejects_empty_cache():
+    with pytest.raises(ValueError):
+        PathCache(maxsize=0)
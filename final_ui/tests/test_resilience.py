@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, RetryBudget, RetryPolicy
+
+class FakeClock:
+    """Stands in for the time module so tests move time by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, "time", fake)
+    return fake
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("GET /x", failure_threshold=3, reset_timeout=10.0)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    breaker.record_success()  # A success resets the count
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 1
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    clock.now += 4.0
+    assert breaker.retry_in() == pytest.approx(6.0)
+
+def test_half_open_admits_one_probe_and_closes_on_success(clock):
+    breaker = CircuitBreaker("GET /x", failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    clock.now += 10.0
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # The probe is still in flight
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.retry_in() == 0.0
+    assert breaker.allow() and breaker.allow()
+
+def test_failed_probe_reopens_for_a_full_timeout(clock):
+    breaker = CircuitBreaker("GET /x", failure_threshold=5, reset_timeout=10.0)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 12.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    assert breaker.retry_in() == pytest.approx(10.0)
+    clock.now += 9.9
+    assert not breaker.allow()
+
+def test_abandoned_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker("GET /x", failure_threshold=1, reset_timeout=1.0)
+    breaker.record_failure()
+    clock.now += 1.0
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+def test_retry_budget_refills_as_the_window_slides(clock):
+    budget = RetryBudget(ratio=0.5, min_per_second=0.2, window=10.0)
+    for _ in range(4):
+        budget.record_request()
+    # 0.2 * 10 + 0.5 * 4 = 4 retries allowed in the window
+    assert [budget.try_retry() for _ in range(5)] == [True] * 4 + [False]
+    assert budget.exhausted == 1
+    clock.now += 10.5  # Requests and retries have left the window
+    assert budget.snapshot()["retries"] == 0
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+
+def test_retry_budget_grows_with_traffic(clock):
+    budget = RetryBudget(ratio=0.2, min_per_second=0.0, window=10.0)
+    assert not budget.try_retry()
+    for _ in range(10):
+        budget.record_request()
+    assert budget.try_retry() and budget.try_retry()
+    assert not budget.try_retry()
+
+def test_policy_delay_jitter_bounds():
+    policy = RetryPolicy(attempts=5, base_delay=0.5, max_delay=3.0)
+    rng = random.Random(0)
+    for attempt, cap in enumerate([0.5, 1.0, 2.0, 3.0, 3.0]):
+        delays = [policy.delay(attempt, rng) for _ in range(200)]
+        assert all(0.0 <= d <= cap for d in delays)
+        assert max(delays) > cap * 0.9  # Full jitter reaches up to the cap
+    assert policy.retry_statuses == frozenset({502, 503, 504})
+
+def test_open_circuit_answers_503(monkeypatch, clock):
+    import app
+
+    key = "POST /session/start"
+    breaker = CircuitBreaker(key, failure_threshold=1, reset_timeout=15.0)
+    breaker.record_failure()
+    monkeypatch.setitem(app.upstream.breakers, key, breaker)
+    response = app.app.test_client().post('/start-session')
+    assert response.status_code == 503
+    assert response.get_json()["retry_in"] == pytest.approx(15.0)
@@ -0,0 +1,424 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import API_BASE_URL
+from resilience import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+
+try:
+    import aiohttp  # Optional: only the asyncio mission engine needs it
+except ImportError:
+    aiohttp = None
+
+# Used when API_BASE_URL is not set in the environment
+DEFAULT_BASE_URL = "https://roverdata2-production.up.railway.app/api"
+
+# Keep-alive connections kept open to the upstream host. The navigation thread,
+# the return journey thread and a few concurrent dashboard requests each hold one.
+POOL_MAXSIZE = 8
+
+# Seconds to wait for a connection and for the response, unless the endpoint overrides it
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 15.0
+
+# Read timeouts for endpoints that are known to respond slowly
+ENDPOINT_READ_TIMEOUTS = {
+    "/rover/charge": 20.0
+}
+
+# Latency samples kept per endpoint for the percentiles in stats()
+LATENCY_WINDOW = 256
+
+# GET endpoints whose concurrent calls for the same session share one request (see UpstreamClient.snapshot)
+SNAPSHOT_PATHS = ("/rover/status", "/rover/sensor-data")
+
+# Consecutive failed calls (connection errors, timeouts, 5xx) that open an endpoint's
+# circuit, and how long it stays open before a probe call is let through
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 15.0
+
+# Attempts and backoff per endpoint; endpoints not listed are tried once. Moves are
+# never retried: a retried move that had reached the rover would drive it twice.
+# Charging is retried on any error status, 4xx and 500 included, as the recharge
+# loop it replaced retried every non-200 answer.
+RETRY_POLICIES = {
+    "GET /rover/status": RetryPolicy(attempts=3, base_delay=0.5, max_delay=4.0),
+    "GET /rover/sensor-data": RetryPolicy(attempts=3, base_delay=1.0, max_delay=8.0),
+    "POST /rover/stop": RetryPolicy(attempts=3, base_delay=0.5, max_delay=4.0),
+    "POST /rover/charge": RetryPolicy(attempts=5, base_delay=1.0, max_delay=8.0, retry_statuses=range(400, 600))
+}
+NO_RETRY = RetryPolicy(attempts=1)
+
+# Connections the async client may hold open at once, shared by every mission on its event loop
+ASYNC_POOL_LIMIT = 64
+
+class EndpointStats:
+    """Call counts and latency of one "METHOD /path" endpoint."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0  # Connection failures and timeouts, not HTTP error statuses
+        self.retries = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.statuses = {}  # HTTP status code -> count
+        self.samples = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, elapsed, status=None):
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.samples.append(elapsed)
+        if status is None:
+            self.errors += 1
+        else:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def to_dict(self):
+        ordered = sorted(self.samples)
+
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else None
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+            "mean": self.total_time / self.calls if self.calls else None,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": self.max_time
+        }
+
+class SingleFlight:
+    """
+    Runs a function at most once at a time per key.
+
+    A caller that asks for a key while another caller is already computing
+    it waits for that result (or exception) instead of starting its own call.
+    Nothing is cached: once the call finishes the next caller starts a new one.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.calls = {}  # key -> _Call in flight
+        self.executed = 0  # Calls actually made
+        self.shared = 0  # Callers served by another caller's call
+        self.lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = SingleFlight._Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    if self.calls.get(key) is call:
+                        del self.calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def forget(self, keys):
+        """Make later callers of these keys start a new call instead of joining the one in flight."""
+        with self.lock:
+            for key in keys:
+                self.calls.pop(key, None)
+
+    def stats(self):
+        with self.lock:
+            return {"executed": self.executed, "saved_calls": self.shared, "in_flight": len(self.calls)}
+
+class _EndpointTable:
+    """
+    Per-endpoint statistics, circuit breakers and the retry budget shared by the sync and async clients.
+
+    Every attempt first asks the endpoint's CircuitBreaker for permission
+    (_admit) and afterwards reports its outcome (_settle), which also decides
+    whether and after what delay to retry under the endpoint's RetryPolicy
+    and the client-wide RetryBudget.
+    """
+
+    def __init__(self):
+        self.endpoints = {}  # "METHOD /path" -> EndpointStats
+        self.breakers = {}  # "METHOD /path" -> CircuitBreaker
+        self.retry_budget = RetryBudget()
+        self.lock = threading.Lock()
+
+    def _stats(self, key):
+        # Caller holds self.lock
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        return stats
+
+    def _record(self, method, path, elapsed, status):
+        with self.lock:
+            self._stats(f"{method} {path}").record(elapsed, status)
+
+    def _admit(self, method, path):
+        """Return the endpoint's breaker, or raise CircuitOpenError if it refuses the call."""
+        key = f"{method} {path}"
+        with self.lock:
+            breaker = self.breakers.get(key)
+            if breaker is None:
+                breaker = self.breakers[key] = CircuitBreaker(key, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+        if not breaker.allow():
+            raise CircuitOpenError(key, breaker.retry_in())
+        return breaker
+
+    def _settle(self, breaker, method, path, attempt, status):
+        """
+        Report an attempt's outcome (`status` None for a connection error or
+        timeout) and return the seconds to wait before retrying, or None to stop.
+        """
+        if status is None or status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        policy = RETRY_POLICIES.get(f"{method} {path}", NO_RETRY)
+        if status is not None and status not in policy.retry_statuses:
+            return None
+        if breaker.state == CircuitBreaker.OPEN:
+            return None  # This failure opened the circuit; stop with what we have
+        if attempt + 1 >= policy.attempts or not self.retry_budget.try_retry():
+            return None
+        with self.lock:
+            self._stats(f"{method} {path}").retries += 1
+        return policy.delay(attempt)
+
+    def _endpoint_stats(self):
+        with self.lock:
+            return {key: stats.to_dict() for key, stats in sorted(self.endpoints.items())}
+
+    def breaker_states(self):
+        """State, failure count and rejections of every endpoint's circuit breaker."""
+        with self.lock:
+            breakers = sorted(self.breakers.items())
+        return {key: breaker.snapshot() for key, breaker in breakers}
+
+    def _resilience_stats(self):
+        return {"breakers": self.breaker_states(), "retry_budget": self.retry_budget.snapshot()}
+
+class UpstreamClient(_EndpointTable):
+    """
+    HTTP client for the rover API shared by every route and background thread.
+
+    All calls go through one requests.Session whose connection pool keeps up
+    to `pool_maxsize` keep-alive connections to the API host, so a navigation
+    step reuses open TCP/TLS connections instead of opening a new one per
+    call. Every call gets a (connect, read) timeout and its latency is
+    recorded per endpoint.
+
+    Failed calls are retried with jittered exponential backoff as far as the
+    endpoint's RetryPolicy and the retry budget allow, and an endpoint that
+    keeps failing has its circuit opened: calls to it then raise
+    CircuitOpenError at once instead of tying up the calling thread.
+
+    snapshot() reads of the same status or sensor endpoint for the same
+    session are coalesced: concurrent callers share one request. Any POST for
+    a session (move, stop, charge) drops that session's reads in flight, so a
+    read issued after a move never returns state from before it.
+    """
+
+    def __init__(self, base_url, pool_maxsize=POOL_MAXSIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.session = requests.Session()
+        # pool_block=False: a burst past the pool size opens extra short-lived connections instead of waiting
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.pool_maxsize = pool_maxsize
+        self.flight = SingleFlight()
+
+    def request(self, method, path, params=None, timeout=None):
+        """
+        Send a request to `path` under the base URL, retrying per RETRY_POLICIES,
+        and return the last requests.Response. Connection errors and timeouts of
+        the last attempt are raised as requests.RequestException, and
+        CircuitOpenError is raised if the endpoint's circuit is open.
+        """
+        if timeout is None:
+            timeout = (self.connect_timeout, ENDPOINT_READ_TIMEOUTS.get(path, self.read_timeout))
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            breaker = self._admit(method, path)
+            response = error = status = None
+            began = time.monotonic()
+            try:
+                response = self.session.request(method, self.base_url + path, params=params, timeout=timeout)
+                status = response.status_code
+            except requests.RequestException as e:
+                error = e
+            except BaseException:
+                breaker.abandon()
+                raise
+            finally:
+                self._record(method, path, time.monotonic() - began, status)
+
+            delay = self._settle(breaker, method, path, attempt, status)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, path, timeout=None, **params):
+        return self.request("GET", path, params or None, timeout)
+
+    def post(self, path, timeout=None, **params):
+        try:
+            return self.request("POST", path, params or None, timeout)
+        finally:
+            if 'session_id' in params:
+                self.flight.forget([(p, params['session_id']) for p in SNAPSHOT_PATHS])
+
+    def snapshot(self, path, session_id):
+        """
+        GET a status or sensor snapshot of a session, joining an identical
+        request already in flight. Callers share the same Response object.
+        """
+        if path not in SNAPSHOT_PATHS:
+            raise ValueError(f"{path} is not a snapshot endpoint")
+        return self.flight.do((path, session_id), lambda: self.get(path, session_id=session_id))
+
+    def stats(self):
+        """Per-endpoint calls, errors and latency (seconds), coalescing counters, breaker states and the retry budget."""
+        return {
+            "base_url": self.base_url,
+            "pool_maxsize": self.pool_maxsize,
+            "timeout": {"connect": self.connect_timeout, "read": self.read_timeout},
+            "endpoints": self._endpoint_stats(),
+            "coalescing": self.flight.stats(),
+            **self._resilience_stats()
+        }
+
+    def close(self):
+        self.session.close()
+
+class UpstreamResponse:
+    """Status code and body of a finished async call, with the parts of requests.Response the app uses."""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+class AsyncUpstreamClient(_EndpointTable):
+    """
+    asyncio counterpart of UpstreamClient, built on aiohttp.
+
+    One aiohttp.ClientSession, created on first use inside the running event
+    loop, pools up to `limit` connections for every coroutine on that loop.
+    Timeouts, retries, circuit breakers and per-endpoint statistics work as
+    in UpstreamClient; attempts cut short by task cancellation are not recorded.
+    """
+
+    def __init__(self, base_url, limit=ASYNC_POOL_LIMIT, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        if aiohttp is None:
+            raise RuntimeError("The async upstream client needs aiohttp (pip install aiohttp).")
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.limit = limit
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.session = None
+
+    async def request(self, method, path, params=None, timeout=None):
+        """
+        Send a request, retrying per RETRY_POLICIES, and return an UpstreamResponse
+        once the last attempt's body has been read. `timeout` overrides the read
+        timeout in seconds. Connection errors and timeouts of the last attempt are
+        raised as aiohttp.ClientError or asyncio.TimeoutError, and CircuitOpenError
+        is raised if the endpoint's circuit is open.
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.limit))
+        if timeout is None:
+            timeout = ENDPOINT_READ_TIMEOUTS.get(path, self.read_timeout)
+        client_timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=timeout)
+        if params:
+            params = {key: str(value) for key, value in params.items()}
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            breaker = self._admit(method, path)
+            response = error = status = None
+            began = time.monotonic()
+            try:
+                async with self.session.request(method, self.base_url + path, params=params,
+                                                timeout=client_timeout) as raw:
+                    response = UpstreamResponse(raw.status, await raw.text())
+                    status = raw.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            except BaseException:
+                # Includes cancellation: the attempt neither succeeded nor failed
+                breaker.abandon()
+                raise
+            self._record(method, path, time.monotonic() - began, status)
+
+            delay = self._settle(breaker, method, path, attempt, status)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, path, timeout=None, **params):
+        return await self.request("GET", path, params or None, timeout)
+
+    async def post(self, path, timeout=None, **params):
+        return await self.request("POST", path, params or None, timeout)
+
+    def stats(self):
+        """Per-endpoint call counts, error counts and latency percentiles (seconds)."""
+        return {
+            "base_url": self.base_url,
+            "pool_limit": self.limit,
+            "timeout": {"connect": self.connect_timeout, "read": self.read_timeout},
+            "endpoints": self._endpoint_stats(),
+            **self._resilience_stats()
+        }
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+# Client used by the app
+client = UpstreamClient(API_BASE_URL or DEFAULT_BASE_URL)